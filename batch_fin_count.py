@@ -0,0 +1,254 @@
+"""
+Conteo de aletas por lotes (sin interfaz gráfica).
+
+Procesa un directorio o patrón glob de imágenes con process_roi_heavy + detección
+de picos en un ProcessPoolExecutor y escribe un resultado por imagen (CSV o JSONL)
+a medida que se van terminando.
+
+Ejemplo:
+    python batch_fin_count.py images --roi 100,50,900,400 --threshold 127 --erode 1 -o fins.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import cv2
+
+from image_processing import (
+    MASK_TYPES, MORPH_MODES, MORPH_SHAPES, MORPH_ERODE_DILATE, apply_digital_zoom, process_roi_heavy
+)
+from fin_analysis import DEFAULT_PEAK_DISTANCE, PEAK_METHODS, compute_projection, detect_fin_peaks, locate_fins
+from image_files import collect_images
+
+THRESH_TYPES = {
+    "binary": cv2.THRESH_BINARY,
+    "binary_inv": cv2.THRESH_BINARY_INV,
+}
+
+RESULT_FIELDS = [
+    "path", "fin_count", "pitch", "peaks", "width", "height",
+    "read_ms", "process_ms", "analysis_ms", "total_ms", "error",
+]
+
+# Parámetros del pipeline en cada proceso trabajador (se envían una sola vez)
+_worker_params = None
+
+def _init_worker(params):
+    """Inicializa un proceso trabajador."""
+    global _worker_params
+    _worker_params = params
+    # Un hilo de OpenCV por proceso: el paralelismo lo da el pool
+    cv2.setNumThreads(1)
+
+def count_fins_in_file(path, params):
+    """
+    Carga una imagen, aplica zoom + ROI + procesamiento pesado y cuenta las aletas.
+    :param path: Ruta de la imagen.
+    :param params: Diccionario con los parámetros del pipeline (ver build_params).
+    :return: Diccionario con el resultado (ver RESULT_FIELDS).
+    """
+    result = {"path": path, "fin_count": None, "pitch": None, "peaks": [], "width": None, "height": None,
+              "read_ms": None, "process_ms": None, "analysis_ms": None, "total_ms": None,
+              "error": ""}
+    t0 = time.perf_counter()
+
+    image = cv2.imread(path)
+    t1 = time.perf_counter()
+    result["read_ms"] = round((t1 - t0) * 1000, 3)
+    if image is None:
+        result["error"] = "no se pudo leer la imagen"
+        return result
+
+    base_image = apply_digital_zoom(image, params["zoom"])
+    h, w = base_image.shape[:2]
+    result["width"], result["height"] = w, h
+
+    roi = params["roi"]
+    if roi is not None:
+        x1, y1, x2, y2 = roi
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w, x2), min(h, y2)
+        if x2 <= x1 or y2 <= y1:
+            result["error"] = "ROI fuera de la imagen"
+            return result
+        base_image = base_image[y1:y2, x1:x2]
+
+    processed = process_roi_heavy(
+        base_image,
+        params["brightness"],
+        params["contrast"],
+        params["equalize"],
+        params["mask"],
+        params["threshold"] is not None,
+        params["threshold"] or 0,
+        params["thresh_type"],
+        params["erode"],
+        params["dilate"],
+        params["morph_mode"],
+        params["morph_shape"],
+    )
+    t2 = time.perf_counter()
+
+    projection = compute_projection(processed)
+    if params["method"] == "fft":
+        peaks, estimate = locate_fins(projection)
+        result["pitch"] = round(estimate.pitch, 3) if estimate is not None else None
+        result["peaks"] = [round(float(p), 2) for p in peaks]
+    else:
+        peaks = detect_fin_peaks(projection, params["peak_distance"])
+        result["peaks"] = [int(p) for p in peaks]
+    t3 = time.perf_counter()
+
+    result["fin_count"] = int(len(peaks))
+    result["process_ms"] = round((t2 - t1) * 1000, 3)
+    result["analysis_ms"] = round((t3 - t2) * 1000, 3)
+    result["total_ms"] = round((t3 - t0) * 1000, 3)
+    return result
+
+def _count_fins_batch(paths):
+    """Procesa un lote de rutas en el trabajador (reduce la comunicación entre procesos)."""
+    results = []
+    for path in paths:
+        try:
+            results.append(count_fins_in_file(path, _worker_params))
+        except Exception as e:
+            results.append({"path": path, "error": f"{type(e).__name__}: {e}"})
+    return results
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def run_batch(paths, params, workers=None, chunk_size=16):
+    """
+    Genera los resultados (en orden de terminación) procesando 'paths' en un pool de procesos.
+    Se mantiene un número acotado de lotes en vuelo para no cargar miles de futuros en memoria.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    batches = _chunks(paths, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(params,)) as executor:
+        pending = set()
+        for batch in batches:
+            pending.add(executor.submit(_count_fins_batch, batch))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in pending:
+            yield from future.result()
+
+class ResultWriter:
+    """Escribe resultados en CSV o JSONL conforme van llegando."""
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, result):
+        if self.fmt == "csv":
+            row = dict(result)
+            row["peaks"] = " ".join(str(p) for p in result.get("peaks", []))
+            self._csv.writerow(row)
+        else:
+            self.stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+def _parse_roi(text):
+    try:
+        x1, y1, x2, y2 = (int(v) for v in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("el ROI debe ser x1,y1,x2,y2")
+    if x2 <= x1 or y2 <= y1:
+        raise argparse.ArgumentTypeError("el ROI debe cumplir x2 > x1 y y2 > y1")
+    return (x1, y1, x2, y2)
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Conteo de aletas por lotes sobre directorios de imágenes."
+    )
+    parser.add_argument("inputs", nargs="+", help="Directorios o patrones glob de imágenes")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Buscar en subdirectorios")
+    parser.add_argument("-o", "--output", help="Archivo de salida (por defecto stdout)")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"],
+                        help="Formato de salida (por defecto según la extensión, o csv)")
+    parser.add_argument("--roi", type=_parse_roi, help="ROI x1,y1,x2,y2 sobre la imagen con zoom")
+    parser.add_argument("--zoom", type=float, default=1.0, help="Factor de zoom digital")
+    parser.add_argument("--brightness", type=int, default=0, help="Brillo (Beta), -100 a 100")
+    parser.add_argument("--contrast", type=float, default=1.0, help="Contraste (Alpha), 1.0 a 3.0")
+    parser.add_argument("--equalize", action="store_true", help="Ecualización de histograma")
+    parser.add_argument("--mask", choices=MASK_TYPES, default="Ninguna", help="Máscara/filtro")
+    parser.add_argument("--threshold", type=int, help="Valor de umbral (activa la umbralización)")
+    parser.add_argument("--thresh-type", choices=sorted(THRESH_TYPES), default="binary")
+    parser.add_argument("--erode", type=int, default=0, help="Iteraciones de erosión")
+    parser.add_argument("--dilate", type=int, default=0, help="Iteraciones de dilatación")
+    parser.add_argument("--morph-mode", choices=MORPH_MODES, default=MORPH_ERODE_DILATE,
+                        help="Operación morfológica")
+    parser.add_argument("--morph-shape", choices=list(MORPH_SHAPES), default="Rectángulo",
+                        help="Forma del elemento estructurante")
+    parser.add_argument("--method", choices=PEAK_METHODS, default="find_peaks",
+                        help="Detección de aletas: distancia fija (find_peaks) o paso por FFT sub-píxel (fft)")
+    parser.add_argument("--peak-distance", type=int, default=DEFAULT_PEAK_DISTANCE,
+                        help="Distancia mínima entre aletas (px, solo --method find_peaks)")
+    parser.add_argument("-j", "--workers", type=int, help="Procesos trabajadores (por defecto: núcleos)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Imágenes por tarea")
+    return parser
+
+def build_params(args):
+    """Parámetros del pipeline a partir de los argumentos de línea de comandos."""
+    return {
+        "roi": args.roi,
+        "zoom": args.zoom,
+        "brightness": args.brightness,
+        "contrast": args.contrast,
+        "equalize": args.equalize,
+        "mask": args.mask,
+        "threshold": args.threshold,
+        "thresh_type": THRESH_TYPES[args.thresh_type],
+        "erode": args.erode,
+        "dilate": args.dilate,
+        "morph_mode": args.morph_mode,
+        "morph_shape": args.morph_shape,
+        "method": args.method,
+        "peak_distance": args.peak_distance,
+    }
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    paths = collect_images(args.inputs, args.recursive)
+    if not paths:
+        print("Error: no se encontraron imágenes.", file=sys.stderr)
+        return 1
+
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if args.output and args.output.endswith((".jsonl", ".json")) else "csv"
+
+    stream = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    writer = ResultWriter(stream, fmt)
+    start = time.perf_counter()
+    processed = errors = 0
+    try:
+        for result in run_batch(paths, build_params(args), args.workers, args.chunk_size):
+            writer.write(result)
+            processed += 1
+            errors += bool(result.get("error"))
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{processed} imágenes ({errors} con error) en {elapsed:.2f} s "
+          f"({processed / elapsed:.1f} img/s)", file=sys.stderr)
+    return 0 if errors == 0 else 2
+
+if __name__ == '__main__':
+    sys.exit(main())
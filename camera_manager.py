@@ -0,0 +1,109 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from frame_analyzer import ProcessingParams
+from processing_worker import ProcessingWorker
+from video_thread import VideoThread
+
+class CameraChannel:
+    """
+    Una cámara de la estación: hilo de captura + hilo de procesamiento propios, con su
+    instantánea de parámetros (ROI, pipeline) y el último resultado mostrado.
+    """
+    def __init__(self, index, name, capture_config=None, source_factory=None,
+                 change_threshold=2.0, skip_unchanged=True, params=None):
+        """
+        :param capture_config: CaptureConfig de la cámara (si no hay source_factory).
+        :param source_factory: Función sin argumentos que crea la fuente (reproducción).
+        """
+        self.index = index
+        self.name = name
+        self.params = params or ProcessingParams()
+        self.result = None # Último resultado retirado (retiene su frame del pool)
+        source = source_factory() if source_factory is not None else None
+        self.video_thread = VideoThread(change_threshold=change_threshold,
+                                        capture_config=capture_config, source=source)
+        self.video_thread.set_skip_unchanged(skip_unchanged)
+        self.worker = ProcessingWorker(self.video_thread.mailbox, self.video_thread.pool)
+        self.worker.set_params(self.params)
+
+    def start(self):
+        self.worker.start()
+        self.video_thread.start()
+
+    def stop(self):
+        """Detiene captura y procesamiento; el último resultado se conserva."""
+        self.video_thread.stop()
+        self.worker.stop()
+
+    def set_params(self, params):
+        self.params = params
+        self.worker.set_params(params)
+
+    def take_result(self):
+        """
+        Retira el resultado más reciente y suelta el anterior (su frame vuelve al pool).
+        :return: ProcessingResult o None si no había uno nuevo.
+        """
+        result = self.worker.take_result()
+        if result is None:
+            return None
+        self.worker.release_result(self.result)
+        self.result = result
+        return result
+
+    def stats(self):
+        """Contadores de captura y procesamiento; latency_ms = espera en el buzón + proceso."""
+        stats = self.video_thread.stats()
+        stats.update(self.worker.stats())
+        if stats["frame_wait_ms"] is not None and stats["process_ms"] is not None:
+            stats["latency_ms"] = stats["frame_wait_ms"] + stats["process_ms"]
+        else:
+            stats["latency_ms"] = None
+        return stats
+
+
+class CameraManager(QObject):
+    """
+    Estación multi-cámara: N canales (captura + procesamiento) en paralelo.
+    Cada canal corre en sus propios hilos (OpenCV libera el GIL en el trabajo pesado),
+    así que agregar cámaras reparte la carga entre núcleos; la GUI solo retira
+    resultados terminados.
+    """
+
+    # Aviso (sin datos) de que el canal 'index' tiene un resultado nuevo
+    result_ready = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.channels = []
+
+    def add_camera(self, name, capture_config=None, source_factory=None, **kwargs):
+        """Agrega (sin iniciar) un canal. :return: CameraChannel"""
+        channel = CameraChannel(len(self.channels), name, capture_config, source_factory, **kwargs)
+        # Slot del propio manager (no una lambda): Qt desconecta solo si el manager se destruye
+        channel.worker.result_ready.connect(self._forward_result)
+        self.channels.append(channel)
+        return channel
+
+    def _forward_result(self):
+        """Reenvía el aviso del hilo de procesamiento con el índice de su canal."""
+        worker = self.sender()
+        for channel in self.channels:
+            if channel.worker is worker:
+                self.result_ready.emit(channel.index)
+                return
+
+    def start_all(self):
+        for channel in self.channels:
+            channel.start()
+
+    def stop_all(self):
+        for channel in self.channels:
+            channel.stop()
+        self.channels = []
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __getitem__(self, index):
+        return self.channels[index]
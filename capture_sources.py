@@ -0,0 +1,364 @@
+"""
+Fuentes de captura sin dependencias de Qt (las usan VideoThread y los procesos sin GUI).
+
+El ritmo lo marca el propio read() bloqueante de la cámara (sin pausas fijas); si se
+pide un FPS máximo se limita con un temporizador monotónico. El FPS logrado se mide.
+
+Además de la cámara hay fuentes de reproducción intercambiables con ella (archivo de
+video, directorio de imágenes y patrón sintético), a ritmo real o a máxima velocidad,
+para medir el pipeline completo sin hardware.
+"""
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+from image_files import collect_images
+
+# Backends de cv2.VideoCapture por nombre
+BACKENDS = {
+    "auto": cv2.CAP_ANY,
+    "dshow": cv2.CAP_DSHOW,
+    "msmf": cv2.CAP_MSMF,
+    "v4l2": cv2.CAP_V4L2,
+    "gstreamer": cv2.CAP_GSTREAMER,
+    "ffmpeg": cv2.CAP_FFMPEG,
+}
+
+# Formatos de píxel habituales en cámaras USB (MJPG permite 60 fps a 1080p en USB 2/3)
+FOURCC_CODES = ("MJPG", "YUYV", "YUY2", "H264")
+
+# Configuración de captura. None = dejar el valor que traiga la cámara.
+# max_fps limita la lectura con un temporizador (None = al ritmo de la cámara).
+CaptureConfig = namedtuple(
+    "CaptureConfig",
+    ["device", "backend", "fourcc", "width", "height", "fps", "buffersize", "max_fps"],
+    defaults=(1, "auto", None, None, None, None, 1, None),
+)
+
+def decode_fourcc(value):
+    """Código FOURCC numérico de OpenCV -> texto (ej. 'MJPG')."""
+    value = int(value)
+    if value <= 0:
+        return ""
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+def open_capture(config):
+    """
+    Abre la cámara y aplica la configuración. El FOURCC se aplica antes que la
+    resolución (varios drivers solo aceptan resoluciones altas en MJPG).
+    :return: cv2.VideoCapture (revisar isOpened()).
+    """
+    cap = cv2.VideoCapture(config.device, BACKENDS.get(config.backend, cv2.CAP_ANY))
+    if not cap.isOpened():
+        return cap
+    if config.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*config.fourcc))
+    if config.width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.width)
+    if config.height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.height)
+    if config.fps:
+        cap.set(cv2.CAP_PROP_FPS, config.fps)
+    if config.buffersize is not None:
+        # Búfer corto del driver: menos frames viejos esperando = menos latencia
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, config.buffersize)
+    return cap
+
+def describe_capture(cap):
+    """Valores que la cámara realmente aceptó (pueden diferir de los pedidos)."""
+    return {
+        "backend": cap.getBackendName() if hasattr(cap, "getBackendName") else "",
+        "fourcc": decode_fourcc(cap.get(cv2.CAP_PROP_FOURCC)),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "buffersize": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+
+
+class FpsMeter:
+    """FPS logrado en una ventana deslizante de tiempo (reloj monotónico)."""
+    def __init__(self, window=1.0):
+        self.window = window
+        self._ticks = deque()
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        self._ticks.append(now)
+        while self._ticks and now - self._ticks[0] > self.window:
+            self._ticks.popleft()
+
+    @property
+    def fps(self):
+        if len(self._ticks) < 2:
+            return 0.0
+        span = self._ticks[-1] - self._ticks[0]
+        return (len(self._ticks) - 1) / span if span > 0 else 0.0
+
+
+class FramePacer:
+    """
+    Ritmo fijo con temporizador monotónico: wait() duerme hasta el siguiente instante
+    programado. Si se va tarde, se resincroniza en lugar de recuperar frames en ráfaga.
+    """
+    def __init__(self, fps):
+        self.interval = 1.0 / fps
+        self._next = None
+
+    def wait(self):
+        now = time.perf_counter()
+        if self._next is None or now - self._next > self.interval:
+            self._next = now
+        elif self._next > now:
+            time.sleep(self._next - now)
+        self._next += self.interval
+
+    def reset(self):
+        self._next = None
+
+
+class CameraSource:
+    """
+    Cámara con configuración de captura. read() bloquea hasta el siguiente frame
+    de la cámara, así que el ritmo lo da el dispositivo (sin pausas fijas).
+    """
+    def __init__(self, config=None):
+        self.config = config or CaptureConfig()
+        self.cap = None
+        self.info = {}
+        self.exhausted = False  # Una cámara no se agota (ver ReplaySource)
+        self.fps_meter = FpsMeter()
+        self._pacer = FramePacer(self.config.max_fps) if self.config.max_fps else None
+
+    def open(self):
+        """:return: True si la cámara se abrió."""
+        self.cap = open_capture(self.config)
+        if not self.cap.isOpened():
+            return False
+        self.info = describe_capture(self.cap)
+        return True
+
+    def read(self, image=None):
+        """
+        :param image: Buffer opcional donde escribir el frame (ver FramePool); si la
+                      resolución no coincide, OpenCV devuelve un array nuevo.
+        :return: (ok, frame)
+        """
+        if self._pacer is not None:
+            self._pacer.wait()
+        ok, frame = self.cap.read() if image is None else self.cap.read(image=image)
+        if ok:
+            self.fps_meter.tick()
+        return ok, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+    def describe(self):
+        """Nombre legible de la fuente (para mensajes y estadísticas)."""
+        return f"Cámara {self.config.device}"
+
+
+def _deliver(frame, image):
+    """
+    Copia el frame en el buffer 'image' si coincide (ver FramePool); si no, en un array
+    nuevo. Nunca se entrega el frame original: las fuentes lo reutilizan.
+    """
+    if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+        np.copyto(image, frame)
+        return image
+    return frame.copy()
+
+
+class ReplaySource(ABC):
+    """
+    Base de las fuentes de reproducción: misma interfaz que CameraSource (open, read,
+    release, describe, info, fps_meter). Con realtime=True los frames se entregan al
+    FPS de la fuente (temporizador monotónico); con False, a máxima velocidad.
+    Sin loop, al terminar read() devuelve False y 'exhausted' pasa a True.
+    Las subclases implementan _open() y _next_frame().
+    """
+    def __init__(self, fps=30.0, realtime=True, loop=True):
+        self.cap = None
+        self.info = {}
+        self.fps_meter = FpsMeter()
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.exhausted = False
+        self._pacer = None
+
+    def open(self):
+        """:return: True si la fuente tiene frames."""
+        if not self._open():
+            return False
+        self.exhausted = False
+        self._pacer = FramePacer(self.fps) if self.realtime and self.fps else None
+        self.info = self._describe()
+        return True
+
+    def read(self, image=None):
+        """:return: (ok, frame)"""
+        if self._pacer is not None:
+            self._pacer.wait()
+        frame = self._next_frame(image)
+        if frame is None:
+            self.exhausted = True
+            return False, None
+        self.fps_meter.tick()
+        return True, frame
+
+    def release(self):
+        pass
+
+    def _describe(self):
+        return {"backend": type(self).__name__, "fourcc": "", "width": 0, "height": 0,
+                "fps": self.fps or 0.0, "buffersize": 0}
+
+    @abstractmethod
+    def _open(self):
+        """Prepara la fuente. :return: True si tiene frames."""
+
+    @abstractmethod
+    def _next_frame(self, image):
+        """Siguiente frame (escrito en 'image' si se puede) o None al terminar."""
+
+
+class VideoFileSource(ReplaySource):
+    """Reproduce un archivo de video (por defecto al FPS del archivo)."""
+    def __init__(self, path, fps=None, realtime=True, loop=True):
+        """:param fps: FPS de reproducción (None = el del archivo, o 30 si no lo declara)."""
+        super().__init__(fps, realtime, loop)
+        self.path = path
+
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        if not self.fps:
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        return True
+
+    def _next_frame(self, image):
+        ok, frame = self.cap.read() if image is None else self.cap.read(image=image)
+        if not ok and self.loop:
+            # Fin del archivo: volver al principio
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read() if image is None else self.cap.read(image=image)
+        return frame if ok else None
+
+    def _describe(self):
+        info = describe_capture(self.cap)
+        info["fps"] = self.fps
+        return info
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+    def describe(self):
+        return f"Video {os.path.basename(self.path)}"
+
+
+class ImageSequenceSource(ReplaySource):
+    """
+    Reproduce las imágenes de un directorio (o patrón glob) en orden alfabético.
+    Con preload=True se decodifican una sola vez al abrir: a máxima velocidad se mide
+    el pipeline y no la lectura del disco.
+    """
+    def __init__(self, path, fps=10.0, realtime=True, loop=True, size=None, preload=True):
+        """:param size: (ancho, alto) al que se llevan todas las imágenes (None = tamaño original)."""
+        super().__init__(fps, realtime, loop)
+        self.path = path
+        self.size = size
+        self.preload = preload
+        self.paths = []
+        self._images = None
+        self._index = 0
+
+    def _load(self, path):
+        image = cv2.imread(path)
+        if image is not None and self.size is not None:
+            image = cv2.resize(image, self.size, interpolation=cv2.INTER_AREA)
+        return image
+
+    def _open(self):
+        self.paths = collect_images([self.path])
+        if self.preload:
+            self._images = [image for image in map(self._load, self.paths) if image is not None]
+            if not self._images:
+                return False
+        self._index = 0
+        return bool(self.paths)
+
+    def _next_frame(self, image):
+        count = len(self._images) if self._images is not None else len(self.paths)
+        for _ in range(count):
+            if self._index >= count:
+                if not self.loop:
+                    return None
+                self._index = 0
+            i = self._index
+            self._index += 1
+            frame = self._images[i] if self._images is not None else self._load(self.paths[i])
+            if frame is not None:
+                return _deliver(frame, image)
+        return None
+
+    def _describe(self):
+        info = super()._describe()
+        first = self._images[0] if self._images else None
+        if first is not None:
+            info["height"], info["width"] = first.shape[:2]
+        return info
+
+    def describe(self):
+        return f"Imágenes {self.path} ({len(self.paths)})"
+
+
+class SyntheticSource(ReplaySource):
+    """
+    Patrón sintético de aletas (synthetic_frames.make_fin_frame) que se desplaza
+    'speed' px por frame. Un ciclo de frames se genera al abrir y se repite.
+    """
+    def __init__(self, width=1280, height=720, fps=30.0, realtime=True, pitch=40.0,
+                 speed=2.0, noise=8.0, cycle=None):
+        """
+        :param speed: Desplazamiento del patrón por frame (px).
+        :param cycle: Frames distintos generados (None = los de un paso completo).
+        """
+        super().__init__(fps, realtime, loop=True)
+        self.width, self.height = width, height
+        self.pitch, self.speed, self.noise = pitch, speed, noise
+        if cycle is None:
+            cycle = max(1, int(round(pitch / speed))) if speed else 1
+        self.cycle = cycle
+        self._frames = None
+        self._index = 0
+
+    def _open(self):
+        from synthetic_frames import make_fin_frame
+        self._frames = [
+            make_fin_frame(self.width, self.height, self.pitch, phase=i * self.speed, noise=self.noise, seed=i)
+            for i in range(self.cycle)
+        ]
+        self._index = 0
+        return True
+
+    def _next_frame(self, image):
+        frame = self._frames[self._index % len(self._frames)]
+        self._index += 1
+        return _deliver(frame, image)
+
+    def _describe(self):
+        info = super()._describe()
+        info["width"], info["height"] = self.width, self.height
+        return info
+
+    def describe(self):
+        return f"Sintético {self.width}x{self.height}"
@@ -0,0 +1,74 @@
+import cv2
+
+
+class ChangeDetector:
+    """
+    Detector de cambios barato para frames de cámara (sin Qt).
+    Compara una miniatura en gris del frame contra la del último frame PROCESADO:
+    si la diferencia media (niveles de gris) no supera el umbral, el frame se
+    omite y se reutilizan los resultados anteriores. Al comparar contra el último
+    frame procesado (y no contra el anterior) un cambio lento también se acumula
+    y termina disparando el procesamiento.
+    """
+    def __init__(self, threshold=2.0, thumb_width=64, max_skipped=150):
+        """
+        :param threshold: Diferencia media absoluta (0 a 255) a partir de la cual el frame cambió.
+        :param thumb_width: Ancho de la miniatura de comparación (px).
+        :param max_skipped: Frames omitidos seguidos tras los que se procesa uno igual (0 = sin límite).
+        """
+        self.threshold = threshold
+        self.thumb_width = thumb_width
+        self.max_skipped = max_skipped
+        self.processed = 0
+        self.skipped = 0
+        self.last_difference = None
+        self._reference = None
+        self._consecutive_skipped = 0
+
+    def reset(self):
+        """El próximo frame se procesa siempre (ej. al cambiar de cámara o de resolución)."""
+        self._reference = None
+        self._consecutive_skipped = 0
+
+    def _thumbnail(self, frame):
+        """Miniatura en gris: submuestreo por saltos + INTER_AREA (no recorre el frame completo)."""
+        h, w = frame.shape[:2]
+        step = max(1, w // (self.thumb_width * 4))
+        sampled = frame[::step, ::step]
+        thumb_h = max(1, int(round(sampled.shape[0] * self.thumb_width / sampled.shape[1])))
+        small = cv2.resize(sampled, (self.thumb_width, thumb_h), interpolation=cv2.INTER_AREA)
+        if len(small.shape) == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def is_changed(self, frame):
+        """
+        Decide si el frame debe procesarse y actualiza los contadores.
+        :return: True si cambió respecto al último frame procesado.
+        """
+        thumb = self._thumbnail(frame)
+        changed = self._reference is None or self._reference.shape != thumb.shape
+        if not changed:
+            self.last_difference = float(cv2.norm(thumb, self._reference, cv2.NORM_L1)) / thumb.size
+            changed = self.last_difference > self.threshold
+        if not changed and self.max_skipped and self._consecutive_skipped >= self.max_skipped:
+            changed = True
+
+        if changed:
+            self._reference = thumb
+            self._consecutive_skipped = 0
+            self.processed += 1
+        else:
+            self._consecutive_skipped += 1
+            self.skipped += 1
+        return changed
+
+    def stats(self):
+        """Contadores para mostrar en la interfaz."""
+        total = self.processed + self.skipped
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "skipped_ratio": self.skipped / total if total else 0.0,
+            "last_difference": self.last_difference,
+        }
@@ -1,5 +1,5 @@
 from PyQt5.QtWidgets import QLabel, QWidget, QVBoxLayout
-from PyQt5.QtCore import Qt, pyqtSignal, QRect
+from PyQt5.QtCore import Qt, pyqtSignal, QRect, QTimer
 from PyQt5.QtGui import QPainter, QPen, QColor
 
 # --- Importaciones para Matplotlib ---
@@ -13,42 +13,86 @@ class ROISelectableLabel(QLabel):
     """
     QLabel personalizado que permite seleccionar un área rectangular (ROI) con el mouse.
     Emite una señal 'roi_selected' con las coordenadas del rectángulo seleccionado.
+    Mientras se arrastra emite 'roi_dragging' como máximo una vez por refresco de pantalla.
+    Con Shift presionado el rectángulo se agrega a la lista de ROIs adicionales ('roi_added');
+    el clic derecho borra esa lista ('rois_cleared').
     """
     # Señal que envía el rectángulo seleccionado (x, y, ancho, alto)
     roi_selected = pyqtSignal(QRect)
+    # Rectángulo provisional durante el arrastre (limitado a la frecuencia de la pantalla)
+    roi_dragging = pyqtSignal(QRect)
+    # Fin del arrastre (se emite después de 'roi_selected', haya o no selección válida)
+    roi_drag_finished = pyqtSignal()
+    # ROI adicional (Shift + arrastre) y borrado de los ROIs adicionales (clic derecho)
+    roi_added = pyqtSignal(QRect)
+    rois_cleared = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.start_point = None
         self.end_point = None
         self.is_drawing = False
+        self.adding_roi = False  # El arrastre actual agrega un ROI en lugar de reemplazarlo
+        self.extra_rects = []    # ROIs adicionales (coordenadas de pantalla)
+
+        # Los movimientos del mouse se agrupan: solo se emite el último rectángulo por refresco
+        self._drag_timer = QTimer(self)
+        self._drag_timer.setSingleShot(True)
+        self._drag_timer.timeout.connect(self._emit_dragging)
         
         # Cursor en cruz para indicar selección
         self.setCursor(Qt.CrossCursor)
 
+    def _display_interval_ms(self):
+        """Periodo de refresco de la pantalla donde está el widget (60 Hz por defecto)."""
+        screen = self.screen() if hasattr(self, "screen") else None
+        rate = screen.refreshRate() if screen is not None else 0
+        return max(1, int(1000 / (rate if rate > 0 else 60)))
+
+    def _emit_dragging(self):
+        if self.is_drawing and self.start_point and self.end_point:
+            rect = QRect(self.start_point, self.end_point).normalized()
+            if rect.width() > 5 and rect.height() > 5:
+                self.roi_dragging.emit(rect)
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.start_point = event.pos()
             self.end_point = event.pos()
             self.is_drawing = True
+            self.adding_roi = bool(event.modifiers() & Qt.ShiftModifier)
             self.update()  # Fuerza el repintado para mostrar el cuadro
+        elif event.button() == Qt.RightButton and self.extra_rects:
+            self.extra_rects = []
+            self.rois_cleared.emit()
+            self.update()
 
     def mouseMoveEvent(self, event):
         if self.is_drawing:
             self.end_point = event.pos()
             self.update()
+            if not self._drag_timer.isActive():
+                self._drag_timer.start(self._display_interval_ms())
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton and self.is_drawing:
             self.end_point = event.pos()
             self.is_drawing = False
+            self._drag_timer.stop()
 
             # Calcular el rectángulo normalizado (para permitir arrastrar en cualquier dirección)
-            self.current_rect = QRect(self.start_point, self.end_point).normalized()
+            rect = QRect(self.start_point, self.end_point).normalized()
 
             # Solo emitir si el área tiene un tamaño razonable
-            if self.current_rect.width() > 5 and self.current_rect.height() > 5:
-                self.roi_selected.emit(self.current_rect)
+            if rect.width() > 5 and rect.height() > 5:
+                if self.adding_roi:
+                    self.extra_rects.append(rect)
+                    self.roi_added.emit(rect)
+                else:
+                    self.current_rect = rect
+                    self.roi_selected.emit(rect)
+            self.adding_roi = False
+            self.roi_drag_finished.emit()
 
             self.update()
 
@@ -64,11 +108,39 @@ class ROISelectableLabel(QLabel):
         if hasattr(self, 'current_rect') and self.current_rect:
             painter.drawRect(self.current_rect)
 
-        # 3. Dibujar el rectángulo de selección mientras se dibuja
+        # 3. Dibujar los ROIs adicionales (amarillo)
+        if self.extra_rects:
+            painter.setPen(QPen(QColor(255, 200, 0), 2, Qt.SolidLine))
+            painter.setBrush(QColor(255, 200, 0, 40))
+            for rect in self.extra_rects:
+                painter.drawRect(rect)
+
+        # 4. Dibujar el rectángulo de selección mientras se dibuja
         if self.is_drawing and self.start_point and self.end_point:
+            color = QColor(255, 200, 0) if self.adding_roi else QColor(255, 0, 0)
+            painter.setPen(QPen(color, 2, Qt.SolidLine))
             temp_rect = QRect(self.start_point, self.end_point).normalized()
             painter.drawRect(temp_rect)
 
+# --- Mosaico de cámara (estación multi-cámara) ---
+class CameraTileLabel(QLabel):
+    """Mosaico de una cámara de la estación: muestra su vista y emite 'clicked' al pulsarlo."""
+    clicked = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setCursor(Qt.PointingHandCursor)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.clicked.emit()
+
+    def set_active(self, active):
+        """Resalta el mosaico de la cámara que se controla desde el panel."""
+        color = "#2a82da" if active else "#555"
+        self.setStyleSheet(f"background-color: #333; color: #AAA; border: 2px solid {color};")
+
+
 # --- Widget 2: Gráfico de Intensidad (NUEVO) ---
 class IntensityPlotWidget(QWidget):
     """
@@ -0,0 +1,509 @@
+from collections import namedtuple
+
+import cv2
+import numpy as np
+from scipy.fft import next_fast_len
+
+# Distancia mínima (px) entre aletas para find_peaks
+DEFAULT_PEAK_DISTANCE = 50
+
+# Métodos de detección de aletas
+PEAK_METHODS = ("find_peaks", "fft")
+
+# Resultado del análisis de paso por FFT
+PitchEstimate = namedtuple("PitchEstimate", ["pitch", "strength", "phase"])
+
+# Resultado por franja del análisis de varios ROIs (coordenadas y picos en píxeles del índice)
+BandResult = namedtuple("BandResult", ["roi_index", "band_index", "coords", "peaks", "pitch", "pitch_variance"])
+
+def to_gray(image):
+    """Devuelve la imagen en escala de grises (1 canal)."""
+    if len(image.shape) == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+def compute_projection(roi_img):
+    """
+    Proyección horizontal: suma de columnas verticales.
+    :param roi_img: Imagen del ROI (BGR o gris).
+    :return: Array de longitud = ancho del ROI.
+    """
+    gray_roi = to_gray(roi_img)
+    # dim=0 colapsa las filas, resultando en un array de longitud = ancho de imagen.
+    # Acumulador de 32 bits (alcanza para 8 millones de filas de 255)
+    return cv2.reduce(gray_roi, 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+
+class ProjectionIndex:
+    """
+    Índice de proyección por columnas de un frame procesado: suma acumulada de
+    cada columna a lo largo de las filas (imagen integral de 1 dimensión).
+    Con el índice construido, la proyección de cualquier rectángulo se obtiene
+    en O(ancho) restando dos filas, sin volver a recorrer los píxeles.
+    """
+    def __init__(self):
+        self._cumulative = None # (alto + 1, ancho), fila 0 en ceros
+        self.key = None         # Identidad del frame/parámetros indexados
+
+    def build(self, image, key=None):
+        """
+        Construye (o reconstruye) el índice sobre la imagen procesada.
+        El buffer se reutiliza mientras no cambie el tamaño.
+        :param image: Imagen procesada (BGR o gris).
+        :param key: Identidad opcional del contenido (ver is_current).
+        """
+        gray = to_gray(image)
+        h, w = gray.shape[:2]
+        if self._cumulative is None or self._cumulative.shape != (h + 1, w):
+            # int32, como compute_projection: sin desborde hasta 2**31 // 255 = 8.421.504 filas de 255
+            self._cumulative = np.zeros((h + 1, w), np.int32)
+        np.cumsum(gray, axis=0, dtype=np.int32, out=self._cumulative[1:])
+        self.key = key
+        return self
+
+    def is_current(self, key):
+        return self._cumulative is not None and self.key == key
+
+    @property
+    def shape(self):
+        """(alto, ancho) de la imagen indexada."""
+        if self._cumulative is None:
+            return None
+        return self._cumulative.shape[0] - 1, self._cumulative.shape[1]
+
+    def projection(self, x1, y1, x2, y2):
+        """
+        Proyección horizontal del rectángulo [x1, x2) x [y1, y2), igual a
+        compute_projection(imagen[y1:y2, x1:x2]).
+        :return: Array int32 de longitud x2 - x1 (vacío si el rectángulo queda fuera).
+        """
+        h, w = self.shape
+        x1, x2 = max(0, x1), min(w, x2)
+        y1, y2 = max(0, y1), min(h, y2)
+        if x2 <= x1 or y2 <= y1:
+            return np.empty(0, np.int32)
+        return self._cumulative[y2, x1:x2] - self._cumulative[y1, x1:x2]
+
+    def projections(self, rects):
+        """
+        Proyecciones de varios rectángulos en una sola indexación (sin ciclo por rectángulo).
+        :param rects: Secuencia de (x1, y1, x2, y2).
+        :return: (matriz int32 (rectángulos, ancho mayor) rellena con ceros, ancho de cada fila).
+        """
+        h, w = self.shape
+        r = np.asarray(rects, dtype=np.intp).reshape(-1, 4)
+        x1, x2 = np.clip(r[:, 0], 0, w), np.clip(r[:, 2], 0, w)
+        y1, y2 = np.clip(r[:, 1], 0, h), np.clip(r[:, 3], 0, h)
+        widths = np.where(y2 > y1, np.maximum(x2 - x1, 0), 0)
+
+        cols = np.arange(max(1, int(widths.max())) if len(r) else 1)
+        valid = cols[None, :] < widths[:, None]
+        x = np.minimum(x1[:, None] + cols[None, :], w - 1)
+        sums = self._cumulative[y2[:, None], x] - self._cumulative[y1[:, None], x]
+        return np.where(valid, sums, 0).astype(np.int32), widths
+
+def detect_fin_peaks(projection, distance=DEFAULT_PEAK_DISTANCE):
+    """
+    Detección de Picos (Crestas) sobre la proyección.
+    :param projection: Proyección horizontal (ver compute_projection).
+    :param distance: Mínima distancia horizontal entre picos para evitar ruido.
+    :return: Índices (columnas) de los picos.
+    """
+    # Importación diferida: scipy.signal tarda ~1 s en cargar y el método "fft" no lo usa
+    from scipy.signal import find_peaks
+    # height=...: Mínimo valor para ser considerado pico (promedio global)
+    peaks, _ = find_peaks(
+        projection,
+        distance=distance,
+        height=np.mean(projection)
+    )
+    return peaks
+
+def refine_peaks_subpixel(projection, peaks):
+    """
+    Refina posiciones enteras de picos a sub-píxel con interpolación parabólica
+    de 3 puntos (vectorizado, sin ciclo de Python sobre los picos).
+    :param projection: Proyección horizontal.
+    :param peaks: Índices enteros de los picos.
+    :return: Posiciones en float.
+    """
+    p = np.asarray(projection, dtype=np.float64)
+    peaks = np.asarray(peaks, dtype=np.intp)
+    if peaks.size == 0 or p.size < 3:
+        return peaks.astype(np.float64)
+
+    inner = np.clip(peaks, 1, p.size - 2)
+    y0, y1, y2 = p[inner - 1], p[inner], p[inner + 1]
+    denom = y0 - 2 * y1 + y2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offset = np.where(denom < 0, 0.5 * (y0 - y2) / denom, 0.0)
+    # En los extremos no hay vecino a ambos lados: se conserva la posición entera
+    offset = np.where(inner == peaks, np.clip(offset, -0.5, 0.5), 0.0)
+    return peaks + offset
+
+def _as_batch(projections, widths):
+    """Matriz float64 (filas, columnas) + ancho válido de cada fila."""
+    P = np.asarray(projections, dtype=np.float64)
+    if P.ndim == 1:
+        P = P[None, :]
+    if widths is None:
+        widths = np.full(P.shape[0], P.shape[1], np.intp)
+    return P, np.asarray(widths, dtype=np.intp)
+
+def estimate_pitch_batch(projections, widths=None, min_pitch=4.0, max_pitch=None):
+    """
+    Versión por lotes de estimate_pitch(): todas las proyecciones en una sola FFT real
+    (una fila por proyección, rellenas con ceros a la derecha hasta el ancho mayor).
+    :param projections: Matriz (filas, columnas) de proyecciones.
+    :param widths: Ancho válido de cada fila (por defecto, todas las columnas).
+    :param min_pitch: Paso mínimo considerado (px).
+    :param max_pitch: Paso máximo considerado (px); por defecto la mitad del ancho de cada fila.
+    :return: (pitch, strength, phase), arrays por fila con NaN donde no hay patrón.
+    """
+    P, widths = _as_batch(projections, widths)
+    m, n = P.shape
+    rows = np.arange(m)
+    cols = np.arange(n)
+    valid = cols[None, :] < widths[:, None]
+
+    mean = np.sum(np.where(valid, P, 0.0), axis=1) / np.maximum(widths, 1)
+    centered = np.where(valid, P - mean[:, None], 0.0)
+    # Ventana de Hann del ancho de cada fila (igual a np.hanning(ancho))
+    window = np.where(valid, 0.5 - 0.5 * np.cos(2 * np.pi * cols[None, :] / np.maximum(widths - 1, 1)[:, None]), 0.0)
+    # Relleno con ceros: más resolución espectral para la interpolación
+    n_fft = next_fast_len(4 * n)
+    transform = np.fft.rfft(centered * window, n_fft, axis=1)
+    spectrum = np.abs(transform)
+
+    max_pitch = widths / 2.0 if max_pitch is None else np.full(m, float(max_pitch))
+    k_min = np.maximum(1, np.ceil(n_fft / np.maximum(max_pitch, 1e-12))).astype(np.intp)
+    k_max = np.full(m, min(spectrum.shape[1] - 2, int(np.floor(n_fft / min_pitch))), np.intp)
+    bins = np.arange(spectrum.shape[1])
+    in_band = (bins[None, :] >= k_min[:, None]) & (bins[None, :] <= k_max[:, None])
+    k = np.argmax(np.where(in_band, spectrum, -1.0), axis=1)
+
+    flat = np.ptp(np.where(valid, P, mean[:, None]), axis=1) == 0
+    ok = (widths >= 8) & ~flat & (k_max > k_min) & (spectrum[rows, k] > 0)
+    k = np.clip(k, 1, spectrum.shape[1] - 2)
+
+    # Interpolación parabólica sobre el logaritmo de la magnitud (exacta para una ventana gaussiana)
+    a, b, c = (np.log(spectrum[rows, k + d] + 1e-12) for d in (-1, 0, 1))
+    denom = a - 2 * b + c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = np.where(denom < 0, np.clip(0.5 * (a - c) / denom, -0.5, 0.5), 0.0)
+    frequency = (k + delta) / n_fft
+    pitch = 1.0 / frequency
+
+    # Fase de la componente dominante: la del bin k corregida por el desfase entre el bin
+    # y la frecuencia refinada, medido desde el centro de la ventana (simétrica)
+    center = (widths - 1) / 2.0
+    angle = np.angle(transform[rows, k]) - 2 * np.pi * (delta / n_fft) * center
+    phase = (-angle / (2 * np.pi * frequency)) % pitch
+
+    strength = spectrum[rows, k] ** 2 / np.maximum(np.sum(spectrum[:, 1:] ** 2, axis=1), 1e-12)
+    nan = np.full(m, np.nan)
+    return np.where(ok, pitch, nan), np.where(ok, strength, nan), np.where(ok, phase, nan)
+
+def estimate_pitch(projection, min_pitch=4.0, max_pitch=None):
+    """
+    Estima el paso dominante entre aletas (px) con una FFT real de la proyección
+    e interpolación parabólica del pico espectral. No depende del zoom ni de una
+    distancia fija entre picos.
+    :param projection: Proyección horizontal.
+    :param min_pitch: Paso mínimo considerado (px).
+    :param max_pitch: Paso máximo considerado (px); por defecto la mitad del ancho (al menos 2 aletas).
+    :return: PitchEstimate(pitch, strength, phase) o None si la proyección es muy corta/plana.
+             'strength' es la fracción de energía espectral en el pico (0 a 1);
+             'phase' es la posición (px) de la primera cresta del patrón.
+    """
+    pitch, strength, phase = estimate_pitch_batch(projection, None, min_pitch, max_pitch)
+    if np.isnan(pitch[0]):
+        return None
+    return PitchEstimate(float(pitch[0]), float(strength[0]), float(phase[0]))
+
+def locate_fins_batch(projections, widths=None, pitch=None, phase=None):
+    """
+    Versión por lotes de locate_fins(): una fila por proyección, sin ciclos de Python
+    sobre filas ni sobre aletas.
+    :param projections: Matriz (filas, columnas) de proyecciones.
+    :param widths: Ancho válido de cada fila (por defecto, todas las columnas).
+    :param pitch: Paso de cada fila (si es None se calcula con estimate_pitch_batch).
+    :param phase: Posición de la primera cresta de cada fila.
+    :return: (posiciones, válidas, pitch). 'posiciones' es una matriz (filas, aletas máx.)
+             en float y 'válidas' su máscara booleana (las aletas de la fila i son
+             posiciones[i][válidas[i]], en orden creciente).
+    """
+    P, widths = _as_batch(projections, widths)
+    if pitch is None:
+        pitch, _, phase = estimate_pitch_batch(P, widths)
+    m, n = P.shape
+    rows = np.arange(m)[:, None]
+    ok = np.isfinite(pitch)
+    pitch = np.where(ok, pitch, 1.0)
+    phase = np.where(ok, phase, 0.0)
+
+    # Una predicción por periodo (igual que np.arange(phase, ancho, pitch)); cada columna
+    # pertenece a la predicción más cercana, así que las ventanas de +-medio paso son
+    # segmentos contiguos y sin solape de cada fila
+    counts = np.where(ok, np.ceil((widths - phase) / pitch), 0).astype(np.intp)
+    n_pred = max(1, int(counts.max())) if m else 1
+    cols = np.arange(n)
+    slot = np.round((cols[None, :] - phase[:, None]) / pitch[:, None]).astype(np.intp)
+    in_window = (slot >= 0) & (slot < counts[:, None]) & (cols[None, :] < widths[:, None])
+
+    # Máximo de cada segmento (fila, predicción) con reduceat sobre la matriz aplanada
+    group = np.where(in_window, rows * n_pred + slot, -1).ravel()
+    order = np.flatnonzero(group >= 0)  # ya ordenado: la predicción crece con la columna
+    best = np.full(m * n_pred, -1, np.intp)
+    if order.size:
+        groups = group[order]
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        flat = P.ravel()[order]
+        peak_value = np.maximum.reduceat(flat, starts)
+        # Primera columna que alcanza el máximo de su segmento
+        first = np.where(flat == np.repeat(peak_value, np.diff(np.r_[starts, flat.size])),
+                         np.arange(flat.size), flat.size)
+        best[groups[starts]] = order[np.minimum.reduceat(first, starts)] % n
+    best = best.reshape(m, n_pred)
+
+    # Mismo criterio que find_peaks: máximo local estricto (no un extremo de la fila ni
+    # un borde de segmento en pendiente) y por encima del promedio global de la fila
+    mean = np.sum(np.where(cols[None, :] < widths[:, None], P, 0.0), axis=1) / np.maximum(widths, 1)
+    found = best >= 0
+    best = np.maximum(best, 0)
+    peak = P[rows, best]
+    left = P[rows, np.maximum(best - 1, 0)]
+    right = P[rows, np.minimum(best + 1, n - 1)]
+    interior = (best > 0) & (best < widths[:, None] - 1)
+    valid = found & interior & (peak > left) & (peak >= right) & (peak > mean[:, None])
+
+    # Refinamiento sub-píxel (parábola de 3 puntos) de todas las aletas a la vez
+    safe = np.minimum(best, n - 1)
+    inner = np.clip(safe, 1, np.maximum(widths - 2, 1)[:, None])
+    y0, y1, y2 = P[rows, inner - 1], P[rows, inner], P[rows, np.minimum(inner + 1, n - 1)]
+    denom = y0 - 2 * y1 + y2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offset = np.where(denom < 0, 0.5 * (y0 - y2) / denom, 0.0)
+    # En los extremos no hay vecino a ambos lados: se conserva la posición entera
+    offset = np.where(inner == safe, np.clip(offset, -0.5, 0.5), 0.0)
+    return safe + offset, valid, np.where(ok, pitch, np.nan)
+
+def locate_fins(projection, estimate=None):
+    """
+    Posiciones sub-píxel de las aletas a partir del paso estimado por FFT.
+    Se predice una cresta por periodo, se busca el máximo en +-medio paso alrededor
+    de cada predicción y se refina con interpolación parabólica, todo vectorizado.
+    :param projection: Proyección horizontal.
+    :param estimate: PitchEstimate (si es None se calcula con estimate_pitch).
+    :return: (posiciones float, PitchEstimate). Posiciones vacías si no hay patrón.
+    """
+    p = np.asarray(projection, dtype=np.float64)
+    if estimate is None:
+        estimate = estimate_pitch(p)
+    if estimate is None:
+        return np.empty(0), None
+
+    positions, valid, _ = locate_fins_batch(p, None, np.array([estimate.pitch]), np.array([estimate.phase]))
+    return positions[0][valid[0]], estimate
+
+def split_bands(roi_coords, n_bands):
+    """
+    Divide un ROI (x1, y1, x2, y2) en n_bands franjas horizontales de igual alto.
+    :return: Lista de (x1, y1, x2, y2), de arriba hacia abajo.
+    """
+    x1, y1, x2, y2 = roi_coords
+    edges = np.linspace(y1, y2, max(1, n_bands) + 1).round().astype(int)
+    return [(x1, int(top), x2, int(bottom)) for top, bottom in zip(edges[:-1], edges[1:])]
+
+def analyze_rois(index, rois, n_bands=1):
+    """
+    Analiza varios ROIs, cada uno dividido en n_bands franjas, en una sola pasada por lotes:
+    una indexación del ProjectionIndex, una FFT real y una localización vectorizada para
+    todas las franjas. Sirve para detectar aletas dobladas o faltantes (la varianza del
+    paso crece) y para revisar varios tubos a la vez.
+    :param index: ProjectionIndex construido sobre el frame procesado.
+    :param rois: Lista de (x1, y1, x2, y2) en píxeles del índice.
+    :param n_bands: Franjas horizontales por ROI.
+    :return: Lista de BandResult (ROI por ROI, franjas de arriba hacia abajo).
+    """
+    bands = [(i, j, rect) for i, roi in enumerate(rois) for j, rect in enumerate(split_bands(roi, n_bands))]
+    if not bands:
+        return []
+    projections, widths = index.projections([rect for _, _, rect in bands])
+    positions, valid, pitch = locate_fins_batch(projections, widths)
+
+    # Varianza del espaciado real entre aletas consecutivas de cada franja
+    ordered = np.sort(np.where(valid, positions, np.inf), axis=1)
+    with np.errstate(invalid="ignore"):
+        spacing = np.diff(ordered, axis=1)
+    measured = np.isfinite(spacing)
+    counts = measured.sum(axis=1)
+    spacing = np.where(measured, spacing, 0.0)
+    mean_spacing = spacing.sum(axis=1) / np.maximum(counts, 1)
+    deviation = np.where(measured, spacing - mean_spacing[:, None], 0.0)
+    variance = np.where(counts > 0, (deviation ** 2).sum(axis=1) / np.maximum(counts, 1), np.nan)
+
+    results = []
+    for row, (i, j, rect) in enumerate(bands):
+        # Armado de la salida (una tupla por franja); el cálculo ya se hizo por lotes
+        x1 = max(0, rect[0])
+        results.append(BandResult(i, j, rect, positions[row][valid[row]] + x1,
+                                  float(pitch[row]), float(variance[row])))
+    return results
+
+class FinTracker:
+    """
+    Seguimiento temporal de aletas entre frames de video. En lugar de detectar en cada
+    frame, busca cada aleta solo en una ventana estrecha alrededor de su posición anterior
+    (vectorizado) y suaviza posiciones, paso y conteo con un promedio exponencial (EMA).
+    La detección completa solo se repite cuando falla el emparejamiento, cuando cambia
+    la configuración (key) o cada 'redetect_every' frames (para captar aletas nuevas).
+    """
+    def __init__(self, detect=None, position_alpha=0.4, count_alpha=0.2,
+                 search_fraction=0.25, min_match_ratio=0.7, redetect_every=30):
+        """
+        :param detect: Detección completa, detect(proyección) -> posiciones (por defecto locate_fins).
+        :param position_alpha: Peso del frame nuevo en el EMA de posiciones y paso.
+        :param count_alpha: Peso del frame nuevo en el EMA del conteo.
+        :param search_fraction: Radio de búsqueda alrededor de cada aleta, como fracción del paso.
+        :param min_match_ratio: Fracción mínima de aletas encontradas para seguir en modo seguimiento.
+        :param redetect_every: Frames entre detecciones completas forzadas (0 = nunca).
+        """
+        self.detect = detect or (lambda projection: locate_fins(projection)[0])
+        self.position_alpha = position_alpha
+        self.count_alpha = count_alpha
+        self.search_fraction = search_fraction
+        self.min_match_ratio = min_match_ratio
+        self.redetect_every = redetect_every
+        # Contadores (para diagnóstico)
+        self.full_detections = 0
+        self.tracked_frames = 0
+        self.reset()
+
+    def reset(self, key=None):
+        """Olvida el estado (nuevo ROI, zoom, método...)."""
+        self.key = key
+        self.positions = None   # Posiciones suavizadas (float)
+        self.pitch = None       # Paso suavizado (px)
+        self.count = None       # Conteo suavizado (float)
+        self._width = None
+        self._since_detection = 0
+
+    def update(self, projection, key=None):
+        """
+        Procesa la proyección del frame actual.
+        :param projection: Proyección horizontal del ROI.
+        :param key: Identidad de la configuración; si cambia, se reinicia el seguimiento.
+        :return: (posiciones suavizadas, conteo suavizado redondeado).
+        """
+        p = np.asarray(projection, dtype=np.float64)
+        if key != self.key or p.size != self._width:
+            self.reset(key)
+            self._width = p.size
+
+        measured = None
+        if self.positions is not None and self.positions.size > 0 and \
+                (not self.redetect_every or self._since_detection < self.redetect_every):
+            measured = self._track(p)
+        if measured is None:
+            self._full_detection(p)
+        else:
+            self.tracked_frames += 1
+            self._since_detection += 1
+
+        return self.positions, int(round(self.count))
+
+    def _full_detection(self, p):
+        """Detección completa: reemplaza las posiciones y sigue suavizando el conteo y el paso."""
+        positions = np.asarray(self.detect(p), dtype=np.float64)
+        self.full_detections += 1
+        self._since_detection = 0
+        self.positions = positions
+        self._smooth_count(positions.size)
+        if positions.size > 1:
+            self._smooth_pitch(float(np.median(np.diff(positions))))
+
+    def _track(self, p):
+        """
+        Busca cada aleta en +-radio de su posición anterior (una fila de ventana por aleta).
+        :return: Posiciones medidas, o None si el emparejamiento falla.
+        """
+        previous = self.positions
+        pitch = self.pitch if self.pitch else (p.size / max(1, previous.size))
+        radius = max(2, int(pitch * self.search_fraction))
+        offsets = np.arange(-radius, radius + 1)
+
+        centers = np.round(previous).astype(np.intp)
+        windows = np.clip(centers[:, None] + offsets[None, :], 0, p.size - 1)
+        best = windows[np.arange(windows.shape[0]), np.argmax(p[windows], axis=1)]
+
+        # Solo cuenta como encontrada si es un máximo local interior por encima del promedio
+        left = p[np.maximum(best - 1, 0)]
+        right = p[np.minimum(best + 1, p.size - 1)]
+        found = (best > 0) & (best < p.size - 1) & (p[best] > left) & (p[best] >= right) & (p[best] > p.mean())
+        if found.sum() < self.min_match_ratio * previous.size:
+            return None
+
+        measured = refine_peaks_subpixel(p, best)
+        # EMA de las aletas encontradas; las no encontradas conservan su posición anterior
+        alpha = self.position_alpha
+        self.positions = np.where(found, (1 - alpha) * previous + alpha * measured, previous)
+        self._smooth_count(int(found.sum()))
+        if measured.size > 1 and found.all():
+            self._smooth_pitch(float(np.median(np.diff(measured))))
+        return measured
+
+    def _smooth_count(self, count):
+        if self.count is None:
+            self.count = float(count)
+        else:
+            self.count += self.count_alpha * (count - self.count)
+
+    def _smooth_pitch(self, pitch):
+        if self.pitch is None:
+            self.pitch = pitch
+        else:
+            self.pitch += self.position_alpha * (pitch - self.pitch)
+
+def draw_peak_lines(roi_img, peaks):
+    """
+    Dibuja una línea vertical roja por cada pico sobre una copia BGR del ROI.
+    :return: Imagen BGR anotada.
+    """
+    if len(roi_img.shape) == 3:
+        display_roi = roi_img.copy() # Copia a color para dibujar líneas rojas
+    else:
+        # Convertir a BGR para poder dibujar líneas rojas sobre gris
+        display_roi = cv2.cvtColor(roi_img, cv2.COLOR_GRAY2BGR)
+
+    h = display_roi.shape[0]
+    for x_pos in peaks:
+        # (x_pos, 0) es el punto superior, (x_pos, h) es el inferior
+        x_pos = int(round(x_pos))
+        cv2.line(display_roi, (x_pos, 0), (x_pos, h), (0, 0, 255), 1)
+    return display_roi
+
+def detect_fins(projection, method="fft", distance=DEFAULT_PEAK_DISTANCE):
+    """
+    Detección completa de aletas sobre una proyección con el método indicado.
+    :param method: "fft" (paso por FFT, sub-píxel) o "find_peaks" (distancia mínima fija).
+    :param distance: Distancia mínima entre picos (solo "find_peaks").
+    :return: (picos, paso en píxeles o None)
+    """
+    if method == "fft":
+        # El paso se estima de la propia proyección: no depende del zoom ni de la escala
+        peaks, estimate = locate_fins(projection)
+        return peaks, estimate.pitch if estimate is not None else None
+    return detect_fin_peaks(projection, distance), None
+
+def analyze_fins(roi_img, distance=DEFAULT_PEAK_DISTANCE, method="find_peaks"):
+    """
+    Análisis completo de un ROI ya procesado: proyección + picos.
+    :param distance: Distancia mínima entre picos (solo método "find_peaks").
+    :param method: "find_peaks" (índices enteros) o "fft" (paso por FFT, posiciones sub-píxel).
+    :return: (proyección, picos)
+    """
+    projection = compute_projection(roi_img)
+    if method == "fft":
+        positions, _ = locate_fins(projection)
+        return projection, positions
+    return projection, detect_fin_peaks(projection, distance)
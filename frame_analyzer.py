@@ -0,0 +1,183 @@
+"""
+Análisis completo de un frame de cámara sin dependencias de Qt.
+
+FrameAnalyzer reúne lo que la GUI hacía por frame (vista del panel central, ROI
+procesado, aletas seguidas entre frames y análisis por franjas) para poder correrlo
+en un hilo de procesamiento (ProcessingWorker) o en un proceso sin interfaz. Los
+parámetros llegan como una instantánea inmutable (ProcessingParams): el hilo que
+procesa nunca lee el estado de la ventana mientras el usuario lo modifica.
+"""
+import time
+from collections import namedtuple
+
+from fin_analysis import (
+    DEFAULT_PEAK_DISTANCE, FinTracker, ProjectionIndex, analyze_rois, compute_projection, detect_fins,
+    draw_peak_lines
+)
+from image_processing import FramePipeline, pyramid_levels, scale_roi_coords
+
+# Instantánea de los parámetros del pipeline.
+# heavy: argumentos de process_roi_heavy() después de la imagen (brillo, contraste, ...).
+# roi / extra_rois: coordenadas (x1, y1, x2, y2) de la vista con zoom; extra_rois es una tupla.
+# full_view: con roi=None, analizar la vista con zoom completa (daemon); la GUI lo deja en
+#            False y sin ROI no se procesa nada.
+# view_size: (ancho, alto) del panel central, o None para no generar la vista.
+# track: seguir las aletas entre frames (video) en lugar de re-detectarlas.
+# preview: slider arrastrándose; el ROI se procesa sobre la copia reducida por pirámide
+#          (lado mayor <= preview_max_side), igual que la vista previa con imágenes.
+ProcessingParams = namedtuple(
+    "ProcessingParams",
+    ["zoom", "heavy", "roi", "extra_rois", "bands", "peak_method", "view_size", "track", "preview_max_side",
+     "preview", "full_view"],
+    defaults=(1.0, (), None, (), 1, "fft", None, True, 960, False, False),
+)
+
+# Resultado de un frame. Las imágenes son propias del resultado (no buffers del pipeline).
+# peaks / pitch / band_results en píxeles de la vista a resolución completa.
+ProcessingResult = namedtuple(
+    "ProcessingResult",
+    ["frame_id", "frame", "view_size", "view_image", "roi_image", "peaks", "count", "pitch",
+     "band_results", "process_ms", "params"],
+)
+
+
+class FrameAnalyzer:
+    """
+    Procesa frames con buffers preasignados y estado de seguimiento propios.
+    No es seguro compartirlo entre hilos: cada hilo de procesamiento tiene el suyo.
+    """
+    def __init__(self):
+        self.pipeline = FramePipeline()        # Vista del panel central + ROI
+        self.index_pipeline = FramePipeline()  # Vista completa para el índice de proyección
+        self.projection_index = ProjectionIndex()
+        self.tracker = None
+        self.tracker_method = None # (método de picos, distancia) de la detección completa del tracker
+
+    def _tracker_for(self, peak_method, distance=DEFAULT_PEAK_DISTANCE):
+        """FinTracker cuya detección completa usa 'peak_method' (se recrea si el método o la distancia cambian)."""
+        if self.tracker is None or self.tracker_method != (peak_method, distance):
+            self.tracker = FinTracker(detect=lambda proj: detect_fins(proj, peak_method, distance)[0])
+            self.tracker_method = (peak_method, distance)
+        return self.tracker
+
+    def reset(self):
+        """Olvida el seguimiento (ej. al cambiar de cámara)."""
+        if self.tracker is not None:
+            self.tracker.reset()
+
+    def analyze(self, frame, params, frame_id=None):
+        """
+        :param frame: Frame BGR (o gris) de la cámara.
+        :param params: ProcessingParams.
+        :return: ProcessingResult.
+        """
+        start = time.perf_counter()
+        h, w = frame.shape[:2]
+        view_size = (w, h)
+
+        # Copia reducida por pirámide: la usan las franjas y, en vista previa, el ROI
+        reduced = None
+        if params.preview or self._has_bands(params):
+            reduced = self._reduced_source(frame, params, view_size)
+
+        roi_image, peaks, count, pitch = self._analyze_roi(
+            frame, params, view_size, reduced if params.preview else None)
+        band_results = self._analyze_bands(params, view_size, reduced) if self._has_bands(params) else []
+
+        view_image = None
+        if params.view_size is not None:
+            # Copia: el buffer del pipeline se sobrescribe con el siguiente frame
+            view_image = self.pipeline.zoomed_view(frame, params.zoom, params.view_size).copy()
+
+        return ProcessingResult(
+            frame_id, frame, view_size, view_image, roi_image, peaks, count, pitch, band_results,
+            (time.perf_counter() - start) * 1000, params
+        )
+
+    def _reduced_source(self, frame, params, view_size):
+        """
+        Frame reducido por pirámide hasta que el lado mayor quede <= preview_max_side.
+        :return: (imagen, escala respecto a la vista a resolución completa)
+        """
+        w, h = view_size
+        levels = pyramid_levels(w, h, params.preview_max_side)
+        if not levels:
+            return frame, 1.0
+        source = self.index_pipeline.pyramid_down(frame, levels)
+        return source, source.shape[1] / w
+
+    def _analyze_roi(self, frame, params, view_size, reduced=None):
+        """
+        ROI principal: recorte con zoom + procesamiento pesado + aletas (seguidas o detectadas).
+        Sin ROI solo se analiza la vista con zoom completa si params.full_view.
+        :param reduced: (imagen, escala) de la copia reducida para la vista previa, o None.
+        """
+        w, h = view_size
+        if params.roi is not None:
+            x1, y1, x2, y2 = params.roi
+        elif params.full_view:
+            x1, y1, x2, y2 = 0, 0, w, h
+        else:
+            return None, None, 0, None
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w, x2), min(h, y2)
+        if x2 <= x1 or y2 <= y1:
+            return None, None, 0, None
+
+        roi_coords = (x1, y1, x2, y2)
+        source, scale = reduced if reduced is not None else (frame, 1.0)
+        scaled_coords = scale_roi_coords(roi_coords, scale) if scale != 1.0 else roi_coords
+        raw_roi = self.pipeline.zoomed_roi(source, params.zoom, scaled_coords)
+        processed_roi = self.pipeline.process_roi_heavy(raw_roi, *params.heavy)
+        if processed_roi.size == 0:
+            return None, None, 0, None
+
+        projection = compute_projection(processed_roi)
+        # La distancia mínima fija (solo find_peaks) se ajusta a la escala
+        distance = max(1, int(round(DEFAULT_PEAK_DISTANCE * scale)))
+        if params.track:
+            # Mismo ROI/zoom/método/escala que el frame anterior: se sigue; si no, se reinicia
+            tracker = self._tracker_for(params.peak_method, distance)
+            key = (roi_coords, params.zoom, params.peak_method, scale)
+            peaks, count = tracker.update(projection, key)
+            pitch = tracker.pitch
+        else:
+            peaks, pitch = detect_fins(projection, params.peak_method, distance)
+            count = len(peaks)
+        # draw_peak_lines devuelve una imagen nueva: no comparte el buffer del pipeline
+        roi_image = draw_peak_lines(processed_roi, peaks)
+        if scale != 1.0:
+            # Picos y paso en píxeles de resolución completa
+            peaks = peaks / scale
+            pitch = pitch / scale if pitch else pitch
+        return roi_image, peaks, count, pitch
+
+    @staticmethod
+    def _has_bands(params):
+        """True si hay más de un ROI o más de una franja (análisis por lotes)."""
+        rois = (1 if params.roi is not None else 0) + len(params.extra_rois)
+        return rois > 1 or (rois == 1 and params.bands > 1)
+
+    def _analyze_bands(self, params, view_size, reduced):
+        """
+        Todos los ROIs en franjas, por lotes sobre el índice de proyección de la vista
+        completa reducida por pirámide (igual que la GUI con cámara).
+        :param reduced: (imagen, escala) de la copia reducida (ver _reduced_source).
+        """
+        rois = ([params.roi] if params.roi is not None else []) + list(params.extra_rois)
+        w, h = view_size
+        source, scale = reduced
+        view_coords = scale_roi_coords((0, 0, w, h), scale) if scale != 1.0 else (0, 0, w, h)
+
+        raw_view = self.index_pipeline.zoomed_roi(source, params.zoom, view_coords)
+        processed = self.index_pipeline.process_roi_heavy(raw_view, *params.heavy)
+        self.projection_index.build(processed)
+
+        scaled = [scale_roi_coords(roi, scale) for roi in rois] if scale != 1.0 else rois
+        results = analyze_rois(self.projection_index, scaled, params.bands)
+        if scale == 1.0:
+            return results
+        return [
+            r._replace(peaks=r.peaks / scale, pitch=r.pitch / scale, pitch_variance=r.pitch_variance / scale ** 2)
+            for r in results
+        ]
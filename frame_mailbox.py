@@ -0,0 +1,73 @@
+import threading
+import time
+
+
+class FrameMailbox:
+    """
+    Buzón de un solo lugar entre el hilo de captura y el consumidor (GUI): gana el
+    frame más reciente. Si el consumidor no alcanza, el frame viejo se reemplaza y se
+    cuenta como descartado, así la latencia queda acotada a un frame en espera sin
+    importar la carga de procesamiento. No depende de Qt.
+    """
+    def __init__(self, on_drop=None):
+        """
+        :param on_drop: Función opcional on_drop(frame) llamada con cada frame descartado
+                        (fuera del candado), ej. para devolver su buffer a un pool.
+        """
+        self._lock = threading.Lock()
+        self._filled = threading.Condition(self._lock)
+        self._frame = None
+        self._timestamp = None
+        self.on_drop = on_drop
+        self.posted = 0     # Frames depositados
+        self.delivered = 0  # Frames entregados al consumidor
+        self.dropped = 0    # Frames reemplazados antes de ser leídos
+
+    def put(self, frame):
+        """
+        Deposita un frame (reemplaza al que no se haya leído).
+        :return: True si el buzón estaba vacío: solo entonces hay que avisar al consumidor,
+                 así nunca hay más de un aviso pendiente en la cola de eventos.
+        """
+        with self._lock:
+            stale = self._frame
+            self._frame = frame
+            self._timestamp = time.perf_counter()
+            self.posted += 1
+            if stale is not None:
+                self.dropped += 1
+            self._filled.notify()
+        if stale is not None and self.on_drop is not None:
+            self.on_drop(stale)
+        return stale is None
+
+    def take(self, timeout=0.0):
+        """
+        Retira el frame más reciente.
+        :param timeout: Segundos a esperar si está vacío (0 = no esperar; para hilos consumidores).
+        :return: (frame, segundos en espera) o (None, None) si está vacío.
+        """
+        with self._lock:
+            if self._frame is None and timeout > 0:
+                self._filled.wait(timeout)
+            frame, timestamp = self._frame, self._timestamp
+            self._frame = self._timestamp = None
+            if frame is not None:
+                self.delivered += 1
+        if frame is None:
+            return None, None
+        return frame, time.perf_counter() - timestamp
+
+    def clear(self):
+        """Vacía el buzón (el frame pendiente cuenta como descartado)."""
+        with self._lock:
+            stale = self._frame
+            self._frame = self._timestamp = None
+            if stale is not None:
+                self.dropped += 1
+        if stale is not None and self.on_drop is not None:
+            self.on_drop(stale)
+
+    def stats(self):
+        with self._lock:
+            return {"posted": self.posted, "delivered": self.delivered, "dropped": self.dropped}
@@ -0,0 +1,94 @@
+import threading
+
+
+class FramePool:
+    """
+    Pool de buffers de frame reciclados (sin Qt): la captura lee dentro de un buffer
+    libre con cap.read(image=buf) y los consumidores lo devuelven al terminar, así en
+    estado estable no se asigna memoria por frame.
+
+    Un frame puede estar en varias manos a la vez (buzón, hilo de procesamiento,
+    resultado mostrado en la GUI), por eso cada buffer lleva un contador de referencias:
+    retain() por cada dueño adicional y release() cuando cada uno termina. Vuelve a la
+    lista libre al llegar a cero. Los arrays que no son del pool se ignoran.
+    """
+    def __init__(self, capacity=8):
+        """
+        :param capacity: Número máximo de buffers del pool. Si todos están ocupados la
+                         captura lee en un array nuevo que no se recicla (cuenta en 'overflow').
+        """
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._free = []
+        self._refs = {}  # id(buffer) -> [buffer, referencias]
+        self.shape = None
+        self.dtype = None
+        self.allocated = 0  # Buffers creados para el pool
+        self.reused = 0     # Lecturas hechas sobre un buffer reciclado
+        self.overflow = 0   # Frames fuera del pool (pool agotado)
+
+    def acquire(self):
+        """
+        :return: Buffer libre (con una referencia, la del llamador) o None si no hay;
+                 con None cap.read() asigna uno nuevo y adopt() lo incorpora.
+        """
+        with self._lock:
+            if not self._free:
+                return None
+            buf = self._free.pop()
+            self._refs[id(buf)][1] = 1
+            return buf
+
+    def adopt(self, frame, buf=None):
+        """
+        Registra el frame que devolvió cap.read(image=buf). Si el driver no pudo usar
+        'buf' (primer frame, cambio de resolución) se devuelve 'buf' y se incorpora el nuevo.
+        :return: El frame (con una referencia, la del llamador).
+        """
+        if frame is buf:
+            with self._lock:
+                self.reused += 1
+            return frame
+        if buf is not None:
+            self.release(buf)
+        with self._lock:
+            if frame.shape != self.shape or frame.dtype != self.dtype:
+                # Nueva resolución: los buffers viejos dejan de reciclarse
+                self.shape, self.dtype = frame.shape, frame.dtype
+                self._free = []
+                self._refs = {}
+            if len(self._refs) < self.capacity:
+                self._refs[id(frame)] = [frame, 1]
+                self.allocated += 1
+            else:
+                self.overflow += 1
+        return frame
+
+    def retain(self, frame):
+        """Agrega un dueño al frame (ej. un resultado que lo conserva)."""
+        with self._lock:
+            entry = self._refs.get(id(frame))
+            if entry is not None and entry[0] is frame:
+                entry[1] += 1
+
+    def release(self, frame):
+        """Un dueño terminó con el frame; al quedar sin dueños vuelve a la lista libre."""
+        if frame is None:
+            return
+        with self._lock:
+            entry = self._refs.get(id(frame))
+            if entry is None or entry[0] is not frame or entry[1] <= 0:
+                return
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._free.append(frame)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pool_allocated": self.allocated,
+                "pool_free": len(self._free),
+                "pool_in_use": len(self._refs) - len(self._free),
+                "pool_reused": self.reused,
+                "pool_overflow": self.overflow,
+            }
@@ -0,0 +1,172 @@
+"""
+Grabación asíncrona de frames (evidencia de la inspección), sin dependencias de Qt.
+
+Los frames se encolan en una cola acotada y un hilo escritor los codifica con
+cv2.VideoWriter (segmentos .avi) o como secuencia JPEG. Quien graba nunca espera:
+si la cola está llena se aplica la política de descarte y se cuenta. La codificación
+de OpenCV libera el GIL, así que un hilo basta para no frenar la captura. Detener
+tampoco espera: el hilo escritor vacía la cola, cierra los archivos y avisa con on_finished.
+"""
+import os
+import queue
+import threading
+
+import cv2
+
+RECORD_FORMATS = ("avi", "jpeg")
+# "oldest": se descarta el frame más viejo de la cola (la grabación sigue al presente)
+# "newest": se descarta el frame que llega (la grabación conserva la secuencia ya encolada)
+DROP_POLICIES = ("oldest", "newest")
+
+
+class FrameRecorder:
+    """
+    Grabador en segundo plano. Uso: start(), submit(frame) por cada frame y stop().
+    """
+    def __init__(self, directory, fmt="avi", fps=30.0, fourcc="MJPG", queue_size=32,
+                 drop_policy="oldest", jpeg_quality=90, on_finished=None):
+        """
+        :param directory: Directorio de salida (se crea al iniciar).
+        :param fmt: "avi" (cv2.VideoWriter) o "jpeg" (un archivo por frame).
+        :param fps: FPS declarado en el video.
+        :param fourcc: Códec del video (solo "avi").
+        :param queue_size: Frames en espera como máximo (acota la memoria).
+        :param drop_policy: Qué frame se descarta con la cola llena (ver DROP_POLICIES).
+        :param jpeg_quality: Calidad JPEG (0 a 100, solo "jpeg").
+        :param on_finished: Función on_finished(recorder) que se llama desde el hilo escritor
+                            cuando, tras stop(), ya se escribió todo y los archivos están cerrados.
+        """
+        if fmt not in RECORD_FORMATS:
+            raise ValueError(f"Formato de grabación desconocido: {fmt}")
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Política de descarte desconocida: {drop_policy}")
+        self.directory = directory
+        self.fmt = fmt
+        self.fps = fps
+        self.fourcc = fourcc
+        self.drop_policy = drop_policy
+        self.jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]
+        self.on_finished = on_finished
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._writer = None
+        self._size = None
+        self.segments = 0   # Archivos de video abiertos (uno nuevo si cambia el tamaño)
+        self.submitted = 0  # Frames aceptados en la cola
+        self.written = 0    # Frames escritos
+        self.dropped = 0    # Frames descartados por la cola llena
+        self.errors = 0     # Frames que no se pudieron escribir
+
+    @property
+    def running(self):
+        """True mientras acepta frames (iniciado y sin stop())."""
+        return self._thread is not None and self._thread.is_alive() and not self._stopping.is_set()
+
+    @property
+    def finished(self):
+        """True cuando el hilo escritor terminó (todo escrito y los archivos cerrados)."""
+        return self._thread is not None and not self._thread.is_alive()
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="FrameRecorder", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame, copy=True):
+        """
+        Encola un frame sin bloquear nunca.
+        :param copy: Copiar el frame (obligatorio si su buffer se recicla, ej. FramePool).
+        :return: True si el frame quedó en la cola.
+        """
+        if not self.running:
+            return False
+        if self._queue.full():
+            if self.drop_policy == "newest":
+                self.dropped += 1 # Se descarta antes de copiar: no se gasta la copia
+                return False
+            # "oldest": se libera un lugar descartando el frame más viejo
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+        # Solo se copia el frame que entra en la cola (un solo productor: el lugar sigue libre)
+        item = frame.copy() if copy else frame
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def stop(self):
+        """
+        Deja de aceptar frames y vuelve de inmediato (nunca bloquea): el hilo escritor
+        termina lo encolado, cierra los archivos y llama a on_finished.
+        """
+        self._stopping.set()
+
+    def wait(self, timeout=None):
+        """
+        Espera a que el hilo escritor termine (ej. al cerrar la aplicación, para no
+        dejar un video sin cerrar). :return: True si terminó.
+        """
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _run(self):
+        try:
+            while True:
+                try:
+                    frame = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    if self._stopping.is_set():
+                        break # Cola vacía tras stop(): todo escrito
+                    continue
+                try:
+                    self._write(frame)
+                    self.written += 1
+                except (cv2.error, OSError) as e:
+                    self.errors += 1
+                    print(f"Advertencia: no se pudo grabar el frame. {e}")
+        finally:
+            if self._writer is not None:
+                self._writer.release()
+                self._writer = None
+            if self.on_finished is not None:
+                self.on_finished(self)
+
+    def _write(self, frame):
+        if self.fmt == "jpeg":
+            path = os.path.join(self.directory, f"frame_{self.written:06d}.jpg")
+            if not cv2.imwrite(path, frame, self.jpeg_params):
+                raise OSError(f"cv2.imwrite falló: {path}")
+            return
+
+        h, w = frame.shape[:2]
+        if self._writer is None or self._size != (w, h):
+            # Primer frame o cambio de tamaño (ej. nuevo ROI): nuevo segmento de video
+            if self._writer is not None:
+                self._writer.release()
+            path = os.path.join(self.directory, f"segment_{self.segments:03d}.avi")
+            self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps,
+                                           (w, h), len(frame.shape) == 3)
+            if not self._writer.isOpened():
+                self._writer = None
+                raise OSError(f"No se pudo abrir el video {path}")
+            self._size = (w, h)
+            self.segments += 1
+        self._writer.write(frame)
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "queued": self._queue.qsize(),
+        }
@@ -0,0 +1,22 @@
+"""
+Listado de archivos de imagen (compartido por el conteo por lotes y las fuentes de reproducción).
+"""
+import glob
+import os
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".jfif", ".tif", ".tiff")
+
+def collect_images(inputs, recursive=False):
+    """
+    Expande directorios y patrones glob a una lista ordenada de imágenes.
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = glob.glob(pattern, recursive=recursive)
+        else:
+            candidates = glob.glob(item, recursive=recursive)
+        paths.extend(p for p in candidates
+                     if os.path.isfile(p) and p.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(set(paths))
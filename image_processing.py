@@ -1,5 +1,6 @@
 import cv2
 import numpy as np
+from collections import namedtuple
 
 def apply_brightness(image, value):
     """
@@ -22,12 +23,124 @@ def apply_lightness_and_contrast(image, brightness_value, contrast_factor):
     # Alpha controla el contraste, Beta controla el brillo/iluminación
     return cv2.convertScaleAbs(image, alpha=(contrast_factor), beta=brightness_value)
 
-def apply_histogram_equalization(image):
+class FrameBuffers:
+    """
+    Buffers de salida preasignados, uno por nombre de etapa.
+    Un buffer SOLO se reasigna cuando cambia la forma (tamaño del frame/ROI) o el tipo.
+    """
+    def __init__(self):
+        self._buffers = {}
+        self.allocations = 0  # Contador de reasignaciones (para medir la rotación de memoria)
+
+    def get(self, name, shape, dtype=np.uint8):
+        """Devuelve el buffer 'name' con la forma y tipo pedidos (lo reasigna si no coincide)."""
+        # Se separa por número de canales y tipo: alternar gris/BGR en una etapa
+        # no debe reasignar; solo un cambio de tamaño del frame lo hace.
+        key = (name, len(shape), np.dtype(dtype))
+        buf = self._buffers.get(key)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype)
+            self._buffers[key] = buf
+            self.allocations += 1
+        return buf
+
+def _dst(buffers, name, shape, dtype=np.uint8):
+    """Buffer destino para el parámetro dst= de OpenCV (None = OpenCV asigna uno nuevo)."""
+    if buffers is None:
+        return None
+    return buffers.get(name, tuple(shape), dtype)
+
+def is_gray(image):
+    """True si la imagen es de un solo canal."""
+    return len(image.shape) == 2
+
+def _to_gray(image, buffers=None, name="gray"):
+    """
+    Devuelve la imagen en gris (1 canal). Si ya es gris se devuelve tal cual,
+    sin conversión ni copia: una vez en gris, el pipeline se queda en 1 canal.
+    """
+    if is_gray(image):
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=_dst(buffers, name, image.shape[:2]))
+
+# Tablas compiladas de las operaciones puntuales (256 entradas cada una)
+PointTables = namedtuple("PointTables", ["contrast", "threshold", "fused"])
+
+class PointOperationLUT:
+    """
+    Motor de operaciones puntuales compiladas.
+    Compila brillo (beta), contraste (alpha) y umbral en tablas de 256 entradas
+    y SOLO las reconstruye cuando cambian los parámetros.
+    """
+    def __init__(self):
+        # Se guarda (parámetros, tablas) en una sola tupla para que otro hilo
+        # nunca lea tablas de una combinación distinta a la de sus parámetros.
+        self._compiled = None
+
+    def tables(self, brightness_value, contrast_factor, threshold_active, thresh_value, thresh_type):
+        """
+        Devuelve las tablas para los parámetros dados (reutiliza las anteriores si no cambiaron).
+        :return: PointTables(contrast, threshold, fused). 'threshold' es None si el umbral no está activo.
+        """
+        params = (brightness_value, float(contrast_factor), bool(threshold_active), thresh_value, thresh_type)
+        compiled = self._compiled
+        if compiled is not None and compiled[0] == params:
+            return compiled[1]
+
+        # Evaluamos las MISMAS funciones de OpenCV sobre la rampa 0..255,
+        # así cada tabla reproduce bit a bit a convertScaleAbs / threshold.
+        ramp = np.arange(256, dtype=np.uint8)
+        contrast_lut = cv2.convertScaleAbs(ramp, alpha=contrast_factor, beta=brightness_value).ravel()
+
+        if threshold_active:
+            _, threshold_lut = cv2.threshold(ramp, thresh_value, 255, thresh_type)
+            threshold_lut = threshold_lut.ravel()
+            # Composición: umbral(contraste(x)) en una sola tabla
+            fused_lut = threshold_lut[contrast_lut]
+        else:
+            threshold_lut = None
+            fused_lut = contrast_lut
+
+        tables = PointTables(contrast_lut, threshold_lut, fused_lut)
+        self._compiled = (params, tables)
+        return tables
+
+# Motor compartido por las funciones de este módulo
+_default_point_lut = PointOperationLUT()
+
+def apply_point_operations(image, brightness_value, contrast_factor, threshold_active,
+                           thresh_value, thresh_type, point_lut=None, buffers=None):
+    """
+    Aplica brillo, contraste y (opcionalmente) umbral con tablas cv2.LUT.
+    En gris es UNA sola pasada (tabla fusionada). En color con umbral se conserva el
+    orden original: contraste en BGR, gris y luego umbral. Pasar a gris antes del
+    contraste no es equivalente: convertScaleAbs toma el valor absoluto y redondea por
+    canal, y con brillo negativo o contraste alto cambia una fracción grande de píxeles.
+    :param image: Matriz de imagen (BGR o gris).
+    :param point_lut: Motor PointOperationLUT (por defecto el compartido del módulo).
+    :param buffers: FrameBuffers opcional para escribir sin asignar memoria.
+    :return: Imagen ajustada (BGR/gris) o imagen binaria en gris si el umbral está activo.
+    """
+    if point_lut is None:
+        point_lut = _default_point_lut
+    tables = point_lut.tables(brightness_value, contrast_factor, threshold_active, thresh_value, thresh_type)
+
+    if threshold_active:
+        if not is_gray(image):
+            image = cv2.LUT(image, tables.contrast, dst=_dst(buffers, "point_color", image.shape))
+            image = _to_gray(image, buffers, "point_gray")
+            return cv2.LUT(image, tables.threshold, dst=_dst(buffers, "point", image.shape))
+        return cv2.LUT(image, tables.fused, dst=_dst(buffers, "point", image.shape))
+
+    return cv2.LUT(image, tables.contrast, dst=_dst(buffers, "point", image.shape))
+
+def apply_histogram_equalization(image, buffers=None):
     """
     Ecualización de Histograma: Mejora el contraste global.
-    Se aplica al canal Y (luminancia) en el espacio de color YUV para imágenes a color.
-    :param image: Matriz de imagen (BGR).
-    :return: Imagen con histograma ecualizado.
+    Se aplica sobre la luminancia (gris); el resultado se queda en 1 canal.
+    :param image: Matriz de imagen (BGR o gris).
+    :param buffers: FrameBuffers opcional para escribir sin asignar memoria.
+    :return: Imagen en gris con histograma ecualizado.
     """
     """img_yuv = cv2.cvtColor(image, cv2.COLOR_BGR2YUV)
     
@@ -46,142 +159,372 @@ def apply_histogram_equalization(image):
     result_img = cv2.cvtColor(img_yuv, cv2.COLOR_YUV2BGR)
 
     return cv2.cvtColor(result_img, cv2.COLOR_YUV2BGR)"""
-    gray_img = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    result_gray = cv2.equalizeHist(gray_img)
-    return cv2.cvtColor(result_gray, cv2.COLOR_GRAY2BGR) 
+    gray_img = _to_gray(image, buffers, "equalize_gray")
+    return cv2.equalizeHist(gray_img, dst=_dst(buffers, "equalize", gray_img.shape))
 
-def apply_mask(image, mask_type):
+# Tipos de máscara/filtro soportados por apply_mask
+MASK_TYPES = (
+    "Ninguna",
+    "Escala de Grises",
+    "Filtro Pasa Bajos (Averaging)",
+    "Filtro Pasa Altos (Laplaciano)",
+    "Filtro Gaussiano",
+    "Detección de Bordes (Canny)",
+)
+
+# Operaciones morfológicas disponibles
+MORPH_ERODE_DILATE = "Erosión + Dilatación"
+MORPH_MODES = (MORPH_ERODE_DILATE, "Apertura", "Cierre", "Top-Hat", "Black-Hat")
+_MORPH_EX_OPS = {
+    "Apertura": cv2.MORPH_OPEN,
+    "Cierre": cv2.MORPH_CLOSE,
+    "Top-Hat": cv2.MORPH_TOPHAT,
+    "Black-Hat": cv2.MORPH_BLACKHAT,
+}
+
+# Formas del elemento estructurante
+MORPH_SHAPES = {
+    "Rectángulo": cv2.MORPH_RECT,
+    "Elipse": cv2.MORPH_ELLIPSE,
+    "Cruz": cv2.MORPH_CROSS,
+}
+
+def apply_mask(image, mask_type, buffers=None):
     """
     Aplica diferentes filtros (máscaras) a la imagen.
-    :param image: Matriz de imagen (BGR).
+    :param image: Matriz de imagen (BGR o gris).
     :param mask_type: Tipo de filtro ('Escala de Grises', 'Filtro Gaussiano', 'Detección de Bordes (Canny)').
-    :return: Imagen procesada (o None si el tipo no es reconocido).
+    :param buffers: FrameBuffers opcional para escribir sin asignar memoria.
+    :return: Imagen procesada. Gris, Laplaciano y Canny devuelven 1 canal; los suavizados
+             conservan los canales de la entrada. Con "Ninguna" se devuelve la MISMA imagen (sin copia).
     """
-    processed_img = image.copy()
+    processed_img = image
+    gray_shape = image.shape[:2]
     
     if mask_type == "Escala de Grises":
-        processed_img = cv2.cvtColor(processed_img, cv2.COLOR_BGR2GRAY)
-        # Convertir a BGR de nuevo para consistencia en la visualización
-        processed_img = cv2.cvtColor(processed_img, cv2.COLOR_GRAY2BGR) 
+        # Se queda en 1 canal; la expansión a BGR se hace solo al mostrar
+        processed_img = _to_gray(image, buffers, "mask")
 
     elif mask_type == "Filtro Pasa Bajos (Averaging)":
         # ¡Nuevo!: Filtro de media (Averaging), elimina ruido y suaviza (Desenfoque).
-        processed_img = cv2.blur(processed_img, (7, 7)) # Kernel 7x7
+        processed_img = cv2.blur(image, (7, 7), dst=_dst(buffers, "mask", image.shape)) # Kernel 7x7
         
     elif mask_type == "Filtro Pasa Altos (Laplaciano)":
         # ¡Nuevo!: Filtro Laplaciano, resalta bordes y transiciones rápidas (Afilado).
         
         # 1. Convertir a escala de grises
-        gray = cv2.cvtColor(processed_img, cv2.COLOR_BGR2GRAY)
-        # 2. Aplicar Laplaciano
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        # 3. Convertir de vuelta a 8-bit y BGR para visualización
-        laplacian_8bit = cv2.convertScaleAbs(laplacian)
-        processed_img = cv2.cvtColor(laplacian_8bit, cv2.COLOR_GRAY2BGR)
+        gray = _to_gray(image, buffers, "mask_gray")
+        # 2. Aplicar Laplaciano. Con kernel 3x3 sobre uint8 el resultado cabe en int16
+        # (|valor| <= 1020), así que CV_16S da el mismo resultado que CV_64F con 1/4 de memoria.
+        laplacian = cv2.Laplacian(gray, cv2.CV_16S,
+                                  dst=_dst(buffers, "mask_laplacian", gray_shape, np.int16))
+        # 3. Convertir de vuelta a 8-bit (sigue en 1 canal)
+        processed_img = cv2.convertScaleAbs(laplacian, dst=_dst(buffers, "mask", gray_shape))
         
     elif mask_type == "Filtro Gaussiano":
         # Kernel 5x5 para suavizado
-        processed_img = cv2.GaussianBlur(processed_img, (5, 5), 0)
+        processed_img = cv2.GaussianBlur(image, (5, 5), 0, dst=_dst(buffers, "mask", image.shape))
         
     elif mask_type == "Detección de Bordes (Canny)":
-        gray = cv2.cvtColor(processed_img, cv2.COLOR_BGR2GRAY)
-        # Ajustar umbrales según se requiera
-        edges = cv2.Canny(gray, 100, 200) 
-        # Convertir la imagen de bordes a BGR para mostrar
-        processed_img = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
+        gray = _to_gray(image, buffers, "mask_gray")
+        # Ajustar umbrales según se requiera (los bordes se quedan en 1 canal)
+        processed_img = cv2.Canny(gray, 100, 200, edges=_dst(buffers, "mask", gray_shape))
         
     elif mask_type == "Ninguna":
         pass # No hacer nada
 
     return processed_img
 
-def apply_digital_zoom(image, factor):
+def zoom_window(width, height, factor):
+    """
+    Ventana central (en coordenadas de la imagen original) que el zoom digital amplía.
+    :return: (start_x, start_y, ancho, alto) del recorte.
+    """
+    if factor <= 1.0:
+        return 0, 0, width, height
+    new_w = int(width / factor)
+    new_h = int(height / factor)
+    start_x = (width - new_w) // 2
+    start_y = (height - new_h) // 2
+    return start_x, start_y, new_w, new_h
+
+def apply_digital_zoom(image, factor, buffers=None):
     """
     Aplica zoom digital recortando el centro de la imagen y re-escalando.
     :param image: Matriz de imagen (BGR).
     :param factor: Factor de zoom (ej. 1.0, 2.5).
+    :param buffers: FrameBuffers opcional para escribir sin asignar memoria.
     :return: Imagen con zoom aplicado.
     """
     if factor <= 1.0 or image is None:
         return image
     h, w = image.shape[:2]
-    new_w = int(w / factor)
-    new_h = int(h / factor)
-    start_x = (w - new_w) // 2
-    start_y = (h - new_h) // 2
+    start_x, start_y, new_w, new_h = zoom_window(w, h, factor)
     cropped = image[start_y:start_y + new_h, start_x:start_x + new_w]
     
-    return cv2.resize(cropped, (w, h), interpolation=cv2.INTER_LINEAR)
+    return cv2.resize(cropped, (w, h), dst=_dst(buffers, "zoom", image.shape),
+                      interpolation=cv2.INTER_LINEAR)
+
+def extract_zoomed_roi(image, factor, roi_coords, buffers=None):
+    """
+    Obtiene el ROI de la imagen CON zoom directamente desde la imagen original.
+    Zoom y recorte se tratan como una sola transformación afín: solo se remuestrean
+    los píxeles del ROI, sin re-escalar el frame completo.
+    :param image: Imagen original (sin zoom).
+    :param factor: Factor de zoom digital.
+    :param roi_coords: (x1, y1, x2, y2) en coordenadas de la imagen con zoom
+                       (mismo tamaño que la original, igual que apply_digital_zoom).
+    :param buffers: FrameBuffers opcional para escribir sin asignar memoria.
+    :return: ROI (x2-x1 por y2-y1). Sin zoom es una vista de la imagen original (sin copia).
+    """
+    x1, y1, x2, y2 = roi_coords
+    if factor <= 1.0:
+        return image[y1:y2, x1:x2]
+
+    h, w = image.shape[:2]
+    start_x, start_y, new_w, new_h = zoom_window(w, h, factor)
+    cropped = image[start_y:start_y + new_h, start_x:start_x + new_w]
+
+    # Misma correspondencia de píxeles que cv2.resize (centros de píxel):
+    # x_orig = (x_zoom + 0.5) * escala - 0.5, desplazado al inicio del ROI.
+    scale_x = new_w / w
+    scale_y = new_h / h
+    matrix = np.array([
+        [scale_x, 0.0, (x1 + 0.5) * scale_x - 0.5],
+        [0.0, scale_y, (y1 + 0.5) * scale_y - 0.5],
+    ])
+    roi_w, roi_h = x2 - x1, y2 - y1
+    out_shape = (roi_h, roi_w) + image.shape[2:]
+    # BORDER_REPLICATE sobre el recorte reproduce el manejo de bordes de cv2.resize
+    return cv2.warpAffine(cropped, matrix, (roi_w, roi_h),
+                          dst=_dst(buffers, "zoomed_roi", out_shape),
+                          flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                          borderMode=cv2.BORDER_REPLICATE)
+
+def render_zoomed_view(image, factor, target_size, buffers=None):
+    """
+    Imagen para el panel central: la ventana del zoom re-escalada DIRECTAMENTE al
+    tamaño de visualización (conservando la proporción), sin pasar por la resolución completa.
+    :param image: Imagen original (sin zoom).
+    :param factor: Factor de zoom digital.
+    :param target_size: (ancho, alto) disponibles en pantalla.
+    :param buffers: FrameBuffers opcional para escribir sin asignar memoria.
+    :return: Imagen del tamaño de visualización.
+    """
+    h, w = image.shape[:2]
+    start_x, start_y, new_w, new_h = zoom_window(w, h, factor)
+    cropped = image[start_y:start_y + new_h, start_x:start_x + new_w]
+
+    # El zoom muestra la ventana con la proporción del frame completo (w x h)
+    target_w, target_h = target_size
+    scale = min(target_w / w, target_h / h)
+    out_w = max(1, int(round(w * scale)))
+    out_h = max(1, int(round(h * scale)))
+    if (out_w, out_h) == (new_w, new_h):
+        return cropped
+
+    # INTER_AREA al reducir (sin aliasing), bilineal al ampliar
+    interpolation = cv2.INTER_AREA if out_w < new_w else cv2.INTER_LINEAR
+    out_shape = (out_h, out_w) + image.shape[2:]
+    return cv2.resize(cropped, (out_w, out_h), dst=_dst(buffers, "view", out_shape),
+                      interpolation=interpolation)
+
+def fit_to_display(image, target_size, buffers=None, name="display"):
+    """
+    Re-escala la imagen para que quepa en target_size conservando la proporción
+    (equivalente a Qt.KeepAspectRatio, pero con OpenCV y antes de crear el QPixmap).
+    :param target_size: (ancho, alto) del widget.
+    :param buffers: FrameBuffers opcional; 'name' separa el buffer de cada widget.
+    :return: Imagen del tamaño ajustado (la misma imagen si ya tiene ese tamaño).
+    """
+    h, w = image.shape[:2]
+    target_w, target_h = target_size
+    if w == 0 or h == 0 or target_w <= 0 or target_h <= 0:
+        return image
+    scale = min(target_w / w, target_h / h)
+    out_w = max(1, int(round(w * scale)))
+    out_h = max(1, int(round(h * scale)))
+    # Reducción por mitades con INTER_AREA (ruta rápida de OpenCV para factor 2, sin
+    # aliasing) y ajuste final bilineal con factor < 2. INTER_AREA con un factor no
+    # entero grande (ej. 4K -> 800 px) cuesta varias veces más que esto.
+    level = 0
+    while w // 2 >= out_w and h // 2 >= out_h:
+        w, h = w // 2, h // 2
+        half_shape = (h, w) + image.shape[2:]
+        image = cv2.resize(image, (w, h), dst=_dst(buffers, f"{name}_half{level}", half_shape, image.dtype),
+                           interpolation=cv2.INTER_AREA)
+        level += 1
+    if (out_w, out_h) == (w, h):
+        return image
+    out_shape = (out_h, out_w) + image.shape[2:]
+    return cv2.resize(image, (out_w, out_h), dst=_dst(buffers, name, out_shape, image.dtype),
+                      interpolation=cv2.INTER_LINEAR)
+
+def pyramid_levels(width, height, max_side):
+    """Niveles de pirámide (cada uno divide entre 2) para que el lado mayor quede <= max_side."""
+    levels = 0
+    while max(width, height) > max_side:
+        width, height = (width + 1) // 2, (height + 1) // 2
+        levels += 1
+    return levels
+
+def pyramid_downscale(image, levels, buffers=None):
+    """
+    Reduce la imagen 'levels' veces a la mitad con cv2.pyrDown (filtrado gaussiano, sin aliasing).
+    :param buffers: FrameBuffers opcional para escribir sin asignar memoria.
+    """
+    for level in range(levels):
+        h, w = image.shape[:2]
+        shape = ((h + 1) // 2, (w + 1) // 2) + image.shape[2:]
+        image = cv2.pyrDown(image, dst=_dst(buffers, f"pyramid_{level}", shape))
+    return image
+
+def scale_roi_coords(roi_coords, scale):
+    """
+    Escala un ROI (x1, y1, x2, y2) entre resoluciones (ej. a la copia reducida de la vista previa).
+    Se garantiza al menos 1 píxel de ancho y alto.
+    """
+    x1, y1, x2, y2 = roi_coords
+    sx1, sy1 = int(x1 * scale), int(y1 * scale)
+    sx2, sy2 = max(sx1 + 1, int(round(x2 * scale))), max(sy1 + 1, int(round(y2 * scale)))
+    return sx1, sy1, sx2, sy2
 
 def process_roi_heavy(image, brightness, contrast, equalize, mask_type, 
-                     thresh_active, thresh_val, thresh_type, erode, dilate):
+                     thresh_active, thresh_val, thresh_type, erode, dilate,
+                     morph_mode=MORPH_ERODE_DILATE, morph_shape="Rectángulo",
+                     point_lut=None, buffers=None, executor=None):
     """
     Aplica el procesamiento PESADO (Morfología, Filtros, Color).
     Esta función se usará SOLO en el pequeño recorte del ROI.
+    Con 'buffers' cada etapa escribe en su buffer preasignado (ver FramePipeline).
+    Con 'executor' (TiledExecutor) los filtros y la morfología se reparten en franjas
+    entre varios hilos; en ese caso no se usan los buffers para esas etapas.
+    Devuelve 1 canal en cuanto alguna etapa pasa a gris (se expande a BGR solo al mostrar).
     """
     if image is None: return None
     
     # Nota: NO aplicamos zoom aquí, el zoom ya viene aplicado en la imagen de entrada
     
     # 1. Filtros Espaciales
-    processed = apply_mask(image, mask_type)
+    if executor is not None:
+        processed = executor.apply_mask(image, mask_type)
+    else:
+        processed = apply_mask(image, mask_type, buffers=buffers)
     
     # 2. Ecualización
     if equalize:
-        processed = apply_histogram_equalization(processed)
+        processed = apply_histogram_equalization(processed, buffers=buffers)
         
-    # 3. Brillo y Contraste
-    processed = apply_lightness_and_contrast(processed, brightness, contrast)
-    
-    # 4. Umbralización y Morfología (Lo más pesado)
-    processed = apply_threshold_and_morphology(
-        processed, thresh_active, thresh_val, thresh_type, erode, dilate
+    # 3. Brillo, Contraste y Umbral fusionados en una sola pasada (LUT)
+    processed = apply_point_operations(
+        processed, brightness, contrast, thresh_active, thresh_val, thresh_type,
+        point_lut=point_lut, buffers=buffers
     )
     
+    # 4. Morfología (Lo más pesado)
+    if thresh_active:
+        if executor is not None:
+            processed = executor.apply_morphology(processed, erode, dilate, morph_mode, morph_shape)
+        else:
+            processed = apply_morphology(processed, erode, dilate, buffers=buffers,
+                                         mode=morph_mode, shape=morph_shape)
+    
     return processed
 
+# Kernels ya construidos (se crean una sola vez, no en cada frame)
+_morph_kernels = {}
+
+def morphology_kernel(iterations, shape="Rectángulo", centered=False):
+    """
+    Elemento estructurante equivalente a 'iterations' pasadas del kernel 2x2 de unos.
+    N pasadas de un kernel 2x2 (ancla en (1,1)) equivalen a UNA pasada con un kernel
+    (N+1)x(N+1) y ancla en (N,N): mismo resultado, incluidos los bordes.
+    :param iterations: Número de iteraciones equivalentes (>= 1).
+    :param shape: Forma del kernel (ver MORPH_SHAPES).
+    :param centered: Kernel simétrico (2N+1) con ancla central, para apertura/cierre/top-hat.
+    :return: (kernel, ancla)
+    """
+    key = (iterations, shape, centered)
+    cached = _morph_kernels.get(key)
+    if cached is not None:
+        return cached
+
+    if centered:
+        size = 2 * iterations + 1
+        anchor = (iterations, iterations)
+    else:
+        size = iterations + 1
+        anchor = (iterations, iterations)
+    kernel = cv2.getStructuringElement(MORPH_SHAPES[shape], (size, size))
+    _morph_kernels[key] = (kernel, anchor)
+    return kernel, anchor
+
+def morphology_halo(erode_iter, dilate_iter, mode=MORPH_ERODE_DILATE):
+    """Filas de vecindad que necesita apply_morphology (para procesar por franjas)."""
+    if mode == MORPH_ERODE_DILATE:
+        return erode_iter + dilate_iter
+    # Dos operaciones con un kernel centrado de radio N
+    return 2 * max(erode_iter, dilate_iter)
+
+def apply_morphology(binary_img, erode_iter, dilate_iter, buffers=None,
+                     mode=MORPH_ERODE_DILATE, shape="Rectángulo"):
+    """
+    Aplica operaciones morfológicas sobre una imagen binaria (gris) en una sola pasada
+    por operación: las N iteraciones se convierten en un elemento estructurante mayor.
+    :param binary_img: Imagen umbralizada (1 canal).
+    :param erode_iter: Iteraciones de erosión.
+    :param dilate_iter: Iteraciones de dilatación.
+    :param buffers: FrameBuffers opcional para escribir sin asignar memoria.
+    :param mode: "Erosión + Dilatación" (erosión y luego dilatación) o un modo compuesto
+                 (Apertura, Cierre, Top-Hat, Black-Hat) con radio max(erode_iter, dilate_iter).
+    :param shape: Forma del kernel (ver MORPH_SHAPES).
+    :return: Imagen binaria (1 canal).
+    """
+    if mode != MORPH_ERODE_DILATE:
+        radius = max(erode_iter, dilate_iter)
+        if radius == 0:
+            return binary_img
+        kernel, anchor = morphology_kernel(radius, shape, centered=True)
+        return cv2.morphologyEx(binary_img, _MORPH_EX_OPS[mode], kernel,
+                                dst=_dst(buffers, "morph", binary_img.shape), anchor=anchor)
+
+    # Aplicar Erosión
+    if erode_iter > 0:
+        kernel, anchor = morphology_kernel(erode_iter, shape)
+        binary_img = cv2.erode(binary_img, kernel, dst=_dst(buffers, "erode", binary_img.shape),
+                               anchor=anchor)
+
+    # Aplicar Dilatación
+    if dilate_iter > 0:
+        kernel, anchor = morphology_kernel(dilate_iter, shape)
+        binary_img = cv2.dilate(binary_img, kernel, dst=_dst(buffers, "dilate", binary_img.shape),
+                                anchor=anchor)
+
+    return binary_img
+
 def apply_threshold_and_morphology(image, active, value, type, erode_iter, dilate_iter):
     """
     Aplica umbralización y luego operaciones morfológicas (erosión/dilatación).
-    :param image: Matriz de imagen (BGR).
+    :param image: Matriz de imagen (BGR o gris).
     :param active: Si la umbralización está activa (bool).
     # ... (resto de parámetros)
-    :return: Imagen procesada (BGR para visualización).
+    :return: Imagen binaria en gris (1 canal), o la entrada tal cual si no está activa.
     """
     if not active:
         # Si no está activo, retornamos la imagen tal cual (sin umbralizar)
         return image 
         
-    # Paso 1: Convertir a Gris (Requisito para cv2.threshold)
-    # Siempre convertimos a gris antes del thresholding.
-    gray_img = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
-    # Paso 2: Umbralización (Thresholding)
-    # max_value es 255.
-    _, thresh_img = cv2.threshold(gray_img, value, 255, type)
+    # Paso 1 y 2: Gris + Umbralización en una sola tabla (contraste identidad)
+    thresh_img = apply_point_operations(image, 0, 1.0, True, value, type)
     
     # Paso 3: Operaciones Morfológicas (Erosión y Dilatación)
-    
-    # Crear un kernel simple (matriz de 3x3 de unos)
-    kernel = np.ones((2, 2), np.uint8)
-    
-    # Aplicar Erosión
-    if erode_iter > 0:
-        thresh_img = cv2.erode(thresh_img, kernel, iterations=erode_iter)
-
-        
-    # Aplicar Dilatación
-    if dilate_iter > 0:
-        thresh_img = cv2.dilate(thresh_img, kernel, iterations=dilate_iter)
-
-    
-    # Paso 4: Convertir a BGR para visualización en PyQt5
-    return cv2.cvtColor(thresh_img, cv2.COLOR_GRAY2BGR)
+    return apply_morphology(thresh_img, erode_iter, dilate_iter)
 
 def process_image(image, brightness_value, contrast_factor, equalize_hist, mask_type, zoom_factor, 
                   threshold_active, thresh_value, thresh_type, erode_iterations, dilate_iterations):
     """
     Función de utilidad para aplicar todos los procesos en orden.
+    Devuelve 1 canal en cuanto alguna etapa pasa a gris (se expande a BGR solo al mostrar).
     """
     if image is None:
         return None
@@ -195,20 +538,69 @@ def process_image(image, brightness_value, contrast_factor, equalize_hist, mask_
     if equalize_hist:
         processed_img = apply_histogram_equalization(processed_img)
         
-    # 3. Aplicar Brillo y Contraste (Ajustes lineales)
-    processed_img = apply_lightness_and_contrast(processed_img, brightness_value, contrast_factor)
+    # 3. Aplicar Brillo y Contraste (Ajustes lineales) con LUT.
+    # Sin máscara intermedia, el umbral se fusiona en la MISMA tabla.
+    fuse_threshold = threshold_active and mask_type == "Ninguna"
+    processed_img = apply_point_operations(
+        processed_img, brightness_value, contrast_factor,
+        fuse_threshold, thresh_value, thresh_type
+    )
     
     # 4. Aplicar Máscara/Filtro (Filtros espaciales)
     processed_img = apply_mask(processed_img, mask_type)
 
     # 5. Aplicar Umbralización y Morfología (se aplica al final para obtener imagen binaria)
-    processed_img = apply_threshold_and_morphology(
-        processed_img, 
-        threshold_active, 
-        thresh_value, 
-        thresh_type, 
-        erode_iterations, 
-        dilate_iterations
-    )
+    if fuse_threshold:
+        processed_img = apply_morphology(processed_img, erode_iterations, dilate_iterations)
+    else:
+        processed_img = apply_threshold_and_morphology(
+            processed_img, 
+            threshold_active, 
+            thresh_value, 
+            thresh_type, 
+            erode_iterations, 
+            dilate_iterations
+        )
     
-    return processed_img
\ No newline at end of file
+    return processed_img
+
+class FramePipeline:
+    """
+    Modo pipeline sin asignaciones: posee buffers preasignados (por forma) y su propio
+    motor LUT, y cada etapa escribe en su buffer con dst=.
+    IMPORTANTE: las imágenes devueltas pertenecen al pipeline y se SOBRESCRIBEN en la
+    siguiente llamada; copiar si se necesitan por más tiempo.
+    """
+    def __init__(self):
+        self.buffers = FrameBuffers()
+        self.point_lut = PointOperationLUT()
+        self.channels = None  # Canales de la última imagen producida (1 = gris, 3 = BGR)
+
+    def digital_zoom(self, image, factor):
+        """Zoom digital escrito en el buffer 'zoom' del pipeline."""
+        return apply_digital_zoom(image, factor, buffers=self.buffers)
+
+    def zoomed_roi(self, image, factor, roi_coords):
+        """ROI con zoom remuestreado desde la imagen original (ver extract_zoomed_roi)."""
+        return extract_zoomed_roi(image, factor, roi_coords, buffers=self.buffers)
+
+    def pyramid_down(self, image, levels):
+        """Copia reducida por pirámide escrita en los buffers del pipeline."""
+        return pyramid_downscale(image, levels, buffers=self.buffers)
+
+    def zoomed_view(self, image, factor, target_size):
+        """Vista del panel central al tamaño de pantalla (ver render_zoomed_view)."""
+        return render_zoomed_view(image, factor, target_size, buffers=self.buffers)
+
+    def process_roi_heavy(self, image, brightness, contrast, equalize, mask_type,
+                          thresh_active, thresh_val, thresh_type, erode, dilate,
+                          morph_mode=MORPH_ERODE_DILATE, morph_shape="Rectángulo"):
+        """Igual que process_roi_heavy(), pero reutilizando los buffers del pipeline."""
+        processed = process_roi_heavy(
+            image, brightness, contrast, equalize, mask_type,
+            thresh_active, thresh_val, thresh_type, erode, dilate,
+            morph_mode, morph_shape,
+            point_lut=self.point_lut, buffers=self.buffers
+        )
+        self.channels = 1 if is_gray(processed) else processed.shape[2]
+        return processed
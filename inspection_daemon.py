@@ -0,0 +1,499 @@
+"""
+Inspección continua sin interfaz gráfica (sin Qt ni matplotlib).
+
+Captura (hilo propio) -> detector de cambios -> buzón -> FrameAnalyzer, y escribe un
+resultado por frame procesado como línea JSON. Se configura con un archivo JSON;
+las claves que falten toman los valores de DEFAULT_CONFIG.
+
+Ejemplo de configuración:
+    {
+        "source": {"type": "camera", "device": 1, "fourcc": "MJPG", "width": 1920, "height": 1080},
+        "params": {"roi": [100, 50, 900, 400], "threshold": 127, "erode": 1, "method": "fft"},
+        "output": "fins.jsonl"
+    }
+
+Tipos de fuente: "camera" (claves de CaptureConfig), "video" (path), "images" (path)
+y "synthetic" (width, height, pitch). "realtime": false reproduce a máxima velocidad.
+
+Con "analyzers" (lista de parámetros que reemplazan a los de "params", más un "name"
+opcional) el mismo frame se reparte a un proceso de análisis por entrada: la captura
+escribe en un anillo de memoria compartida (SharedFrameRing) y cada proceso analiza el
+slot como vista de NumPy, sin copias. Cada línea JSON lleva el campo "analyzer".
+    "analyzers": [{"name": "aletas", "roi": [100, 50, 900, 400]},
+                  {"name": "franjas", "roi": [0, 0, 1920, 1080], "bands": 4}]
+
+Ejemplo:
+    python inspection_daemon.py --config linea3.json --max-seconds 60
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import queue
+import signal
+import sys
+import threading
+import time
+
+from batch_fin_count import THRESH_TYPES
+from capture_sources import CaptureConfig, CameraSource, ImageSequenceSource, SyntheticSource, VideoFileSource
+from change_detection import ChangeDetector
+from frame_analyzer import FrameAnalyzer, ProcessingParams
+from frame_mailbox import FrameMailbox
+from frame_pool import FramePool
+from image_processing import MORPH_ERODE_DILATE
+from shared_frames import SharedFrameRing
+
+DEFAULT_CONFIG = {
+    "source": {"type": "camera", "device": 1},
+    "params": {
+        "zoom": 1.0,
+        "roi": None,                # [x1, y1, x2, y2] sobre la vista con zoom (None = frame completo)
+        "extra_rois": [],
+        "bands": 1,
+        "method": "fft",            # "fft" o "find_peaks"
+        "track": True,              # Seguir las aletas entre frames
+        "brightness": 0,
+        "contrast": 1.0,
+        "equalize": False,
+        "mask": "Ninguna",
+        "threshold": None,          # Valor de umbral (None = sin umbralización)
+        "thresh_type": "binary",
+        "erode": 0,
+        "dilate": 0,
+        "morph_mode": MORPH_ERODE_DILATE,
+        "morph_shape": "Rectángulo",
+    },
+    "skip_unchanged": True,
+    "change_threshold": 2.0,
+    "output": "-",                  # Archivo JSONL ("-" = stdout)
+    "include_peaks": True,          # Incluir las posiciones de las aletas en cada línea
+    "analyzers": [],                # Procesos de análisis con memoria compartida (ver arriba)
+    "ring_slots": 4,                # Slots del anillo: un slot se reutiliza tras ring_slots-1 frames
+}
+
+def load_config(path=None):
+    """Configuración del archivo JSON combinada con DEFAULT_CONFIG (un nivel de profundidad)."""
+    config = {key: dict(value) if isinstance(value, dict) else value for key, value in DEFAULT_CONFIG.items()}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            user = json.load(f)
+        for key, value in user.items():
+            if isinstance(config.get(key), dict) and isinstance(value, dict):
+                if key == "source" and value.get("type", "camera") != config["source"]["type"]:
+                    config[key] = dict(value) # Otra fuente: sin las claves de la cámara por defecto
+                else:
+                    config[key].update(value)
+            else:
+                config[key] = value
+    return config
+
+def build_source(spec):
+    """Fuente de frames a partir de la sección "source" de la configuración."""
+    spec = dict(spec)
+    kind = spec.pop("type", "camera")
+    realtime = spec.pop("realtime", True)
+    if kind == "camera":
+        return CameraSource(CaptureConfig(**spec))
+    if kind == "video":
+        return VideoFileSource(spec["path"], spec.get("fps"), realtime, spec.get("loop", False))
+    if kind == "images":
+        return ImageSequenceSource(spec["path"], spec.get("fps", 10.0), realtime, spec.get("loop", False))
+    if kind == "synthetic":
+        return SyntheticSource(spec.get("width", 1280), spec.get("height", 720), spec.get("fps", 30.0),
+                               realtime, spec.get("pitch", 40.0), spec.get("speed", 2.0), spec.get("noise", 8.0))
+    raise ValueError(f"Tipo de fuente desconocido: {kind}")
+
+def build_processing_params(params):
+    """ProcessingParams a partir de la sección "params" (mismos nombres que batch_fin_count)."""
+    heavy = (
+        params["brightness"],
+        params["contrast"],
+        params["equalize"],
+        params["mask"],
+        params["threshold"] is not None,
+        params["threshold"] or 0,
+        THRESH_TYPES[params["thresh_type"]],
+        params["erode"],
+        params["dilate"],
+        params["morph_mode"],
+        params["morph_shape"],
+    )
+    roi = tuple(params["roi"]) if params["roi"] else None
+    return ProcessingParams(
+        zoom=params["zoom"],
+        heavy=heavy,
+        roi=roi,
+        extra_rois=tuple(tuple(r) for r in params["extra_rois"]),
+        bands=params["bands"],
+        peak_method=params["method"],
+        view_size=None, # Sin vista del panel central
+        track=params["track"],
+        full_view=roi is None, # Sin ROI configurado: frame completo
+    )
+
+
+class CaptureLoop:
+    """
+    Hilo de captura sin Qt (equivalente a VideoThread): lee en buffers del pool, aplica
+    el detector de cambios y deposita en el buzón de un solo lugar.
+    """
+    def __init__(self, source, skip_unchanged=True, change_threshold=2.0):
+        self.source = source
+        self.skip_unchanged = skip_unchanged
+        self.change_detector = ChangeDetector(threshold=change_threshold)
+        self.pool = FramePool()
+        self.mailbox = FrameMailbox(on_drop=self.pool.release)
+        self.running = False
+        self.opened = False
+        self.finished = threading.Event() # La fuente se agotó o no se pudo abrir
+        self._thread = None
+
+    def open(self):
+        if not self.source.open():
+            raise RuntimeError(f"No se puede abrir la fuente ({self.source.describe()}).")
+        self.opened = True
+
+    def start(self):
+        if not self.opened:
+            self.open()
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="CaptureLoop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            while self.running:
+                buf = self.pool.acquire()
+                ok, frame = self.source.read(buf)
+                if not ok:
+                    self.pool.release(buf)
+                    if self.source.exhausted:
+                        break
+                    time.sleep(0.005)
+                    continue
+                frame = self.pool.adopt(frame, buf)
+                if not self.skip_unchanged or self.change_detector.is_changed(frame):
+                    self.mailbox.put(frame)
+                else:
+                    self.pool.release(frame)
+        finally:
+            self.source.release()
+            self.finished.set()
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join()
+        self.mailbox.clear()
+
+    def stats(self):
+        stats = self.change_detector.stats()
+        stats.update(self.mailbox.stats())
+        stats["capture_fps"] = self.source.fps_meter.fps
+        return stats
+
+
+class RingCaptureLoop(CaptureLoop):
+    """
+    Captura hacia un anillo de memoria compartida (SharedFrameRing) en lugar del buzón:
+    cada frame se lee directamente en un slot y se publica si pasa el detector de cambios.
+    El anillo se crea en open() con la forma del primer frame de la fuente.
+    """
+    def __init__(self, source, skip_unchanged=True, change_threshold=2.0, slots=4):
+        super().__init__(source, skip_unchanged, change_threshold)
+        self.slots = slots
+        self.ring = None
+        self.published = 0      # Frames publicados (se conserva al cerrar el anillo)
+        self.shape_mismatch = 0 # Frames descartados por no coincidir con la forma del anillo
+
+    def open(self):
+        super().open()
+        ok = False
+        for _ in range(400): # Hasta ~2 s para el primer frame (cámaras que tardan en arrancar)
+            ok, frame = self.source.read()
+            if ok or self.source.exhausted:
+                break
+            time.sleep(0.005)
+        if not ok:
+            self.source.release()
+            raise RuntimeError(f"La fuente no entregó ningún frame ({self.source.describe()}).")
+        self.ring = SharedFrameRing.create(frame.shape, frame.dtype, self.slots)
+        self.change_detector.is_changed(frame) # Referencia del detector de cambios
+        self.ring.write(frame)
+
+    def _run(self):
+        try:
+            while self.running:
+                slot, view = self.ring.begin_write()
+                ok, frame = self.source.read(view)
+                if not ok:
+                    self.ring.abort(slot)
+                    if self.source.exhausted:
+                        break
+                    time.sleep(0.005)
+                    continue
+                if frame is not view:
+                    # La fuente no pudo escribir en el slot (otra resolución): el anillo es de forma fija
+                    self.ring.abort(slot)
+                    self.shape_mismatch += 1
+                    continue
+                if not self.skip_unchanged or self.change_detector.is_changed(view):
+                    self.ring.publish(slot)
+                else:
+                    self.ring.abort(slot)
+        finally:
+            self.source.release()
+            self.finished.set()
+
+    def close(self):
+        """Libera el anillo (después de stop() y de que terminen los procesos de análisis)."""
+        if self.ring is not None:
+            self.published = self.ring.frames_published
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
+
+    def stats(self):
+        stats = self.change_detector.stats()
+        stats["published"] = self.ring.frames_published if self.ring is not None else self.published
+        stats["shape_mismatch"] = self.shape_mismatch
+        stats["capture_fps"] = self.source.fps_meter.fps
+        return stats
+
+
+def result_record(result, waited, capture_fps=None, include_peaks=True):
+    """
+    Línea JSON de un resultado (valores en píxeles de la vista a resolución completa).
+    :param capture_fps: FPS de la captura, o None para omitirlo (lo agrega quien escribe).
+    """
+    record = {
+        "time": round(time.time(), 3),
+        "frame": result.frame_id,
+        "fin_count": int(result.count),
+        "pitch": round(float(result.pitch), 3) if result.pitch else None,
+        "process_ms": round(result.process_ms, 3),
+        "wait_ms": round(waited * 1000, 3),
+    }
+    if capture_fps is not None:
+        record["capture_fps"] = round(capture_fps, 2)
+    if include_peaks and result.peaks is not None:
+        record["peaks"] = [round(float(p), 2) for p in result.peaks]
+    if result.band_results:
+        record["bands"] = [
+            {"roi": r.roi_index, "band": r.band_index, "fin_count": len(r.peaks),
+             "pitch": round(float(r.pitch), 3) if math.isfinite(r.pitch) else None,
+             "pitch_variance": round(float(r.pitch_variance), 3) if math.isfinite(r.pitch_variance) else None}
+            for r in result.band_results
+        ]
+    return record
+
+def run(config, max_frames=None, max_seconds=None, stop_event=None):
+    """
+    Bucle de inspección: procesa el frame más reciente y escribe una línea JSON por resultado.
+    Con "analyzers" en la configuración el análisis corre en procesos (ver run_shared()).
+    :return: Resumen (diccionario) al terminar.
+    """
+    if config["analyzers"]:
+        return run_shared(config, max_frames, max_seconds, stop_event)
+    stop_event = stop_event or threading.Event()
+    params = build_processing_params(config["params"])
+    analyzer = FrameAnalyzer()
+    capture = CaptureLoop(build_source(config["source"]), config["skip_unchanged"], config["change_threshold"])
+    output = config["output"]
+    stream = sys.stdout if output in (None, "-") else open(output, "a", encoding="utf-8")
+    if params.peak_method == "find_peaks":
+        # find_peaks importa scipy.signal la primera vez (~1 s): mejor antes de abrir la fuente
+        import scipy.signal  # noqa: F401
+
+    start = time.perf_counter()
+    frames = 0
+    capture.start()
+    try:
+        while not stop_event.is_set():
+            if max_frames is not None and frames >= max_frames:
+                break
+            if max_seconds is not None and time.perf_counter() - start >= max_seconds:
+                break
+            frame, waited = capture.mailbox.take(timeout=0.1)
+            if frame is None:
+                if capture.finished.is_set():
+                    break
+                continue
+            frames += 1
+            try:
+                result = analyzer.analyze(frame, params, frames)
+            finally:
+                capture.pool.release(frame) # El resultado no guarda imágenes (sin vista)
+            record = result_record(result, waited, capture.source.fps_meter.fps, config["include_peaks"])
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            stream.flush()
+    finally:
+        capture.stop()
+        if stream is not sys.stdout:
+            stream.close()
+
+    summary = capture.stats()
+    summary["results"] = frames
+    summary["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return summary
+
+def analyzer_process(ring_name, index, name, params, include_peaks, results, stop_event):
+    """
+    Proceso de análisis: toma el frame más reciente del anillo como vista (sin copia), lo
+    analiza y envía la línea JSON por 'results'. Si el slot se reutilizó mientras se
+    analizaba (análisis más lento que ring_slots-1 frames), el resultado se descarta.
+    Mensajes: ("ready", index, None), ("result", index, record), ("done", index, resumen).
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # El proceso principal coordina el cierre
+    ring = SharedFrameRing.attach(ring_name)
+    analyzer = FrameAnalyzer()
+    processing = build_processing_params(params)
+    if processing.peak_method == "find_peaks":
+        import scipy.signal  # noqa: F401
+    results.put(("ready", index, None))
+
+    last = processed = discarded = skipped = 0
+    ref = result = None
+    try:
+        while not stop_event.is_set():
+            ref = ring.wait_latest(last, timeout=0.1)
+            if ref is None:
+                continue
+            if last:
+                skipped += ref.frame_id - last - 1 # Publicados mientras se analizaba el anterior
+            last = ref.frame_id
+            waited = max(0.0, time.time() - ref.timestamp)
+            result = analyzer.analyze(ref.frame, processing, ref.frame_id)
+            if not ring.is_valid(ref):
+                discarded += 1
+                continue
+            processed += 1
+            record = result_record(result, waited, None, include_peaks)
+            record["analyzer"] = name
+            results.put(("result", index, record))
+    finally:
+        ref = result = None # Las vistas del anillo deben soltarse antes de cerrarlo
+        ring.close()
+        results.put(("done", index, {"name": name, "results": processed,
+                                     "discarded": discarded, "skipped": skipped}))
+
+def run_shared(config, max_frames=None, max_seconds=None, stop_event=None):
+    """
+    Captura en este proceso y un proceso de análisis por entrada de config["analyzers"],
+    todos leyendo el mismo anillo de memoria compartida.
+    :return: Resumen (diccionario) al terminar.
+    """
+    stop_event = stop_event or threading.Event()
+    specs = [dict(config["params"], **spec) for spec in config["analyzers"]]
+    names = [spec.pop("name", f"analyzer{i}") for i, spec in enumerate(specs)]
+    for spec in specs:
+        build_processing_params(spec) # Errores de configuración antes de abrir la fuente
+
+    capture = RingCaptureLoop(build_source(config["source"]), config["skip_unchanged"],
+                              config["change_threshold"], config["ring_slots"])
+    capture.open()
+    ctx = multiprocessing.get_context("spawn") # Igual en Linux y Windows; sin heredar hilos
+    results = ctx.Queue()
+    stop_workers = ctx.Event()
+    workers = [
+        ctx.Process(target=analyzer_process, name=f"Analyzer-{name}", daemon=True,
+                    args=(capture.ring.name, i, name, spec, config["include_peaks"], results, stop_workers))
+        for i, (name, spec) in enumerate(zip(names, specs))
+    ]
+    output = config["output"]
+    stream = sys.stdout if output in (None, "-") else open(output, "a", encoding="utf-8")
+    summaries = {}
+    frames = 0
+    start = time.perf_counter()
+    try:
+        for worker in workers:
+            worker.start()
+        # La captura empieza cuando todos los procesos están listos (importar cv2/numpy tarda)
+        ready = 0
+        while ready < len(workers):
+            try:
+                kind, _, _ = results.get(timeout=30)
+            except queue.Empty:
+                raise RuntimeError("Los procesos de análisis no iniciaron.") from None
+            ready += kind == "ready"
+        start = time.perf_counter()
+        capture.start()
+
+        while not stop_event.is_set():
+            if max_frames is not None and frames >= max_frames:
+                break
+            if max_seconds is not None and time.perf_counter() - start >= max_seconds:
+                break
+            try:
+                kind, index, payload = results.get(timeout=0.1)
+            except queue.Empty:
+                if capture.finished.is_set() or not all(w.is_alive() for w in workers):
+                    break
+                continue
+            if kind == "result":
+                frames += 1
+                payload["capture_fps"] = round(capture.source.fps_meter.fps, 2)
+                stream.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                stream.flush()
+            elif kind == "done":
+                summaries[index] = payload
+    finally:
+        capture.stop()
+        stop_workers.set()
+        # Vaciar la cola hasta el resumen de cada proceso (si no, join() puede bloquearse)
+        while len(summaries) < len(workers):
+            try:
+                kind, index, payload = results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(w.is_alive() for w in workers):
+                    break
+                continue
+            if kind == "done":
+                summaries[index] = payload
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        capture.close()
+        if stream is not sys.stdout:
+            stream.close()
+
+    summary = capture.stats()
+    summary["results"] = frames
+    summary["elapsed_s"] = round(time.perf_counter() - start, 3)
+    summary["analyzers"] = [summaries[i] for i in sorted(summaries)]
+    return summary
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Inspección continua de aletas sin interfaz gráfica (JSONL).")
+    parser.add_argument("-c", "--config", help="Archivo JSON de configuración (ver DEFAULT_CONFIG)")
+    parser.add_argument("-o", "--output", help="Archivo JSONL de salida (reemplaza al de la configuración)")
+    parser.add_argument("--max-frames", type=int, help="Terminar tras N resultados")
+    parser.add_argument("--max-seconds", type=float, help="Terminar tras N segundos")
+    parser.add_argument("--print-config", action="store_true", help="Mostrar la configuración efectiva y salir")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = load_config(args.config)
+    if args.output:
+        config["output"] = args.output
+    if args.print_config:
+        print(json.dumps(config, ensure_ascii=False, indent=2))
+        return 0
+
+    # SIGTERM/SIGINT terminan el bucle de forma ordenada (cierra la cámara y el archivo)
+    stop_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop_event.set())
+    try:
+        summary = run(config, args.max_frames, args.max_seconds, stop_event)
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,113 @@
+import argparse
+import json
 import sys
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from ui_mainwindow import MainWindow
+from capture_sources import (
+    BACKENDS, FOURCC_CODES, CaptureConfig, ImageSequenceSource, SyntheticSource, VideoFileSource
+)
 
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    ex = MainWindow()
+def parse_size(text):
+    """Tipo de argparse para tamaños 'WxH' (ej. 1920x1080). :return: (ancho, alto)"""
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamaño inválido '{text}' (formato WxH, ej. 1920x1080)") from None
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"tamaño inválido '{text}' (ancho y alto deben ser positivos)")
+    return width, height
+
+def parse_devices(text):
+    """Tipo de argparse para --cameras: índices separados por comas (ej. 1,2). :return: lista de int"""
+    try:
+        devices = [int(d) for d in text.split(",") if d.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"cámaras inválidas '{text}' (índices separados por comas, ej. 1,2)") from None
+    if not devices or any(d < 0 for d in devices):
+        raise argparse.ArgumentTypeError(f"cámaras inválidas '{text}' (al menos un índice, ninguno negativo, ej. 1,2)")
+    return devices
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Reconocimiento de aletas (GUI).")
+    parser.add_argument("--device", type=int, default=1, help="Índice de la cámara")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="auto", help="Backend de captura")
+    parser.add_argument("--fourcc", choices=FOURCC_CODES, help="Formato de píxel (ej. MJPG para 60 fps)")
+    parser.add_argument("--width", type=int, help="Ancho de captura")
+    parser.add_argument("--height", type=int, help="Alto de captura")
+    parser.add_argument("--fps", type=float, help="FPS pedido a la cámara")
+    parser.add_argument("--buffersize", type=int, default=1, help="Frames en el búfer del driver")
+    parser.add_argument("--max-fps", type=float, help="Limitar la lectura a este FPS")
+    parser.add_argument("--cameras", type=parse_devices, help="Estación multi-cámara: índices separados por comas, ej. 1,2 "
+                                          "(misma configuración de captura para todas; con --video, "
+                                          "--images o --synthetic cada cámara reproduce esa fuente)")
+    # Fuentes de reproducción (reemplazan a la cámara; útiles sin hardware)
+    replay = parser.add_mutually_exclusive_group()
+    replay.add_argument("--video", help="Reproducir un archivo de video")
+    replay.add_argument("--images", help="Reproducir un directorio (o patrón glob) de imágenes")
+    replay.add_argument("--synthetic", metavar="WxH", type=parse_size, help="Patrón sintético de aletas, ej. 1920x1080")
+    parser.add_argument("--replay-fps", type=float,
+                        help="FPS de reproducción (por defecto: el del video, 10 imágenes/s, 30 sintético)")
+    parser.add_argument("--max-speed", action="store_true", help="Reproducir a máxima velocidad (sin ritmo real)")
+    parser.add_argument("--no-loop", action="store_true", help="No repetir el video/las imágenes al terminar")
+    parser.add_argument("--run-seconds", type=float,
+                        help="Iniciar la fuente, cerrar tras N segundos e imprimir las estadísticas (JSON)")
+    return parser
+
+def parse_capture_args(args):
+    """Configuración de la cámara a partir de los argumentos (Namespace de build_parser())."""
+    return CaptureConfig(args.device, args.backend, args.fourcc, args.width, args.height,
+                         args.fps, args.buffersize, args.max_fps)
+
+def parse_source_factory(args):
+    """
+    Fuente de reproducción pedida en la línea de comandos.
+    :return: Función sin argumentos que crea la fuente, o None para usar la cámara.
+    """
+    realtime = not args.max_speed
+    if args.video:
+        return lambda: VideoFileSource(args.video, args.replay_fps, realtime, loop=not args.no_loop)
+    if args.images:
+        return lambda: ImageSequenceSource(args.images, args.replay_fps or 10.0, realtime, loop=not args.no_loop)
+    if args.synthetic:
+        width, height = args.synthetic
+        return lambda: SyntheticSource(width, height, args.replay_fps or 30.0, realtime)
+    return None
+
+def parse_station(args, capture_config, source_factory=None):
+    """
+    Estación multi-cámara pedida con --cameras.
+    :param source_factory: Fuente de reproducción (ver parse_source_factory): cada canal
+                           crea la suya en lugar de abrir la cámara.
+    :return: Lista de (nombre, CaptureConfig, source_factory) para MainWindow, o None (una sola cámara).
+    """
+    if not args.cameras:
+        return None
+    return [(f"Cámara {d}", capture_config._replace(device=d), source_factory) for d in args.cameras]
+
+def print_stats_and_quit(window, app):
+    """Estadísticas finales de captura y procesamiento (para corridas sin intervención)."""
+    stats = window.video_thread.stats() if window.video_thread else {}
+    if window.processing_worker is not None:
+        stats.update(window.processing_worker.stats())
+    print(json.dumps(stats, ensure_ascii=False, default=str))
+    window.close()
+    app.quit()
+
+def main(argv=None):
+    # Un solo análisis estricto: un argumento mal escrito es un error, no se pasa a Qt
+    args = build_parser().parse_args(argv)
+    capture_config = parse_capture_args(args)
+    source_factory = parse_source_factory(args)
+    station = parse_station(args, capture_config, source_factory)
+    app = QApplication(sys.argv[:1])
+    ex = MainWindow(capture_config, source_factory, station)
     ex.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    if source_factory is not None or station or args.run_seconds:
+        ex.source_combo.setCurrentIndex(1) # Iniciar la fuente de inmediato
+    if args.run_seconds:
+        QTimer.singleShot(int(args.run_seconds * 1000), lambda: print_stats_and_quit(ex, app))
+    return app.exec_()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from frame_analyzer import FrameAnalyzer, ProcessingParams
+from frame_mailbox import FrameMailbox
+
+class ProcessingWorker(QThread):
+    """
+    Etapa de procesamiento entre la captura (VideoThread) y la GUI.
+    Retira el frame más reciente del buzón de captura, lo analiza con la última
+    instantánea de parámetros y deposita el resultado terminado en su propio buzón:
+    la GUI solo muestra imágenes ya listas y actualiza etiquetas.
+    """
+
+    # Aviso (sin datos) de que hay un resultado nuevo; la GUI lo retira con take_result()
+    result_ready = pyqtSignal()
+
+    def __init__(self, frames, pool=None, parent=None):
+        """
+        :param frames: FrameMailbox de donde se retiran los frames (el del hilo de captura).
+        :param pool: FramePool de los frames (opcional): cada frame se devuelve al pool
+                     cuando ni este hilo ni el resultado mostrado lo necesitan.
+        """
+        super().__init__(parent)
+        self._run_flag = False
+        self.frames = frames
+        self.pool = pool
+        # Un resultado descartado sin mostrar suelta su referencia al frame
+        self.results = FrameMailbox(on_drop=self.release_result)
+        self.analyzer = FrameAnalyzer()
+        self._params = ProcessingParams()
+        self._recorders = (None, None) # FrameRecorder de frames crudos y de ROI anotado
+        self.frame_wait_ms = None  # Espera de los frames en el buzón de captura (EMA, ms)
+        self.process_ms = None     # Tiempo de procesamiento por frame (EMA, ms)
+
+    def set_params(self, params):
+        """
+        Publica una nueva instantánea de parámetros (desde el hilo de la GUI).
+        Reemplazar la referencia es atómico: el hilo toma la última al empezar cada frame.
+        """
+        self._params = params
+
+    def set_recorders(self, raw=None, roi=None):
+        """
+        Grabadores (FrameRecorder) de los frames crudos y del ROI anotado; None = no grabar.
+        Se reemplaza la tupla completa: el hilo nunca ve una mezcla de ambos.
+        """
+        self._recorders = (raw, roi)
+
+    def run(self):
+        self._run_flag = True
+        frame_id = 0
+        last_frame = last_params = None
+        while self._run_flag:
+            params = self._params
+            frame, waited = self.frames.take(timeout=0.05)
+            new_frame = frame is not None
+            if frame is None:
+                # Sin frames nuevos (pieza quieta): solo se reprocesa si cambiaron los parámetros
+                if last_frame is None or params is last_params:
+                    continue
+                frame = last_frame
+            else:
+                # El frame retirado trae la referencia del buzón; el anterior se suelta
+                if last_frame is not None:
+                    self._release(last_frame)
+                frame_id += 1
+                waited_ms = waited * 1000
+                self.frame_wait_ms = waited_ms if self.frame_wait_ms is None else 0.8 * self.frame_wait_ms + 0.2 * waited_ms
+
+            result = self.analyzer.analyze(frame, params, frame_id)
+            self.process_ms = (result.process_ms if self.process_ms is None
+                               else 0.8 * self.process_ms + 0.2 * result.process_ms)
+            last_frame, last_params = frame, params
+            if new_frame:
+                self._record(result)
+            self._retain(frame) # Referencia del resultado (la suelta quien lo consuma)
+            # Solo se avisa si el buzón de resultados estaba vacío (un aviso pendiente como máximo)
+            if self.results.put(result):
+                self.result_ready.emit()
+
+        # Al detenerse se sueltan el último frame y el resultado sin mostrar
+        if last_frame is not None:
+            self._release(last_frame)
+        self.results.clear()
+
+    def _record(self, result):
+        """Encola el frame crudo y/o el ROI anotado (nunca bloquea; ver FrameRecorder)."""
+        raw, roi = self._recorders
+        if raw is not None:
+            raw.submit(result.frame) # Copia: el buffer del frame vuelve al pool
+        if roi is not None and result.roi_image is not None:
+            roi.submit(result.roi_image, copy=False) # Imagen propia del resultado, solo se lee
+
+    def _retain(self, frame):
+        if self.pool is not None:
+            self.pool.retain(frame)
+
+    def _release(self, frame):
+        if self.pool is not None:
+            self.pool.release(frame)
+
+    def take_result(self):
+        """
+        Retira el resultado más reciente: ProcessingResult o None.
+        Al terminar con él hay que soltarlo con release_result().
+        """
+        result, _ = self.results.take()
+        return result
+
+    def release_result(self, result):
+        """Suelta la referencia de un resultado a su frame (vuelve al pool si nadie más lo usa)."""
+        if result is not None:
+            self._release(result.frame)
+
+    def stats(self):
+        """Resultados entregados/descartados y tiempos (EMA, ms)."""
+        stats = {"results_" + k: v for k, v in self.results.stats().items()}
+        stats["frame_wait_ms"] = self.frame_wait_ms
+        stats["process_ms"] = self.process_ms
+        return stats
+
+    def stop(self):
+        """Detiene el hilo de forma segura."""
+        self._run_flag = False
+        self.wait()
@@ -0,0 +1,205 @@
+"""
+Transporte de frames sin copias entre procesos (multiprocessing.shared_memory).
+
+SharedFrameRing es un anillo de N lugares (slots) para frames de forma fija en un
+bloque de memoria compartida. El proceso de captura escribe cada frame directamente
+en un slot (cap.read(image=vista)) y los procesos de análisis envuelven el slot como
+una vista de NumPy: nada se serializa ni se copia, y repartir el mismo frame a varios
+procesos no cuesta más que la captura.
+
+Reutilización segura de slots (seqlock por slot): cada slot tiene un número de
+secuencia que el escritor deja IMPAR mientras escribe y PAR al publicar. El lector
+anota la secuencia al tomar el frame y, al terminar de usarlo, comprueba con
+is_valid() que no cambió; si cambió, el slot se reutilizó a mitad del análisis y el
+resultado se descarta. La captura nunca espera a los lectores lentos. El orden entre
+los datos y la secuencia depende del procesador (ver begin_write/publish).
+"""
+import os
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import parent_process, resource_tracker, shared_memory
+
+import numpy as np
+
+_MAGIC = 0x46494E52494E4731  # "FINRING1"
+_META_FIELDS = 8              # magic, slots, alto, ancho, canales, dtype (código), frames publicados, último slot
+_SLOT_FIELDS = 4              # secuencia, frame_id, timestamp (ns), reservado
+_ALIGN = 64
+
+# Frame tomado del anillo: 'frame' es una VISTA del slot (válida mientras is_valid(ref))
+FrameRef = namedtuple("FrameRef", ["slot", "seq", "frame_id", "timestamp", "frame"])
+
+_created = set() # Bloques creados por este proceso (nombres de SharedMemory._name)
+
+def _open_shm(name=None, create=False, size=0):
+    """
+    SharedMemory que, al adjuntarse, no queda registrado en un resource_tracker distinto
+    del del dueño: ese tracker daría el bloque por filtrado y lo borraría al salir el lector.
+    """
+    if create:
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created.add(shm._name)
+        return shm
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    # Antes de 3.13 adjuntarse también registra el bloque (solo en POSIX). Los procesos
+    # hijos de multiprocessing y el propio dueño comparten su tracker y el registro repetido
+    # no tiene efecto (quitarlo borraría también el del dueño); un proceso independiente
+    # tiene su propio tracker y ahí sí se quita.
+    if os.name == "posix" and parent_process() is None and shm._name not in _created:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedFrameRing:
+    """
+    Anillo de frames en memoria compartida. Un solo escritor (la captura) y cualquier
+    número de lectores. Crear con create() en el proceso dueño y abrir con attach(name)
+    en los demás; el dueño llama unlink() al terminar.
+    """
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+        header = np.ndarray((_META_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if header[0] != _MAGIC:
+            raise ValueError(f"La memoria compartida {shm.name} no es un anillo de frames")
+        self.slots = int(header[1])
+        self.shape = tuple(int(v) for v in header[2:5] if v > 0)
+        self.dtype = np.dtype(chr(int(header[5])))
+        self._meta = header
+        self._slot_meta = np.ndarray((self.slots, _SLOT_FIELDS), dtype=np.int64, buffer=shm.buf,
+                                     offset=_META_FIELDS * 8)
+        offset = self._data_offset(self.slots)
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._frames = [
+            np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf, offset=offset + i * frame_bytes)
+            for i in range(self.slots)
+        ]
+        self._next = 0
+
+    @staticmethod
+    def _data_offset(slots):
+        header_bytes = (_META_FIELDS + slots * _SLOT_FIELDS) * 8
+        return (header_bytes + _ALIGN - 1) // _ALIGN * _ALIGN
+
+    @classmethod
+    def create(cls, shape, dtype=np.uint8, slots=4, name=None):
+        """
+        :param shape: Forma de los frames, ej. (1080, 1920, 3).
+        :param slots: Lugares del anillo: un slot se reutiliza tras slots-1 frames nuevos.
+        """
+        dtype = np.dtype(dtype)
+        size = cls._data_offset(slots) + slots * int(np.prod(shape)) * dtype.itemsize
+        shm = _open_shm(name, create=True, size=size)
+        header = np.ndarray((_META_FIELDS + slots * _SLOT_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        dims = list(shape) + [0] * (3 - len(shape))
+        header[:_META_FIELDS] = [_MAGIC, slots, dims[0], dims[1], dims[2], ord(dtype.char), 0, -1]
+        del header
+        try:
+            return cls(shm, owner=True)
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+
+    @classmethod
+    def attach(cls, name):
+        return cls(_open_shm(name))
+
+    # --- Escritor (captura) ---
+
+    def begin_write(self):
+        """
+        Reserva el siguiente slot para escribir (su secuencia queda impar: los lectores
+        que lo estén usando verán is_valid() == False).
+        :return: (slot, vista donde escribir el frame, ej. cap.read(image=vista))
+        """
+        slot = self._next
+        if slot == self._meta[7]:
+            slot = (slot + 1) % self.slots # Nunca se pisa el último frame publicado
+        self._next = (slot + 1) % self.slots
+        # Secuencia impar ANTES de tocar los datos. Supuesto de orden de memoria: los otros
+        # procesos ven los almacenamientos en orden de programa. x86 lo garantiza; en ARM no hay
+        # barrera explícita (Python no la expone) y se confía en las llamadas de NumPy/OpenCV
+        # que separan este incremento de la escritura del frame
+        self._slot_meta[slot, 0] += 1
+        return slot, self._frames[slot]
+
+    def publish(self, slot):
+        """Publica el frame escrito en el slot. :return: frame_id asignado."""
+        frame_id = int(self._meta[6]) + 1
+        self._slot_meta[slot, 1] = frame_id
+        self._slot_meta[slot, 2] = time.time_ns()
+        # Par: escritura terminada. Mismo supuesto de orden que en begin_write: los datos
+        # del frame deben ser visibles antes que esta secuencia y que el último slot/frame_id
+        self._slot_meta[slot, 0] += 1
+        self._meta[7] = slot
+        self._meta[6] = frame_id
+        return frame_id
+
+    def abort(self, slot):
+        """Cancela la escritura (ej. frame sin cambios): el slot queda sin frame."""
+        self._slot_meta[slot, 1] = -1
+        self._slot_meta[slot, 0] += 1
+
+    def write(self, frame):
+        """Copia un frame al anillo y lo publica. :return: frame_id"""
+        slot, view = self.begin_write()
+        np.copyto(view, frame)
+        return self.publish(slot)
+
+    # --- Lectores (análisis) ---
+
+    def latest(self, after=0):
+        """
+        Frame más reciente, sin copiarlo.
+        :param after: frame_id del último frame ya procesado (solo se devuelve uno más nuevo).
+        :return: FrameRef o None si no hay frame nuevo.
+        """
+        for _ in range(3):
+            frame_id = int(self._meta[6])
+            slot = int(self._meta[7])
+            if frame_id <= after or slot < 0:
+                return None
+            # Secuencia leída antes de usar los datos; is_valid() la vuelve a leer después
+            # (se asume el mismo orden de memoria que en el escritor, ver begin_write)
+            seq = int(self._slot_meta[slot, 0])
+            if seq % 2 == 0 and int(self._slot_meta[slot, 1]) == frame_id:
+                timestamp = int(self._slot_meta[slot, 2]) / 1e9
+                return FrameRef(slot, seq, frame_id, timestamp, self._frames[slot])
+            # El escritor publicó otro frame mientras se leía el encabezado: reintentar
+        return None
+
+    def wait_latest(self, after=0, timeout=0.1, poll=0.001):
+        """Como latest(), pero espera (sondeo) hasta 'timeout' segundos por un frame nuevo."""
+        deadline = time.perf_counter() + timeout
+        while True:
+            ref = self.latest(after)
+            if ref is not None or time.perf_counter() >= deadline:
+                return ref
+            time.sleep(poll)
+
+    def is_valid(self, ref):
+        """True si el slot no se reutilizó desde que se tomó 'ref' (los datos leídos son de ese frame)."""
+        # Debe leerse DESPUÉS de terminar con los datos del frame (orden de memoria: ver begin_write)
+        return int(self._slot_meta[ref.slot, 0]) == ref.seq
+
+    @property
+    def frames_published(self):
+        return int(self._meta[6])
+
+    def close(self):
+        # Las vistas deben soltarse antes de cerrar el bloque
+        self._frames = []
+        self._meta = self._slot_meta = None
+        self.shm.close()
+
+    def unlink(self):
+        """Libera la memoria compartida (solo el proceso dueño)."""
+        if self.owner:
+            _created.discard(self.shm._name)
+            self.shm.unlink()
@@ -0,0 +1,155 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from image_processing import (
+    PointOperationLUT, apply_digital_zoom, extract_zoomed_roi, pyramid_downscale, apply_mask, apply_histogram_equalization,
+    apply_point_operations, apply_morphology, MORPH_ERODE_DILATE
+)
+
+
+def _memory_owner(array):
+    """Array dueño de la memoria de 'array' (el final de su cadena de .base)."""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+class StageCache:
+    """
+    Caché LRU de resultados intermedios, acotado por memoria (bytes).
+    Cada clave identifica el frame de entrada más los parámetros de la etapa
+    y de TODAS las etapas anteriores.
+    Las vistas (ej. un recorte o una etapa que devuelve su entrada) comparten memoria
+    con otro array: cada bloque de memoria se cuenta una sola vez, mientras alguna
+    entrada lo retenga.
+    """
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._owners = {} # id(dueño) -> [dueño, entradas que lo retienen]
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        """Devuelve el resultado guardado para 'key' o lo calcula con compute() y lo guarda."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        value = compute()
+        if value is not None:
+            self._entries[key] = value
+            self._retain(value)
+            self._evict()
+        return value
+
+    @property
+    def nbytes(self):
+        """Memoria retenida por la caché (cada bloque compartido se cuenta una vez)."""
+        return self._total_bytes
+
+    def _retain(self, value):
+        owner = _memory_owner(value)
+        entry = self._owners.get(id(owner))
+        if entry is None:
+            self._owners[id(owner)] = [owner, 1]
+            self._total_bytes += owner.nbytes
+        else:
+            entry[1] += 1
+
+    def _release(self, value):
+        owner = _memory_owner(value)
+        entry = self._owners[id(owner)]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._owners[id(owner)]
+            self._total_bytes -= owner.nbytes
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta respetar el límite (conserva siempre la última)."""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, value = self._entries.popitem(last=False)
+            self._release(value)
+
+    def clear(self):
+        self._entries.clear()
+        self._owners.clear()
+        self._total_bytes = 0
+
+
+class CachedPipeline:
+    """
+    Grafo de etapas memoizado sobre las funciones de image_processing.py.
+    Al mover un slider solo se recalculan la etapa afectada y las posteriores
+    (ej. el slider de dilatación solo recalcula la morfología).
+    Pensado para imágenes estáticas; con cámara cada frame es nuevo y conviene FramePipeline.
+    IMPORTANTE: los resultados se comparten con la caché, no deben modificarse.
+    """
+    def __init__(self, max_bytes=256 * 1024 * 1024, executor=None):
+        """
+        :param max_bytes: Límite de memoria de la caché.
+        :param executor: TiledExecutor opcional para repartir filtros y morfología entre hilos.
+        """
+        self.cache = StageCache(max_bytes)
+        self.point_lut = PointOperationLUT()
+        self.executor = executor
+
+    def digital_zoom(self, frame_id, image, factor):
+        """Zoom digital memoizado por (frame, factor)."""
+        key = ("zoom", frame_id, factor)
+        return self.cache.get_or_compute(key, lambda: apply_digital_zoom(image, factor))
+
+    def pyramid_down(self, frame_id, image, levels):
+        """Copia reducida por pirámide (vista previa), memoizada por (frame, niveles)."""
+        key = ("pyramid", frame_id, levels)
+        return self.cache.get_or_compute(key, lambda: pyramid_downscale(image, levels))
+
+    def zoomed_roi(self, roi_key, image, factor, roi_coords):
+        """ROI con zoom remuestreado desde la imagen original, memoizado por roi_key."""
+        key = ("zoomed_roi", roi_key)
+        return self.cache.get_or_compute(key, lambda: extract_zoomed_roi(image, factor, roi_coords))
+
+    def process_roi_heavy(self, roi_key, image, brightness, contrast, equalize, mask_type,
+                          thresh_active, thresh_val, thresh_type, erode, dilate,
+                          morph_mode=MORPH_ERODE_DILATE, morph_shape="Rectángulo"):
+        """
+        Igual que process_roi_heavy(), memoizando cada etapa.
+        :param roi_key: Identidad del recorte de entrada, ej. (frame_id, zoom, roi_coords).
+        """
+        if image is None: return None
+
+        # 1. Filtros Espaciales
+        key = ("roi", roi_key, "mask", mask_type)
+        run_mask = self.executor.apply_mask if self.executor is not None else apply_mask
+        processed = self.cache.get_or_compute(key, lambda: run_mask(image, mask_type))
+
+        # 2. Ecualización
+        if equalize:
+            key = key + ("equalize",)
+            source = processed
+            processed = self.cache.get_or_compute(key, lambda: apply_histogram_equalization(source))
+
+        # 3. Brillo, Contraste y Umbral (LUT)
+        key = key + ("point", brightness, contrast, thresh_active,
+                     thresh_val if thresh_active else None, thresh_type if thresh_active else None)
+        source = processed
+        processed = self.cache.get_or_compute(key, lambda: apply_point_operations(
+            source, brightness, contrast, thresh_active, thresh_val, thresh_type,
+            point_lut=self.point_lut
+        ))
+
+        # 4. Morfología
+        if thresh_active:
+            key = key + ("morph", erode, dilate, morph_mode, morph_shape)
+            source = processed
+            if self.executor is not None:
+                compute = lambda: self.executor.apply_morphology(source, erode, dilate, morph_mode, morph_shape)
+            else:
+                compute = lambda: apply_morphology(source, erode, dilate, mode=morph_mode, shape=morph_shape)
+            processed = self.cache.get_or_compute(key, compute)
+
+        return processed
@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+
+# Resoluciones de referencia (ancho, alto)
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+def make_fin_frame(width, height, pitch=40.0, phase=0.0, fin_width=0.35,
+                   noise=8.0, seed=None):
+    """
+    Genera un frame BGR sintético con un patrón de aletas verticales (tubulador).
+    :param width: Ancho del frame (px).
+    :param height: Alto del frame (px).
+    :param pitch: Separación entre aletas (px).
+    :param phase: Desplazamiento horizontal del patrón (px), para simular movimiento.
+    :param fin_width: Fracción del paso ocupada por la aleta brillante (0 a 1).
+    :param noise: Desviación estándar del ruido gaussiano (niveles de gris).
+    :param seed: Semilla del ruido (None = aleatoria).
+    :return: Imagen BGR uint8.
+    """
+    x = np.arange(width, dtype=np.float32) + phase
+    # Perfil suave: coseno elevado recortado al ancho de la aleta
+    position = (x % pitch) / pitch
+    profile = np.clip(np.cos((position - 0.5) * np.pi / max(fin_width, 1e-3)), 0, 1)
+    row = 40 + 170 * profile
+
+    # Sombreado vertical leve (iluminación no uniforme)
+    y = np.linspace(0.85, 1.0, height, dtype=np.float32)[:, None]
+    gray = row[None, :] * y
+
+    if noise > 0:
+        rng = np.random.default_rng(seed)
+        gray = gray + rng.normal(0, noise, size=gray.shape).astype(np.float32)
+
+    gray = np.clip(gray, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
@@ -0,0 +1,201 @@
+"""
+Análisis de aletas sobre frames sintéticos de paso conocido (synthetic_frames).
+"""
+import numpy as np
+import pytest
+
+from fin_analysis import (
+    FinTracker, ProjectionIndex, analyze_rois, compute_projection, estimate_pitch, estimate_pitch_batch, locate_fins,
+    locate_fins_batch, split_bands
+)
+from synthetic_frames import make_fin_frame
+
+WIDTH = 640
+
+
+def _projection(pitch, phase=0.0, width=WIDTH, height=90, seed=1):
+    return compute_projection(make_fin_frame(width, height, pitch=pitch, phase=phase, seed=seed))
+
+
+def _crests(pitch, phase, width=WIDTH):
+    """Columnas de las crestas de make_fin_frame (centro de cada aleta brillante)."""
+    return np.arange((0.5 * pitch - phase) % pitch, width, pitch)
+
+
+# Filas de 255 que caben en el acumulador int32 del índice (y de compute_projection)
+MAX_INDEX_ROWS = np.iinfo(np.int32).max // 255
+
+
+# --- Índice de proyección ---
+
+RECTS = [
+    (0, 0, WIDTH, 90),      # Frame completo
+    (13, 7, 301, 64),
+    (600, 50, WIDTH, 90),   # Esquina inferior derecha
+    (-20, -5, 40, 30),      # Parcialmente fuera: se recorta
+    (100, 89, 180, 90),     # Una sola fila
+]
+
+
+@pytest.mark.parametrize("rect", RECTS)
+def test_projection_index_matches_compute_projection(rect):
+    frame = make_fin_frame(WIDTH, 90, pitch=23.7, seed=3)
+    index = ProjectionIndex().build(frame)
+    x1, y1, x2, y2 = rect
+    expected = compute_projection(frame[max(0, y1):y2, max(0, x1):x2])
+    assert np.array_equal(index.projection(*rect), expected)
+
+    projections, widths = index.projections([rect])
+    assert widths[0] == expected.size
+    assert np.array_equal(projections[0, :widths[0]], expected)
+
+
+def test_projection_index_outside_rect_is_empty():
+    index = ProjectionIndex().build(make_fin_frame(64, 32, seed=0))
+    assert index.projection(70, 0, 90, 10).size == 0
+    assert index.projection(10, 5, 20, 5).size == 0
+
+
+def test_projection_index_int32_bound():
+    # Una columna de 255 con el máximo de filas que admite int32 no se desborda
+    column = np.full((MAX_INDEX_ROWS, 1), 255, np.uint8)
+    index = ProjectionIndex().build(column)
+    assert index.projection(0, 0, 1, MAX_INDEX_ROWS)[0] == 255 * MAX_INDEX_ROWS
+    assert compute_projection(column)[0] == 255 * MAX_INDEX_ROWS
+    assert 255 * (MAX_INDEX_ROWS + 1) > np.iinfo(np.int32).max
+
+
+# --- Paso por FFT con precisión sub-píxel ---
+
+@pytest.mark.parametrize("pitch", [17.3, 23.7, 40.0, 61.25])
+@pytest.mark.parametrize("phase", [0.0, 5.5])
+def test_estimate_pitch_recovers_known_pitch_and_phase(pitch, phase):
+    estimate = estimate_pitch(_projection(pitch, phase))
+    assert estimate is not None
+    assert estimate.pitch == pytest.approx(pitch, abs=0.01)
+    # Fase módulo el paso: la primera cresta del patrón
+    crest = _crests(pitch, phase)[0]
+    assert (estimate.phase - crest + pitch / 2) % pitch - pitch / 2 == pytest.approx(0.0, abs=0.05)
+    assert 0.0 < estimate.strength <= 1.0
+
+
+@pytest.mark.parametrize("pitch", [17.3, 23.7, 40.0, 61.25])
+@pytest.mark.parametrize("phase", [0.0, 5.5])
+def test_locate_fins_finds_every_crest(pitch, phase):
+    positions, estimate = locate_fins(_projection(pitch, phase))
+    crests = _crests(pitch, phase)
+    assert estimate is not None
+    assert len(positions) == len(crests)
+    # La cresta de make_fin_frame es plana en 1-2 px a pasos grandes: tolerancia de medio píxel
+    assert np.abs(positions - crests).max() < 0.6
+
+
+def test_flat_or_short_projection_has_no_pitch():
+    assert estimate_pitch(np.full(100, 5.0)) is None
+    assert estimate_pitch(np.arange(5.0)) is None
+    positions, estimate = locate_fins(np.full(100, 5.0))
+    assert positions.size == 0 and estimate is None
+
+
+# --- Análisis por lotes (varios ROIs / franjas) ---
+
+def _padded_batch():
+    """Proyecciones de distinto paso y ancho, rellenas con ceros a la derecha."""
+    rows = [_projection(pitch, 3.0, width, seed=2)
+            for pitch, width in [(17.3, 640), (23.7, 400), (40.0, 555), (61.25, 300), (30.0, 5)]]
+    widths = [row.size for row in rows]
+    batch = np.zeros((len(rows), max(widths)), np.int32)
+    for i, row in enumerate(rows):
+        batch[i, :row.size] = row
+    return rows, batch, widths
+
+
+def test_locate_fins_batch_matches_per_row():
+    rows, batch, widths = _padded_batch()
+    pitch, _, phase = estimate_pitch_batch(batch, widths)
+    positions, valid, batch_pitch = locate_fins_batch(batch, widths)
+    for i, row in enumerate(rows):
+        single, estimate = locate_fins(row)
+        if estimate is None:
+            assert np.isnan(pitch[i]) and not valid[i].any()
+            continue
+        # La FFT del lote se rellena al ancho mayor: el paso cambia solo en el ruido numérico
+        assert pitch[i] == pytest.approx(estimate.pitch, abs=1e-3)
+        assert phase[i] == pytest.approx(estimate.phase, abs=1e-2)
+        assert batch_pitch[i] == pitch[i]
+        assert np.allclose(positions[i][valid[i]], single)
+
+
+def test_analyze_rois_matches_per_band():
+    frame = make_fin_frame(WIDTH, 120, pitch=23.7, seed=4)
+    index = ProjectionIndex().build(frame)
+    rois = [(0, 0, WIDTH, 120), (40, 10, 500, 110)]
+    results = analyze_rois(index, rois, n_bands=3)
+    assert [(r.roi_index, r.band_index) for r in results] == [(i, j) for i in range(2) for j in range(3)]
+    for result in results:
+        rect = split_bands(rois[result.roi_index], 3)[result.band_index]
+        assert result.coords == rect
+        single, _ = locate_fins(index.projection(*rect))
+        assert result.pitch == pytest.approx(23.7, abs=0.05)
+        assert np.allclose(result.peaks, single + rect[0])
+        assert result.pitch_variance < 1.0
+
+
+# --- Seguimiento entre frames ---
+
+TRACK_PITCH = 25.0
+
+
+def _shifted(shift, width=400):
+    """Proyección sin ruido del patrón desplazado 'shift' px a la derecha."""
+    return compute_projection(make_fin_frame(width, 60, pitch=TRACK_PITCH, phase=-shift, noise=0))
+
+
+def test_tracker_smooths_positions_with_ema():
+    tracker = FinTracker(position_alpha=0.4)
+    first, count = tracker.update(_shifted(0.0), "roi")
+    first = first.copy()
+    assert count == len(_crests(TRACK_PITCH, 0.0, 400)) and tracker.pitch == pytest.approx(TRACK_PITCH)
+
+    # Patrón desplazado 2 px: cada aleta se mueve alpha * 2 px (sin nueva detección completa)
+    positions, count = tracker.update(_shifted(2.0), "roi")
+    assert tracker.full_detections == 1 and tracker.tracked_frames == 1
+    assert np.allclose(positions - first, 0.4 * 2.0)
+    assert count == first.size
+
+
+def test_tracker_reassociates_fins_while_pattern_moves():
+    tracker = FinTracker(redetect_every=0)
+    first = tracker.update(_shifted(0.0), "roi")[0].copy()
+    # Avance de 0.5 px por frame hasta 8 px y luego quieto: cada aleta sigue a la misma cresta
+    for shift in list(np.arange(0.5, 8.5, 0.5)) + [8.0] * 20:
+        positions, count = tracker.update(_shifted(shift), "roi")
+    assert tracker.full_detections == 1
+    assert count == first.size
+    assert np.allclose(positions, first + 8.0, atol=0.05)
+
+
+def test_tracker_resets_on_parameter_change():
+    tracker = FinTracker()
+    tracker.update(_shifted(0.0), "roi-a")
+    tracker.update(_shifted(1.0), "roi-a")
+    assert tracker.full_detections == 1
+
+    # Otra configuración (key): detección completa, sin arrastrar el EMA anterior
+    positions, _ = tracker.update(_shifted(6.0), "roi-b")
+    assert tracker.full_detections == 2 and tracker.key == "roi-b"
+    assert np.allclose(positions, locate_fins(_shifted(6.0))[0])
+
+    # Otro ancho de proyección también reinicia
+    tracker.update(_shifted(6.0, width=300), "roi-b")
+    assert tracker.full_detections == 3
+
+
+def test_tracker_smooths_count_with_ema():
+    # Detección simulada: 10 aletas y luego 5 (la proyección plana obliga a detectar siempre)
+    detections = iter([np.arange(10.0) * 10, np.arange(5.0) * 10, np.arange(5.0) * 10])
+    tracker = FinTracker(detect=lambda projection: next(detections), count_alpha=0.2)
+    flat = np.zeros(120)
+    assert tracker.update(flat)[1] == 10
+    assert tracker.update(flat)[1] == 9   # 10 + 0.2 * (5 - 10)
+    assert tracker.update(flat)[1] == 8   # 9 + 0.2 * (5 - 9) = 8.2
@@ -0,0 +1,41 @@
+"""
+FrameMailbox: buzón de un solo lugar donde gana el frame más reciente.
+"""
+import threading
+
+from frame_mailbox import FrameMailbox
+
+
+def test_overwrite_keeps_latest_and_counts_drops():
+    dropped = []
+    mailbox = FrameMailbox(on_drop=dropped.append)
+    assert mailbox.put("f1") is True   # Buzón vacío: hay que avisar al consumidor
+    assert mailbox.put("f2") is False  # Ya había un aviso pendiente
+    assert mailbox.put("f3") is False
+
+    frame, waited = mailbox.take()
+    assert frame == "f3" and waited >= 0
+    assert dropped == ["f1", "f2"]
+    assert mailbox.stats() == {"posted": 3, "delivered": 1, "dropped": 2}
+    assert mailbox.take() == (None, None)
+
+
+def test_clear_drops_pending_frame():
+    dropped = []
+    mailbox = FrameMailbox(on_drop=dropped.append)
+    mailbox.clear()
+    mailbox.put("f1")
+    mailbox.clear()
+    assert dropped == ["f1"] and mailbox.take() == (None, None)
+    assert mailbox.put("f2") is True
+    assert mailbox.stats()["dropped"] == 1
+
+
+def test_take_waits_for_a_frame():
+    mailbox = FrameMailbox()
+    assert mailbox.take(timeout=0.01) == (None, None)
+    timer = threading.Timer(0.02, mailbox.put, args=("f1",))
+    timer.start()
+    frame, _ = mailbox.take(timeout=5.0)
+    timer.join()
+    assert frame == "f1"
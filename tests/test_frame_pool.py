@@ -0,0 +1,68 @@
+"""
+FramePool: buffers reciclados con contador de referencias (un solo proceso, sin cámara).
+"""
+import numpy as np
+
+from frame_pool import FramePool
+
+SHAPE = (4, 6, 3)
+
+
+def _read(pool):
+    """Simula cap.read(image=buf): usa el buffer libre o asigna uno nuevo."""
+    buf = pool.acquire()
+    frame = buf if buf is not None else np.zeros(SHAPE, np.uint8)
+    return pool.adopt(frame, buf)
+
+
+def test_pool_exhaustion_overflows_and_release_recycles():
+    pool = FramePool(capacity=2)
+    first, second = _read(pool), _read(pool)
+    assert pool.acquire() is None # Pool agotado: todos los buffers tienen dueño
+
+    extra = _read(pool)           # Se lee fuera del pool y no se recicla
+    stats = pool.stats()
+    assert stats["pool_allocated"] == 2 and stats["pool_overflow"] == 1 and stats["pool_in_use"] == 2
+    pool.release(extra)
+    assert pool.stats()["pool_free"] == 0
+
+    pool.release(first)
+    assert pool.stats()["pool_free"] == 1
+    recycled = _read(pool)
+    assert recycled is first and pool.stats()["pool_reused"] == 1
+    pool.release(second)
+    pool.release(recycled)
+    assert pool.stats()["pool_free"] == 2 and pool.stats()["pool_in_use"] == 0
+
+
+def test_buffer_returns_only_after_every_owner_releases():
+    pool = FramePool(capacity=1)
+    frame = _read(pool)
+    pool.retain(frame)            # Segundo dueño (ej. el resultado mostrado)
+    pool.release(frame)
+    assert pool.acquire() is None
+    pool.release(frame)
+    assert pool.acquire() is frame
+
+
+def test_extra_release_and_foreign_arrays_are_ignored():
+    pool = FramePool(capacity=1)
+    frame = _read(pool)
+    pool.release(frame)
+    pool.release(frame)           # Ya libre: no se duplica en la lista libre
+    pool.release(np.zeros(SHAPE, np.uint8))
+    pool.release(None)
+    assert pool.stats()["pool_free"] == 1
+    assert pool.acquire() is frame and pool.acquire() is None
+
+
+def test_resolution_change_drops_old_buffers():
+    pool = FramePool(capacity=2)
+    old = _read(pool)
+    pool.release(old)
+    buf = pool.acquire()
+    # El driver no pudo usar el buffer (otra resolución): se incorpora el frame nuevo
+    frame = pool.adopt(np.zeros((8, 12, 3), np.uint8), buf)
+    assert pool.shape == (8, 12, 3)
+    pool.release(frame)
+    assert pool.acquire() is frame and pool.acquire() is None
@@ -0,0 +1,34 @@
+"""
+El daemon con la configuración por defecto (sin ROI = vista completa) debe contar aletas;
+la GUI sin ROI no analiza nada.
+"""
+import json
+
+from frame_analyzer import FrameAnalyzer
+from inspection_daemon import build_processing_params, load_config, run
+from synthetic_frames import make_fin_frame
+
+
+def test_default_config_counts_fins_on_synthetic_source(tmp_path):
+    output = tmp_path / "fins.jsonl"
+    config = load_config()
+    config["source"] = {"type": "synthetic", "width": 640, "height": 360, "realtime": False}
+    config["output"] = str(output)
+
+    summary = run(config, max_frames=5)
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert summary["results"] == len(records) == 5
+    assert all(record["fin_count"] > 0 for record in records)
+
+
+def test_analyzer_skips_roi_without_full_view():
+    # La GUI sin ROI seleccionado no procesa la vista completa; el daemon sí (full_view)
+    frame = make_fin_frame(640, 360, seed=0)
+    params = build_processing_params(load_config()["params"])
+    assert params.full_view
+
+    daemon_result = FrameAnalyzer().analyze(frame, params)
+    gui_result = FrameAnalyzer().analyze(frame, params._replace(full_view=False))
+    assert daemon_result.count > 0
+    assert gui_result.roi_image is None and gui_result.count == 0
@@ -0,0 +1,58 @@
+"""
+apply_morphology usa UN elemento estructurante equivalente a N iteraciones:
+el resultado debe ser idéntico bit a bit al de las iteraciones de OpenCV.
+"""
+import cv2
+import numpy as np
+import pytest
+
+from image_processing import MORPH_ERODE_DILATE, apply_morphology
+
+KERNEL_2X2 = np.ones((2, 2), np.uint8)
+KERNEL_3X3 = np.ones((3, 3), np.uint8)
+
+
+def _images():
+    rng = np.random.default_rng(0)
+    binary = (rng.random((61, 83)) > 0.5).astype(np.uint8) * 255
+    gray = rng.integers(0, 256, (61, 83), dtype=np.uint8)
+    return {"binary": binary, "gray": gray}
+
+
+IMAGES = _images()
+
+
+@pytest.mark.parametrize("kind", IMAGES)
+@pytest.mark.parametrize("iterations", range(6))
+def test_erode_matches_iterated_2x2(kind, iterations):
+    img = IMAGES[kind]
+    expected = cv2.erode(img, KERNEL_2X2, iterations=iterations)
+    assert np.array_equal(apply_morphology(img, iterations, 0), expected)
+
+
+@pytest.mark.parametrize("kind", IMAGES)
+@pytest.mark.parametrize("iterations", range(6))
+def test_dilate_matches_iterated_2x2(kind, iterations):
+    img = IMAGES[kind]
+    expected = cv2.dilate(img, KERNEL_2X2, iterations=iterations)
+    assert np.array_equal(apply_morphology(img, 0, iterations), expected)
+
+
+@pytest.mark.parametrize("kind", IMAGES)
+@pytest.mark.parametrize("iterations", range(6))
+def test_erode_then_dilate_matches_iterated_2x2(kind, iterations):
+    img = IMAGES[kind]
+    eroded = cv2.erode(img, KERNEL_2X2, iterations=iterations)
+    expected = cv2.dilate(eroded, KERNEL_2X2, iterations=iterations)
+    assert np.array_equal(apply_morphology(img, iterations, iterations, mode=MORPH_ERODE_DILATE), expected)
+
+
+@pytest.mark.parametrize("kind", IMAGES)
+@pytest.mark.parametrize("iterations", range(6))
+@pytest.mark.parametrize("mode, op", [("Apertura", cv2.MORPH_OPEN), ("Cierre", cv2.MORPH_CLOSE)])
+def test_open_close_match_iterated_3x3(kind, iterations, mode, op):
+    # Los modos compuestos usan un kernel centrado de radio N (= N iteraciones de 3x3)
+    img = IMAGES[kind]
+    expected = cv2.morphologyEx(img, op, KERNEL_3X3, iterations=iterations) if iterations else img
+    assert np.array_equal(apply_morphology(img, iterations, 0, mode=mode), expected)
+    assert np.array_equal(apply_morphology(img, 0, iterations, mode=mode), expected)
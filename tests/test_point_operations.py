@@ -0,0 +1,103 @@
+"""
+Brillo, contraste y umbral fusionados en tablas de 256 entradas (PointOperationLUT):
+process_roi_heavy / process_image deben dar lo mismo que la cadena original de OpenCV
+(convertScaleAbs -> gris -> threshold), con entrada a color o en gris.
+"""
+import cv2
+import numpy as np
+import pytest
+
+from image_processing import MASK_TYPES, process_image, process_roi_heavy
+
+KERNEL_2X2 = np.ones((2, 2), np.uint8)
+
+
+# --- Cadena original (una etapa por llamada de OpenCV, siempre en BGR) ---
+
+def _baseline_mask(image, mask_type):
+    if mask_type == "Escala de Grises":
+        return cv2.cvtColor(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+    if mask_type == "Filtro Pasa Bajos (Averaging)":
+        return cv2.blur(image, (7, 7))
+    if mask_type == "Filtro Pasa Altos (Laplaciano)":
+        laplacian = cv2.Laplacian(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), cv2.CV_64F)
+        return cv2.cvtColor(cv2.convertScaleAbs(laplacian), cv2.COLOR_GRAY2BGR)
+    if mask_type == "Filtro Gaussiano":
+        return cv2.GaussianBlur(image, (5, 5), 0)
+    if mask_type == "Detección de Bordes (Canny)":
+        return cv2.cvtColor(cv2.Canny(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), 100, 200), cv2.COLOR_GRAY2BGR)
+    return image.copy()
+
+
+def _baseline_equalize(image):
+    return cv2.cvtColor(cv2.equalizeHist(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)), cv2.COLOR_GRAY2BGR)
+
+
+def _baseline_threshold(image, active, value, thresh_type, erode, dilate):
+    if not active:
+        return image
+    _, binary = cv2.threshold(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), value, 255, thresh_type)
+    if erode > 0:
+        binary = cv2.erode(binary, KERNEL_2X2, iterations=erode)
+    if dilate > 0:
+        binary = cv2.dilate(binary, KERNEL_2X2, iterations=dilate)
+    return cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR)
+
+
+def _baseline_heavy(image, brightness, contrast, equalize, mask_type, active, value, thresh_type, erode, dilate):
+    processed = _baseline_mask(image, mask_type)
+    if equalize:
+        processed = _baseline_equalize(processed)
+    processed = cv2.convertScaleAbs(processed, alpha=contrast, beta=brightness)
+    return _baseline_threshold(processed, active, value, thresh_type, erode, dilate)
+
+
+def _baseline_image(image, brightness, contrast, equalize, mask_type, active, value, thresh_type, erode, dilate):
+    processed = image
+    if equalize:
+        processed = _baseline_equalize(processed)
+    processed = cv2.convertScaleAbs(processed, alpha=contrast, beta=brightness)
+    processed = _baseline_mask(processed, mask_type)
+    return _baseline_threshold(processed, active, value, thresh_type, erode, dilate)
+
+
+def _as_bgr(image):
+    return image if image.ndim == 3 else cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+
+# Canales independientes: en un frame casi gris el orden contraste/gris no se nota
+COLOR = np.random.default_rng(0).integers(0, 256, (97, 131, 3), dtype=np.uint8)
+INPUTS = {"color": COLOR, "gray": cv2.cvtColor(COLOR, cv2.COLOR_BGR2GRAY)}
+POINT_OPS = [(0, 1.0), (-60, 2.5), (40, 1.7), (-100, 3.0)]
+THRESHOLDS = [
+    (False, 127, cv2.THRESH_BINARY, 0, 0),
+    (True, 30, cv2.THRESH_BINARY, 0, 0),
+    (True, 127, cv2.THRESH_BINARY, 2, 1),
+    (True, 200, cv2.THRESH_BINARY_INV, 0, 3),
+]
+
+
+@pytest.mark.parametrize("kind", INPUTS)
+@pytest.mark.parametrize("mask_type", MASK_TYPES)
+@pytest.mark.parametrize("equalize", [False, True])
+@pytest.mark.parametrize("brightness, contrast", POINT_OPS)
+@pytest.mark.parametrize("threshold", THRESHOLDS)
+def test_process_roi_heavy_matches_baseline(kind, mask_type, equalize, brightness, contrast, threshold):
+    img = INPUTS[kind]
+    args = (brightness, contrast, equalize, mask_type) + threshold
+    expected = _baseline_heavy(_as_bgr(img), *args)
+    assert np.array_equal(_as_bgr(process_roi_heavy(img, *args)), expected)
+
+
+@pytest.mark.parametrize("kind", INPUTS)
+@pytest.mark.parametrize("mask_type", MASK_TYPES)
+@pytest.mark.parametrize("equalize", [False, True])
+@pytest.mark.parametrize("brightness, contrast", POINT_OPS)
+@pytest.mark.parametrize("threshold", THRESHOLDS)
+def test_process_image_matches_baseline(kind, mask_type, equalize, brightness, contrast, threshold):
+    img = INPUTS[kind]
+    active, value, thresh_type, erode, dilate = threshold
+    expected = _baseline_image(_as_bgr(img), brightness, contrast, equalize, mask_type, *threshold)
+    result = process_image(img, brightness, contrast, equalize, mask_type, 1.0,
+                           active, value, thresh_type, erode, dilate)
+    assert np.array_equal(_as_bgr(result), expected)
@@ -0,0 +1,76 @@
+"""
+SharedFrameRing en un solo proceso: publicar, leer sin copias y detectar con is_valid()
+que el slot se reutilizó (seqlock).
+"""
+import numpy as np
+import pytest
+
+from shared_frames import SharedFrameRing
+
+SHAPE = (6, 8, 3)
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(SHAPE, slots=3)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def _frame(value):
+    return np.full(SHAPE, value, np.uint8)
+
+
+def test_publish_and_read_latest(ring):
+    assert ring.latest() is None
+    assert ring.write(_frame(1)) == 1
+    assert ring.write(_frame(2)) == 2
+
+    ref = ring.latest()
+    assert ref.frame_id == 2 and ref.seq % 2 == 0
+    assert np.array_equal(ref.frame, _frame(2))
+    assert ring.latest(after=2) is None  # Nada más nuevo que lo ya procesado
+    assert ring.frames_published == 2
+
+
+def test_attached_reader_sees_the_same_memory(ring):
+    ring.write(_frame(5))
+    reader = SharedFrameRing.attach(ring.name)
+    try:
+        assert (reader.shape, reader.dtype, reader.slots) == (SHAPE, np.dtype(np.uint8), 3)
+        ref = reader.latest()
+        assert ref.frame_id == 1 and np.array_equal(ref.frame, _frame(5))
+        slot, view = ring.begin_write()
+        view[:] = 9                      # Sin copias: el lector ve el slot del escritor
+        ring.publish(slot)
+        assert np.array_equal(reader.latest(after=1).frame, _frame(9))
+    finally:
+        reader.close()
+
+
+def test_is_valid_turns_false_after_the_slot_wraps(ring):
+    ring.write(_frame(1))
+    ref = ring.latest()
+    assert ring.is_valid(ref)
+    # Con 3 slots, el del frame 1 no se toca mientras sea el último publicado ni en la
+    # siguiente escritura; la tercera lo reutiliza
+    ring.write(_frame(2))
+    assert ring.is_valid(ref)
+    ring.write(_frame(3))
+    assert ring.is_valid(ref)
+    ring.write(_frame(4))
+    assert not ring.is_valid(ref)
+    assert ring.latest().frame_id == 4
+
+
+def test_slot_being_written_is_invalid_and_abort_leaves_no_frame(ring):
+    ring.write(_frame(1))
+    ring.write(_frame(2))
+    ref = ring.latest()
+    slot, _ = ring.begin_write()
+    assert slot != ref.slot              # Nunca se pisa el último frame publicado
+    assert ring.latest().frame_id == 2   # La escritura en curso no se publica
+    ring.abort(slot)
+    assert ring.latest().frame_id == 2 and ring.is_valid(ref)
+
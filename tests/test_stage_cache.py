@@ -0,0 +1,52 @@
+"""
+StageCache cuenta la memoria por bloque: las vistas de un mismo array se cobran una
+sola vez y el desalojo LRU mantiene la memoria retenida dentro del límite.
+"""
+import numpy as np
+
+from stage_cache import StageCache
+
+
+def test_views_of_one_array_are_charged_once():
+    cache = StageCache(max_bytes=10_000)
+    base = np.zeros((10, 100), np.uint8)   # 1000 bytes
+    cache.get_or_compute("full", lambda: base)
+    cache.get_or_compute("crop", lambda: base[2:5, 10:40])
+    cache.get_or_compute("crop-of-crop", lambda: base[2:5, 10:40][:, 5:])
+    assert cache.nbytes == base.nbytes
+
+    cache.get_or_compute("other", lambda: np.zeros(300, np.uint8))
+    assert cache.nbytes == base.nbytes + 300
+
+
+def test_shared_block_is_released_with_its_last_entry():
+    cache = StageCache(max_bytes=1500)
+    base = np.zeros(1000, np.uint8)
+    cache.get_or_compute("a", lambda: base)
+    cache.get_or_compute("b", lambda: base[:10])
+    # 1000 + 800 > 1500: se desalojan "a" y "b" (la vista no libera el bloque hasta la última)
+    cache.get_or_compute("c", lambda: np.zeros(800, np.uint8))
+    assert cache.nbytes == 800
+    assert cache.get_or_compute("c", lambda: None) is not None and cache.hits == 1
+
+
+def test_eviction_keeps_nbytes_within_budget():
+    budget = 4096
+    cache = StageCache(max_bytes=budget)
+    rng = np.random.default_rng(0)
+    arrays = []
+    for i in range(200):
+        if arrays and rng.random() < 0.5:
+            # Vista de un array ya visto (puede haber sido desalojado)
+            source = arrays[rng.integers(len(arrays))]
+            value = source[rng.integers(source.size):]
+        else:
+            value = np.zeros(int(rng.integers(100, 1500)), np.uint8)
+            arrays.append(value)
+        cache.get_or_compute(i, lambda: value)
+        assert cache.nbytes <= budget
+
+        # La cuenta coincide con los bloques distintos que retienen las entradas
+        owners = {id(v.base if v.base is not None else v): v.base if v.base is not None else v
+                  for v in cache._entries.values()}
+        assert cache.nbytes == sum(owner.nbytes for owner in owners.values())
@@ -0,0 +1,52 @@
+"""
+TiledExecutor divide en franjas con halo: el resultado unido debe ser idéntico bit a
+bit al de una sola pasada (si cambia MASK_HALO o morphology_halo, estas pruebas fallan).
+"""
+import numpy as np
+import pytest
+
+from image_processing import MASK_TYPES, MORPH_MODES, MORPH_SHAPES, apply_mask, apply_morphology
+from tiled_processing import TiledExecutor
+
+SHAPES = [(61, 83), (130, 97)]
+
+
+@pytest.fixture(scope="module")
+def executor():
+    # Sin tamaño mínimo y franjas chicas: incluso imágenes pequeñas se dividen en 4
+    executor = TiledExecutor(max_workers=4, min_pixels=0, min_strip_rows=8)
+    yield executor
+    executor.shutdown()
+
+
+def _color(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, shape + (3,), dtype=np.uint8)
+
+
+def _binary(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.random(shape) > 0.5).astype(np.uint8) * 255
+
+
+def test_images_are_split(executor):
+    assert executor.should_split(_binary(SHAPES[0]))
+    assert len(executor._strip_bounds(SHAPES[0][0])) > 1
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("mask_type", MASK_TYPES)
+def test_mask_matches_single_pass(executor, shape, mask_type):
+    img = _color(shape)
+    assert np.array_equal(executor.apply_mask(img, mask_type), apply_mask(img, mask_type))
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("mode", MORPH_MODES)
+@pytest.mark.parametrize("morph_shape", MORPH_SHAPES)
+@pytest.mark.parametrize("erode, dilate", sorted({(i, j) for i in range(6) for j in (0, i, 5 - i)}))
+def test_morphology_matches_single_pass(executor, shape, mode, morph_shape, erode, dilate):
+    img = _binary(shape)
+    expected = apply_morphology(img, erode, dilate, mode=mode, shape=morph_shape)
+    result = executor.apply_morphology(img, erode, dilate, mode=mode, shape=morph_shape)
+    assert np.array_equal(result, expected)
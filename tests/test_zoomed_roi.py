@@ -0,0 +1,33 @@
+"""
+extract_zoomed_roi remuestrea solo el ROI: debe coincidir (+-1 nivel) con recortar la
+imagen completa después de apply_digital_zoom, también en los bordes derecho/inferior.
+"""
+import cv2
+import numpy as np
+import pytest
+
+from image_processing import apply_digital_zoom, extract_zoomed_roi
+from synthetic_frames import make_fin_frame
+
+W, H = 257, 161
+COLOR = make_fin_frame(W, H, pitch=11.0, seed=0)
+INPUTS = {"color": COLOR, "gray": cv2.cvtColor(COLOR, cv2.COLOR_BGR2GRAY)}
+ROIS = [
+    (10, 20, 120, 90),
+    (0, 0, W, H),            # Vista completa
+    (W - 50, H - 40, W, H),  # Esquina inferior derecha (BORDER_REPLICATE)
+    (0, H - 7, W, H),        # Franja inferior
+    (W - 9, 0, W, H),        # Franja derecha
+]
+
+
+@pytest.mark.parametrize("kind", INPUTS)
+@pytest.mark.parametrize("factor", [1.0, 1.3, 2.0, 2.7, 4.9])
+@pytest.mark.parametrize("roi", ROIS)
+def test_extract_zoomed_roi_matches_crop_after_zoom(kind, factor, roi):
+    img = INPUTS[kind]
+    x1, y1, x2, y2 = roi
+    expected = apply_digital_zoom(img, factor)[y1:y2, x1:x2]
+    result = extract_zoomed_roi(img, factor, roi)
+    assert result.shape == expected.shape
+    assert np.abs(result.astype(np.int16) - expected.astype(np.int16)).max() <= 1
@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from image_processing import apply_mask, apply_morphology, morphology_halo, MORPH_ERODE_DILATE
+
+# Filas de halo que necesita cada máscara (radio vertical del kernel).
+# None = la operación no es local y no se puede dividir en franjas de forma exacta.
+MASK_HALO = {
+    "Ninguna": 0,
+    "Escala de Grises": 0,
+    "Filtro Pasa Bajos (Averaging)": 3,  # blur 7x7
+    "Filtro Pasa Altos (Laplaciano)": 1, # Laplaciano 3x3
+    "Filtro Gaussiano": 2,               # Gaussiano 5x5
+    "Detección de Bordes (Canny)": None, # la histéresis conecta bordes en todo el frame
+}
+
+# Máscaras cuya salida es de 1 canal
+_GRAY_OUTPUT_MASKS = ("Escala de Grises", "Filtro Pasa Altos (Laplaciano)", "Detección de Bordes (Canny)")
+
+class TiledExecutor:
+    """
+    Ejecuta filtros de imagen completa en franjas horizontales sobre un pool de hilos
+    (OpenCV libera el GIL). Cada franja incluye el halo que necesita el kernel y solo
+    se copia su parte central al resultado, así que el resultado es idéntico bit a bit
+    al de la ejecución en un solo hilo.
+    """
+    def __init__(self, max_workers=None, min_pixels=2_000_000, min_strip_rows=64):
+        """
+        :param max_workers: Hilos del pool (por defecto, núcleos del equipo).
+        :param min_pixels: Por debajo de este tamaño se procesa sin dividir (no compensa).
+        :param min_strip_rows: Alto mínimo de cada franja.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_pixels = min_pixels
+        self.min_strip_rows = min_strip_rows
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix="tiled")
+
+    def _strip_bounds(self, height):
+        """Límites [y0, y1) de cada franja."""
+        n_strips = max(1, min(self.max_workers, height // self.min_strip_rows))
+        edges = np.linspace(0, height, n_strips + 1).astype(int)
+        return list(zip(edges[:-1], edges[1:]))
+
+    def should_split(self, image):
+        return image.shape[0] * image.shape[1] >= self.min_pixels and self.max_workers > 1
+
+    def map_strips(self, func, image, halo, channels=None, dtype=np.uint8):
+        """
+        Aplica func(franja) por franjas y une los resultados.
+        :param func: Función local (la salida en cada píxel depende solo de +-halo filas).
+        :param image: Imagen de entrada.
+        :param halo: Filas extra por arriba y por abajo que necesita func.
+        :param channels: Canales de la salida (None = los mismos de la entrada).
+        :return: Imagen resultado del mismo alto y ancho que la entrada.
+        """
+        h, w = image.shape[:2]
+        if channels is None:
+            channels = 1 if len(image.shape) == 2 else image.shape[2]
+        out_shape = (h, w) if channels == 1 else (h, w, channels)
+        out = np.empty(out_shape, dtype)
+
+        def run_strip(y0, y1):
+            top = max(0, y0 - halo)
+            bottom = min(h, y1 + halo)
+            result = func(image[top:bottom])
+            out[y0:y1] = result[y0 - top:y0 - top + (y1 - y0)]
+
+        futures = [self._pool.submit(run_strip, y0, y1) for y0, y1 in self._strip_bounds(h)]
+        for future in futures:
+            future.result()  # Propaga excepciones de los hilos
+        return out
+
+    def apply_mask(self, image, mask_type):
+        """apply_mask() en franjas (Canny y "Ninguna" se ejecutan sin dividir)."""
+        halo = MASK_HALO.get(mask_type)
+        if halo is None or mask_type == "Ninguna" or not self.should_split(image):
+            return apply_mask(image, mask_type)
+        channels = 1 if mask_type in _GRAY_OUTPUT_MASKS else None
+        return self.map_strips(lambda strip: apply_mask(strip, mask_type), image, halo, channels)
+
+    def apply_morphology(self, binary_img, erode_iter, dilate_iter,
+                         mode=MORPH_ERODE_DILATE, shape="Rectángulo"):
+        """apply_morphology() en franjas, con el halo que necesita el elemento estructurante."""
+        halo = morphology_halo(erode_iter, dilate_iter, mode)
+        if halo == 0 or not self.should_split(binary_img):
+            return apply_morphology(binary_img, erode_iter, dilate_iter, mode=mode, shape=shape)
+        return self.map_strips(
+            lambda strip: apply_morphology(strip, erode_iter, dilate_iter, mode=mode, shape=shape),
+            binary_img, halo
+        )
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
@@ -1,23 +1,46 @@
+import os
 import sys
+import time
 import cv2
 import numpy as np
 from PyQt5.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QGridLayout, QFrame, 
-    QLabel, QSlider, QPushButton, QComboBox, QFileDialog, QCheckBox
+    QLabel, QSlider, QPushButton, QComboBox, QFileDialog, QCheckBox, QSpinBox, QDoubleSpinBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QPoint, QRect, QTimer, pyqtSignal
 from PyQt5.QtGui import QPixmap, QImage
 
 # Importar las clases y funciones de los otros módulos
-from video_thread import VideoThread
+from camera_manager import CameraManager
+from frame_analyzer import ProcessingParams
+from frame_recorder import RECORD_FORMATS, FrameRecorder
 from image_processing import process_image
-from custom_widgets import ROISelectableLabel, IntensityPlotWidget
-from scipy.signal import find_peaks
-from image_processing import apply_digital_zoom, process_roi_heavy
+from custom_widgets import ROISelectableLabel, IntensityPlotWidget, CameraTileLabel
+from fin_analysis import (
+    DEFAULT_PEAK_DISTANCE, PEAK_METHODS, ProjectionIndex, analyze_rois, compute_projection, detect_fins,
+    draw_peak_lines
+)
+from image_processing import (
+    extract_zoomed_roi, fit_to_display, FrameBuffers, FramePipeline, pyramid_levels, scale_roi_coords,
+    MORPH_MODES, MORPH_SHAPES, MORPH_ERODE_DILATE
+)
+from stage_cache import CachedPipeline
+from tiled_processing import TiledExecutor
 
 class MainWindow(QWidget):
     """Ventana principal de la aplicación con PyQt5 y OpenCV."""
-    def __init__(self):
+
+    # Un FrameRecorder terminó de escribir (se emite desde su hilo escritor)
+    recording_finished = pyqtSignal(object)
+
+    def __init__(self, capture_config=None, source_factory=None, station=None):
+        """
+        :param capture_config: CaptureConfig de la cámara (por defecto, la del dispositivo 1).
+        :param source_factory: Función sin argumentos que crea la fuente de reproducción
+                               (archivo, imágenes o sintética) en lugar de la cámara.
+        :param station: Estación multi-cámara: lista de (nombre, CaptureConfig o None,
+                        source_factory o None), una entrada por cámara. Reemplaza a los anteriores.
+        """
         super().__init__()
         self.setWindowTitle("Procesamiento de Imágenes Modular (PyQt5 + OpenCV)")
         #self.setGeometry(100, 100, 1000, 700)
@@ -26,13 +49,15 @@ class MainWindow(QWidget):
         
         # Variables de estado
         self.current_source_image = None  # Almacena la imagen original cargada o el frame de la cámara
-        self.current_processed_image = None # Guardamos la imagen procesada actual para el ROI
+        self.current_view_size = None # (ancho, alto) de la imagen con zoom, para mapear el ROI
         # Parámetros de imagen
         self.brightness_value = 0
         self.contrast_factor = 1.0  # ¡Nuevo!: Factor de contraste (Alpha)
         self.equalize_hist = False  # ¡Nuevo!: Estado de ecualización de histograma
         self.mask_type = "Ninguna"
         self.video_thread = None
+        self.capture_config = capture_config # Configuración de captura de la cámara
+        self.source_factory = source_factory # Fuente de reproducción en lugar de la cámara (opcional)
         self.is_camera_mode = False
         self.focus_value = 0      # Nuevo: Valor de enfoque
         self.zoom_factor = 1.0    # Nuevo: Factor de zoom digital
@@ -42,11 +67,64 @@ class MainWindow(QWidget):
         self.thresh_type = cv2.THRESH_BINARY # Tipo de umbral (e.g., THRESH_BINARY)
         self.erode_iterations = 0     # Iteraciones de erosión
         self.dilate_iterations = 0    # Iteraciones de dilatación
+        self.morph_mode = MORPH_ERODE_DILATE # Operación morfológica
+        self.morph_shape = "Rectángulo"      # Forma del elemento estructurante
 
         # Variable para guardar las coordenadas del ROI seleccionado
         # Formato: (x1, y1, x2, y2) referidos a la imagen ORIGINAL (no la pantalla)
         self.roi_coords = None
 
+        # Pipeline con buffers preasignados: cero asignaciones por frame en estado estable
+        self.frame_pipeline = FramePipeline()
+        # Buffers de las imágenes ya ajustadas al tamaño de cada QLabel (uno por widget)
+        self.display_buffers = FrameBuffers()
+        # Caché por etapas para imágenes estáticas: un slider solo recalcula sus etapas.
+        # Las fotos grandes reparten filtros y morfología en franjas entre todos los núcleos.
+        self.tiled_executor = TiledExecutor()
+        self.cached_pipeline = CachedPipeline(executor=self.tiled_executor)
+        self.frame_id = 0  # Identidad del frame actual (cambia con cada imagen/frame nuevo)
+
+        # Vista previa: mientras se arrastra un slider se procesa una copia reducida
+        self.preview_active = False
+        self.preview_max_side = 960 # Lado mayor (px) de la copia reducida
+        self.last_peaks = None      # Picos del último análisis, en píxeles del ROI a resolución completa
+        self.last_pitch = None      # Paso entre aletas (px, resolución completa) del último análisis por FFT
+        self.peak_method = "fft"    # "fft" (paso por FFT, sub-píxel) o "find_peaks" (distancia fija)
+
+        # Arrastre del ROI: el frame completo (reducido) se procesa una vez y se indexa por
+        # columnas; cada movimiento del mouse solo resta dos filas del índice
+        self.drag_roi_coords = None         # ROI provisional mientras se arrastra (coordenadas de la vista)
+        self.projection_index = ProjectionIndex()
+        self.index_pipeline = FramePipeline() # Buffers propios (el frame completo no alterna con el ROI)
+        self.index_image = None             # Frame procesado que respalda el índice
+
+        # Varios ROIs / franjas: se analizan juntos en una sola pasada por lotes sobre el índice
+        self.extra_rois = []        # ROIs adicionales (Shift + arrastre), coordenadas de la vista
+        self.bands_per_roi = 1      # Franjas horizontales por ROI
+        self.band_results = []      # BandResult del último análisis (picos/paso en resolución completa)
+
+        # Cámara: los frames sin cambios se descartan en el hilo de captura
+        self.skip_unchanged = True
+        self.change_threshold = 2.0 # Diferencia media (niveles de gris) de la miniatura
+        # Cámara: captura -> procesamiento (hilos propios por cámara) -> GUI; la GUI solo
+        # muestra resultados. video_thread / processing_worker son los de la cámara activa.
+        self.station = station
+        self.camera_manager = CameraManager(self)
+        self.camera_manager.result_ready.connect(self.handle_camera_result)
+        self.active_camera = 0
+        self.processing_worker = None
+        self.camera_tiles = []        # (CameraTileLabel, QLabel de estadísticas) por cámara
+        self.tile_size = (240, 135)   # Vista de las cámaras no activas (px)
+
+        # Grabación de evidencia: un FrameRecorder (hilo escritor propio) por tipo de imagen
+        self.recordings_dir = "recordings"
+        self.recorders = {}           # "raw" / "roi" -> FrameRecorder activo
+        self.finishing_recorders = [] # (nombre, FrameRecorder) detenidos que aún vacían su cola
+        self.recording_finished.connect(self._on_recording_finished)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.update_capture_stats)
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -68,9 +146,19 @@ class MainWindow(QWidget):
         # Conectamos la señal de selección
         #self.image_display.roi_selected.connect(self.extract_and_display_roi)
         self.image_display.roi_selected.connect(self.handle_roi_selection)
+        self.image_display.roi_dragging.connect(self.handle_roi_dragging)
+        self.image_display.roi_drag_finished.connect(self.finish_roi_drag)
+        self.image_display.roi_added.connect(self.handle_roi_added)
+        self.image_display.rois_cleared.connect(self.clear_extra_rois)
 
         center_layout.addWidget(self.image_display)
 
+        # Mosaico de la estación multi-cámara (oculto con una sola cámara)
+        self.tiles_frame = QFrame()
+        self.tiles_layout = QHBoxLayout(self.tiles_frame)
+        self.tiles_frame.hide()
+        center_layout.addWidget(self.tiles_frame)
+
         # --- SUBPANELES: ROI y Gráfica de Intensidad ---
         subpanels_frame = QFrame()
         subpanels_layout = QHBoxLayout(subpanels_frame)
@@ -213,6 +301,37 @@ class MainWindow(QWidget):
         camera_grid.addWidget(QLabel("Zoom (Digital):"), 2, 0)
         camera_grid.addWidget(self.zoom_slider, 2, 1)
         camera_grid.addWidget(self.zoom_label, 2, 2)
+
+        # 3. Omitir frames sin cambios (umbral de diferencia media)
+        self.skip_unchanged_checkbox = QCheckBox("Omitir frames sin cambios")
+        self.skip_unchanged_checkbox.setChecked(self.skip_unchanged)
+        self.skip_unchanged_checkbox.stateChanged.connect(self.toggle_skip_unchanged)
+        self.change_threshold_spinbox = QDoubleSpinBox()
+        self.change_threshold_spinbox.setRange(0.0, 50.0)
+        self.change_threshold_spinbox.setSingleStep(0.5)
+        self.change_threshold_spinbox.setValue(self.change_threshold)
+        self.change_threshold_spinbox.valueChanged.connect(self.update_change_threshold)
+
+        camera_grid.addWidget(self.skip_unchanged_checkbox, 3, 0, 1, 2)
+        camera_grid.addWidget(self.change_threshold_spinbox, 3, 2)
+
+        self.capture_stats_label = QLabel("")
+        camera_grid.addWidget(self.capture_stats_label, 4, 0, 1, 3)
+
+        # 4. Grabación (frames crudos y/o ROI anotado) en segundo plano
+        self.record_button = QPushButton("⏺ Grabar")
+        self.record_button.setCheckable(True)
+        self.record_button.toggled.connect(self.toggle_recording)
+        self.record_target_combo = QComboBox()
+        self.record_target_combo.addItems(["Frames crudos", "ROI anotado", "Ambos"])
+        self.record_format_combo = QComboBox()
+        self.record_format_combo.addItems(RECORD_FORMATS)
+
+        camera_grid.addWidget(self.record_button, 5, 0)
+        camera_grid.addWidget(self.record_target_combo, 5, 1)
+        camera_grid.addWidget(self.record_format_combo, 5, 2)
+        self.record_stats_label = QLabel("")
+        camera_grid.addWidget(self.record_stats_label, 6, 0, 1, 3)
         
         controls_layout.addWidget(camera_controls_group)
         controls_layout.addWidget(QFrame(frameShape=QFrame.HLine))
@@ -278,6 +397,25 @@ class MainWindow(QWidget):
         dilate_layout.addWidget(self.dilate_label, 0, 2)
         
         thresh_morph_layout.addLayout(dilate_layout)
+
+        # 4. Operación morfológica y forma del kernel
+        morph_mode_layout = QGridLayout()
+        self.morph_mode_combo = QComboBox()
+        self.morph_mode_combo.addItems(MORPH_MODES)
+        self.morph_mode_combo.currentIndexChanged.connect(self.update_morph_mode)
+        self.morph_mode_combo.setDisabled(True) # Deshabilitado por defecto
+
+        self.morph_shape_combo = QComboBox()
+        self.morph_shape_combo.addItems(list(MORPH_SHAPES))
+        self.morph_shape_combo.currentIndexChanged.connect(self.update_morph_shape)
+        self.morph_shape_combo.setDisabled(True) # Deshabilitado por defecto
+
+        morph_mode_layout.addWidget(QLabel("Operación:"), 0, 0)
+        morph_mode_layout.addWidget(self.morph_mode_combo, 0, 1)
+        morph_mode_layout.addWidget(QLabel("Kernel:"), 1, 0)
+        morph_mode_layout.addWidget(self.morph_shape_combo, 1, 1)
+
+        thresh_morph_layout.addLayout(morph_mode_layout)
         
         controls_layout.addWidget(thresh_morph_group)
         controls_layout.addWidget(QFrame(frameShape=QFrame.HLine))
@@ -302,6 +440,42 @@ class MainWindow(QWidget):
         
         controls_layout.addWidget(mask_group)
 
+        # --- Detección de Aletas ---
+        fins_group = QFrame()
+        fins_layout = QVBoxLayout(fins_group)
+        fins_layout.addWidget(QLabel("### 📏 Detección de Aletas"))
+
+        self.peak_method_combo = QComboBox()
+        self.peak_method_combo.addItems(PEAK_METHODS)
+        self.peak_method_combo.setCurrentText(self.peak_method)
+        self.peak_method_combo.currentIndexChanged.connect(self.update_peak_method)
+        fins_layout.addWidget(self.peak_method_combo)
+
+        self.fins_label = QLabel("Aletas: -")
+        fins_layout.addWidget(self.fins_label)
+
+        # Franjas por ROI (Shift + arrastre agrega ROIs, clic derecho los borra)
+        bands_row = QHBoxLayout()
+        bands_row.addWidget(QLabel("Franjas por ROI:"))
+        self.bands_spinbox = QSpinBox()
+        self.bands_spinbox.setRange(1, 8)
+        self.bands_spinbox.setValue(self.bands_per_roi)
+        self.bands_spinbox.valueChanged.connect(self.update_bands_per_roi)
+        bands_row.addWidget(self.bands_spinbox)
+        fins_layout.addLayout(bands_row)
+
+        self.bands_label = QLabel("")
+        self.bands_label.setWordWrap(True)
+        fins_layout.addWidget(self.bands_label)
+
+        controls_layout.addWidget(fins_group)
+
+        # --- Vista previa durante el arrastre de los sliders de procesamiento ---
+        for slider in (self.brightness_slider, self.contrast_slider, self.zoom_slider,
+                       self.thresh_slider, self.erode_slider, self.dilate_slider):
+            slider.sliderPressed.connect(self.begin_preview)
+            slider.sliderReleased.connect(self.end_preview)
+
         controls_layout.addStretch(1) 
         return controls_frame
 
@@ -336,7 +510,7 @@ class MainWindow(QWidget):
         #if self.current_processed_image is None:
         #    return
 
-        if self.current_processed_image is None: return
+        if self.current_view_size is None: return
         pixmap = self.image_display.pixmap()
         if not pixmap: return
 
@@ -352,8 +526,8 @@ class MainWindow(QWidget):
         pix_w = pixmap.width()
         pix_h = pixmap.height()
         
-        # Dimensiones de la imagen original real
-        orig_h, orig_w = self.current_processed_image.shape[:2]
+        # Dimensiones de la imagen original real (con zoom)
+        orig_w, orig_h = self.current_view_size
 
         # 2. Calcular Offsets (Debido a "KeepAspectRatio", hay barras negras o espacios vacíos)
         # El pixmap se centra en el label
@@ -393,8 +567,10 @@ class MainWindow(QWidget):
         real_x2 = int(min(pix_w, x_start + rect_screen.width()) * scale_x)
         real_y2 = int(min(pix_h, y_start + rect_screen.height()) * scale_y)
 
-        # 5. Recortar la imagen original
-        roi_img = self.current_processed_image[real_y1:real_y2, real_x1:real_x2]
+        # 5. Recortar (zoom + ROI en un solo remuestreo desde la imagen original)
+        roi_img = extract_zoomed_roi(
+            self.current_source_image, self.zoom_factor, (real_x1, real_y1, real_x2, real_y2)
+        )
 
         if roi_img.size > 0:
             # Mostrar en Panel A
@@ -410,16 +586,56 @@ class MainWindow(QWidget):
         2. Lo convierte a coordenadas de la imagen REAL.
         3. Guarda esas coordenadas en self.roi_coords.
         """
-        if self.current_processed_image is None: return
+        roi_coords = self._screen_rect_to_view(rect_screen)
+        if roi_coords is not None:
+            # GUARDAMOS LAS COORDENADAS
+            self.roi_coords = roi_coords
+            self.drag_roi_coords = None
+            
+            # Forzamos una actualización inmediata
+            self.update_roi_panels()
+
+    def handle_roi_dragging(self, rect_screen):
+        """Arrastre en curso: perfil y conteo del rectángulo provisional desde el índice de proyección."""
+        roi_coords = self._screen_rect_to_view(rect_screen)
+        if roi_coords is not None:
+            self.drag_roi_coords = roi_coords
+            self.update_drag_preview()
+
+    def handle_roi_added(self, rect_screen):
+        """Shift + arrastre: agrega un ROI a la lista de análisis por lotes."""
+        roi_coords = self._screen_rect_to_view(rect_screen)
+        if roi_coords is not None:
+            self.extra_rois.append(roi_coords)
+            self.update_roi_panels()
+
+    def clear_extra_rois(self):
+        """Clic derecho: borra los ROIs adicionales."""
+        self.extra_rois = []
+        self.update_roi_panels()
+
+    def finish_roi_drag(self):
+        """Fin del arrastre sin selección válida: se vuelve a mostrar el ROI guardado."""
+        if self.drag_roi_coords is not None:
+            self.drag_roi_coords = None
+            self.update_roi_panels()
+
+    def _screen_rect_to_view(self, rect_screen):
+        """
+        Convierte un rectángulo en coordenadas de PANTALLA (Label) a coordenadas
+        de la imagen con zoom (x1, y1, x2, y2).
+        :return: Coordenadas o None si no hay imagen o la selección es muy pequeña.
+        """
+        if self.current_view_size is None: return None
         pixmap = self.image_display.pixmap()
-        if not pixmap: return
+        if not pixmap: return None
         
         # Dimensiones
         label_w = self.image_display.width()
         label_h = self.image_display.height()
         pix_w = pixmap.width()
         pix_h = pixmap.height()
-        orig_h, orig_w = self.current_processed_image.shape[:2]
+        orig_w, orig_h = self.current_view_size
 
         # Calcular Offsets (centrado de imagen)
         offset_x = (label_w - pix_w) / 2
@@ -441,75 +657,230 @@ class MainWindow(QWidget):
         
         # Validar tamaño mínimo
         if (real_x2 - real_x1) > 5 and (real_y2 - real_y1) > 5:
-            # GUARDAMOS LAS COORDENADAS
-            self.roi_coords = (real_x1, real_y1, real_x2, real_y2)
-            
-            # Forzamos una actualización inmediata
-            self.update_roi_panels()
+            return (real_x1, real_y1, real_x2, real_y2)
+        return None
 
     def update_roi_panels(self):
         """
-        Toma la imagen actual y las coordenadas guardadas para recortar y analizar.
+        Obtiene el ROI con zoom DIRECTAMENTE de la imagen original (un solo remuestreo
+        del recorte, sin re-escalar el frame completo), lo procesa y lo analiza.
         Este método se llamará en CADA FRAME del video.
         """
-        if self.current_processed_image is None or self.roi_coords is None:
+        if self.drag_roi_coords is not None:
+            # Arrastrando: cada frame nuevo se analiza con el ROI provisional
+            self.update_drag_preview()
+            return
+        if self.processing_worker is not None:
+            # Cámara: el hilo de procesamiento analiza el ROI con los parámetros nuevos
+            self._publish_params()
+            return
+        if self.current_source_image is None:
+            return
+        self.update_band_analysis()
+        if self.roi_coords is None:
             return
 
         x1, y1, x2, y2 = self.roi_coords
         
-        # Verificar que las coordenadas sigan siendo válidas (por si cambia el tamaño de imagen)
-        h, w = self.current_processed_image.shape[:2]
-        if x2 > w or y2 > h:
-            self.roi_coords = None # Resetear si la imagen cambió drásticamente
+        # Validar coordenadas (por si el zoom cambió el tamaño o algo falló)
+        w, h = self.current_view_size
+        # Asegurar límites dentro de la imagen
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w, x2), min(h, y2)
+        if x2 <= x1 or y2 <= y1:
             return
 
-        # Recortar usando las coordenadas guardadas
-        roi_img = self.current_processed_image[y1:y2, x1:x2]
+        # En vista previa el ROI se lleva a la resolución de la copia reducida
+        source, scale, frame_key = self._processing_source()
+        roi_coords = scale_roi_coords((x1, y1, x2, y2), scale) if scale != 1.0 else (x1, y1, x2, y2)
+
+        # A. Procesamiento PESADO solo del ROI
+        heavy_params = self._heavy_params()
+        # Identidad del recorte: frame (o su copia reducida) + zoom + coordenadas
+        roi_key = (frame_key, self.zoom_factor, roi_coords)
+        raw_roi = self.cached_pipeline.zoomed_roi(roi_key, source, self.zoom_factor, roi_coords)
+        processed_roi = self.cached_pipeline.process_roi_heavy(roi_key, raw_roi, *heavy_params)
+
+        # B. Actualizar paneles laterales con el ROI procesado
+        # (analyze_roi_peaks muestra el ROI con los picos en el Panel A)
+        if processed_roi.size > 0:
+            self.analyze_roi_peaks(processed_roi, scale)  # Panel A + Panel B (Gráfica)
+
+    def _heavy_params(self):
+        """Parámetros de process_roi_heavy() (después de la imagen) con el estado actual."""
+        return (
+            self.brightness_value, 
+            self.contrast_factor,  
+            self.equalize_hist,    
+            self.mask_type,
+            self.threshold_active, 
+            self.thresh_value, 
+            self.thresh_type,
+            self.erode_iterations,
+            self.dilate_iterations,
+            self.morph_mode,
+            self.morph_shape
+        )
 
-        if roi_img.size > 0:
-            self.analyze_roi_peaks(roi_img)
+    def _processing_params(self):
+        """Instantánea inmutable del estado actual para el hilo de procesamiento."""
+        return ProcessingParams(
+            zoom=self.zoom_factor,
+            heavy=self._heavy_params(),
+            roi=self.roi_coords,
+            extra_rois=tuple(self.extra_rois),
+            bands=self.bands_per_roi,
+            peak_method=self.peak_method,
+            view_size=(self.image_display.width(), self.image_display.height()),
+            track=True,
+            preview_max_side=self.preview_max_side,
+            preview=self.preview_active,
+        )
+
+    def _publish_params(self):
+        """Entrega la instantánea de parámetros a la cámara activa."""
+        if self.active_camera < len(self.camera_manager):
+            self.camera_manager[self.active_camera].set_params(self._processing_params())
+
+    def _update_projection_index(self, preview=True):
+        """
+        Procesa la vista completa y construye el índice de proyección, solo si
+        cambiaron el frame, el zoom o los parámetros desde la última vez.
+        :param preview: Usar la copia reducida por pirámide (arrastre, cámara).
+        :return: Escala del índice respecto a la vista a resolución completa.
+        """
+        source, scale, frame_key = self._processing_source(preview=preview)
+        w, h = self.current_view_size
+        view_coords = scale_roi_coords((0, 0, w, h), scale) if scale != 1.0 else (0, 0, w, h)
+        heavy_params = self._heavy_params()
+        key = (frame_key, self.zoom_factor, view_coords, heavy_params)
+        if self.projection_index.is_current(key):
+            return scale
+
+        if self.is_camera_mode:
+            raw_view = self.index_pipeline.zoomed_roi(source, self.zoom_factor, view_coords)
+            processed = self.index_pipeline.process_roi_heavy(raw_view, *heavy_params)
+        else:
+            view_key = (frame_key, self.zoom_factor, view_coords)
+            raw_view = self.cached_pipeline.zoomed_roi(view_key, source, self.zoom_factor, view_coords)
+            processed = self.cached_pipeline.process_roi_heavy(view_key, raw_view, *heavy_params)
+        self.projection_index.build(processed, key)
+        self.index_image = processed
+        return scale
+
+    def update_band_analysis(self):
+        """
+        Analiza todos los ROIs (el principal + los adicionales), cada uno en
+        self.bands_per_roi franjas, en una sola llamada por lotes sobre el índice de proyección.
+        Con un único ROI sin franjas no hace nada (lo cubre analyze_roi_peaks).
+        """
+        rois = ([self.roi_coords] if self.roi_coords is not None else []) + self.extra_rois
+        if self.current_view_size is None or not rois or (len(rois) == 1 and self.bands_per_roi == 1):
+            self.band_results = []
+            self.bands_label.setText("")
+            return
+
+        scale = self._update_projection_index(preview=self.preview_active)
+        scaled = [scale_roi_coords(roi, scale) for roi in rois] if scale != 1.0 else rois
+        results = analyze_rois(self.projection_index, scaled, self.bands_per_roi)
+
+        # Resultados en píxeles de resolución completa
+        self.band_results = [
+            r._replace(peaks=r.peaks / scale, pitch=r.pitch / scale,
+                       pitch_variance=r.pitch_variance / scale ** 2)
+            for r in results
+        ] if scale != 1.0 else results
+        self._show_band_results()
+
+    def _show_band_results(self):
+        """Resumen de self.band_results (una línea por ROI/franja)."""
+        lines = []
+        for r in self.band_results:
+            pitch_text = f"paso {r.pitch:.1f} px, var {r.pitch_variance:.1f}" if np.isfinite(r.pitch) else "sin patrón"
+            lines.append(f"ROI {r.roi_index + 1} / franja {r.band_index + 1}: {len(r.peaks)} aletas, {pitch_text}")
+        self.bands_label.setText("\n".join(lines))
+
+    def update_drag_preview(self):
+        """
+        Perfil y conteo de aletas del ROI que se está arrastrando: la proyección sale
+        del índice en O(ancho), sin reprocesar ni volver a sumar los píxeles.
+        """
+        if self.current_source_image is None or self.current_view_size is None:
+            return
+        scale = self._update_projection_index()
+        roi_coords = self.drag_roi_coords
+        x1, y1, x2, y2 = scale_roi_coords(roi_coords, scale) if scale != 1.0 else roi_coords
+        projection = self.projection_index.projection(x1, y1, x2, y2)
+        if projection.size > 0:
+            self.analyze_roi_peaks(self.index_image[y1:y2, x1:x2], scale, projection)
+
+    def _processing_source(self, preview=None):
+        """
+        Imagen sobre la que se procesa: la original o, en vista previa, una copia
+        reducida por pirámide.
+        :param preview: Forzar (o no) la copia reducida; por defecto según self.preview_active.
+        :return: (imagen, escala respecto a la original, identidad para la caché)
+        """
+        image = self.current_source_image
+        if preview is None:
+            preview = self.preview_active
+        if not preview:
+            return image, 1.0, self.frame_id
+
+        h, w = image.shape[:2]
+        levels = pyramid_levels(w, h, self.preview_max_side)
+        if levels == 0:
+            return image, 1.0, self.frame_id
+
+        if self.is_camera_mode:
+            small = self.frame_pipeline.pyramid_down(image, levels)
+        else:
+            small = self.cached_pipeline.pyramid_down(self.frame_id, image, levels)
+        return small, small.shape[1] / w, (self.frame_id, "preview", levels)
+
+    def begin_preview(self):
+        """Slider presionado: procesar la copia reducida mientras se arrastra."""
+        self.preview_active = True
+
+    def end_preview(self):
+        """Slider liberado: una pasada a resolución completa con el valor final."""
+        self.preview_active = False
+        self.process_and_display()
+
+    def _detect_peaks(self, projection, scale=1.0):
+        """
+        Detección completa de aletas con el método seleccionado.
+        :return: (picos, paso en píxeles del ROI o None)
+        """
+        # La distancia mínima fija (solo find_peaks) se ajusta a la escala
+        distance = max(1, int(round(DEFAULT_PEAK_DISTANCE * scale)))
+        return detect_fins(projection, self.peak_method, distance)
 
-    def analyze_roi_peaks(self, roi_img):
+    def analyze_roi_peaks(self, roi_img, scale=1.0, projection=None):
         """
         1. Calcula proyección.
         2. Encuentra picos.
         3. Dibuja líneas en la imagen ROI.
         4. Actualiza ambos paneles.
+        :param scale: Escala del ROI respecto a la resolución completa (< 1 en vista previa).
+        :param projection: Proyección ya calculada (ej. desde el índice de proyección).
         """
-        # A. Preparar datos (Escala de Grises)
-        if len(roi_img.shape) == 3:
-            gray_roi = cv2.cvtColor(roi_img, cv2.COLOR_BGR2GRAY)
-            display_roi = roi_img.copy() # Copia a color para dibujar líneas rojas
-        else:
-            gray_roi = roi_img
-            # Convertir a BGR para poder dibujar líneas rojas sobre gris
-            display_roi = cv2.cvtColor(roi_img, cv2.COLOR_GRAY2BGR)
-
-        # B. Proyección Horizontal (Suma de columnas)
-        vertical_projection = np.sum(gray_roi, axis=0)
-        
-        # C. Detección de Picos (Crestas)
-        # distance=10: Mínima distancia horizontal entre picos para evitar ruido
-        # height=...: Mínimo valor para ser considerado pico (promedio global)
-        #import scipy.signal
-        #print("Scipy version:", scipy.__version__)
-        #print("¿Existe find_peaks?", hasattr(scipy.signal, 'find_peaks'))
-        
-        peaks, _ = find_peaks(
-            vertical_projection, 
-            distance=50, 
-            height=np.mean(vertical_projection)
-        )
+        # A-C. Proyección Horizontal (Suma de columnas) y Detección de Picos (Crestas).
+        # El pipeline entrega 1 canal en cuanto pasa a gris; solo se expande a BGR
+        # al dibujar las líneas rojas.
+        vertical_projection = compute_projection(roi_img) if projection is None else projection
+        # Con cámara el seguimiento entre frames ocurre en el hilo de procesamiento (FrameAnalyzer)
+        peaks, pitch = self._detect_peaks(vertical_projection, scale)
+        count = len(peaks)
+        self.last_pitch = pitch / scale if pitch else None
+
+        # Posiciones de los picos siempre en píxeles de resolución completa
+        self.last_peaks = peaks / scale if scale != 1.0 else peaks
+        pitch_text = f" | Paso: {self.last_pitch:.2f} px" if self.last_pitch else ""
+        self.fins_label.setText(f"Aletas: {count}{pitch_text}")
         
         # D. Dibujar Líneas en la Imagen del ROI
-        h, w = display_roi.shape[:2]
-        for x_pos in peaks:
-            # Dibujar línea vertical roja
-            # (x_pos, 0) es el punto superior, (x_pos, h) es el inferior
-            cv2.line(display_roi, (x_pos, 0), (x_pos, h), (0, 0, 255), 1)
-            
-            # Opcional: Escribir el índice o coordenada pequeña
-            # cv2.putText(display_roi, str(x_pos), (x_pos, 10), cv2.FONT_HERSHEY_SIMPLEX, 0.3, (0,255,0), 1)
+        display_roi = draw_peak_lines(roi_img, peaks)
 
         # E. Mostrar Imagen con Líneas en Panel A
         self._display_roi_image(display_roi)
@@ -521,23 +892,8 @@ class MainWindow(QWidget):
         #self.intensity_plot.update_plot(vertical_projection, peaks)
 
     def _display_roi_image(self, cv_img):
-        """Muestra la imagen recortada en el Panel A."""
-        # Convertir BGR a RGB
-        rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        
-        qt_img = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qt_img)
-        
-        # Escalar al tamaño del recuadro del Panel A
-        self.roi_display.setPixmap(
-            pixmap.scaled(
-                self.roi_display.size(), 
-                Qt.KeepAspectRatio, 
-                Qt.SmoothTransformation
-            )
-        )
+        """Muestra la imagen recortada en el Panel A (BGR o gris), al tamaño del recuadro."""
+        self.roi_display.setPixmap(self._to_pixmap(cv_img, self.roi_display.size(), "roi"))
     # --- NUEVOS Métodos de Interacción ---
 
     def update_focus(self, value):
@@ -580,6 +936,8 @@ class MainWindow(QWidget):
         self.thresh_type_combo.setEnabled(self.threshold_active)
         self.erode_slider.setEnabled(self.threshold_active)
         self.dilate_slider.setEnabled(self.threshold_active)
+        self.morph_mode_combo.setEnabled(self.threshold_active)
+        self.morph_shape_combo.setEnabled(self.threshold_active)
         
         self.process_and_display()
 
@@ -609,74 +967,58 @@ class MainWindow(QWidget):
         self.dilate_iterations = value
         self.dilate_label.setText(f"Dilatación (Iter.): {value}")
         self.process_and_display()
+
+    def update_morph_mode(self, index):
+        """Actualiza la operación morfológica (Erosión + Dilatación, Apertura, Cierre, ...)."""
+        self.morph_mode = self.morph_mode_combo.currentText()
+        self.process_and_display()
+
+    def update_bands_per_roi(self, value):
+        """Cambia el número de franjas horizontales por ROI."""
+        self.bands_per_roi = value
+        self.update_roi_panels()
+
+    def update_peak_method(self, index):
+        """Cambia el método de detección de aletas."""
+        self.peak_method = self.peak_method_combo.itemText(index)
+        self.update_roi_panels()
+
+    def update_morph_shape(self, index):
+        """Actualiza la forma del elemento estructurante."""
+        self.morph_shape = self.morph_shape_combo.currentText()
+        self.process_and_display()
         
 
     def process_and_display(self):
         """
         Flujo optimizado: 
-        1. Zoom Global (Rápido).
-        2. Si hay ROI -> Procesamiento Pesado SOLO en ROI.
-        3. Si no hay ROI -> Solo muestra imagen con Zoom.
+        1. Si hay ROI -> Zoom + recorte en un solo remuestreo y Procesamiento Pesado SOLO en ROI.
+        2. Panel central: la ventana del zoom re-escalada directo al tamaño del label
+           (nunca se re-escala el frame completo a resolución completa).
         """
+        if self.processing_worker is not None:
+            # Cámara: solo se publican los parámetros; el resultado llega por handle_camera_result()
+            self._publish_params()
+            return
         if self.current_source_image is None:
             return
 
-        # PASO 1: Aplicar Zoom Global a la imagen completa (Base para todo)
-        # Usamos una variable temporal 'base_image'
-        base_image = apply_digital_zoom(self.current_source_image, self.zoom_factor)
-        
-        # Esta será la imagen que mostremos en el centro (cruda o con overlay)
-        display_main_img = base_image.copy()
+        # Geometría de la imagen con zoom (mismo tamaño que la original) para mapear el ROI.
+        # Siempre a resolución completa, también en vista previa.
+        h, w = self.current_source_image.shape[:2]
+        self.current_view_size = (w, h)
 
-        # PASO 2: Verificar si tenemos un ROI seleccionado
-        if self.roi_coords is not None:
-            x1, y1, x2, y2 = self.roi_coords
-            
-            # Validar coordenadas (por si el zoom cambió el tamaño o algo falló)
-            h, w = base_image.shape[:2]
-            # Asegurar límites dentro de la imagen
-            x1, y1 = max(0, x1), max(0, y1)
-            x2, y2 = min(w, x2), min(h, y2)
-
-            if x2 > x1 and y2 > y1:
-                # A. Recortar el ROI CRUDO de la imagen base
-                raw_roi = base_image[y1:y2, x1:x2]
-                
-                # B. Aplicar procesamiento PESADO solo a este pequeño fragmento
-                processed_roi = process_roi_heavy(
-                    raw_roi,
-                    self.brightness_value, 
-                    self.contrast_factor,  
-                    self.equalize_hist,    
-                    self.mask_type,
-                    self.threshold_active, 
-                    self.thresh_value, 
-                    self.thresh_type,
-                    self.erode_iterations,
-                    self.dilate_iterations
-                )
-                
-                # C. Actualizar paneles laterales con el ROI procesado
-                self._display_roi_image(processed_roi) # Panel A
-                self.analyze_roi_peaks(processed_roi)  # Panel B (Gráfica)
-
-                # D. Visualización en Panel Central
-                # OPCIÓN 1: Solo dibujar recuadro (Máximo rendimiento)
-                #cv2.rectangle(display_main_img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                
-                # OPCIÓN 2: "Pegar" el ROI procesado sobre la imagen original (Mejor UX)
-                # Esto permite ver el efecto de la máscara en contexto
-                #try:
-                #    display_main_img[y1:y2, x1:x2] = processed_roi
-                #    cv2.rectangle(display_main_img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                #except Exception as e:
-                #    print(f"Error al pegar ROI: {e}")
-                #    self.roi_coords = None # Resetear si fallan dimensiones
-
-        # Guardamos la imagen base como la "procesada actual" para referencia de coordenadas del mouse
-        # NOTA: Guardamos 'base_image' (con zoom pero sin filtros globales) para que el
-        # selector de ROI funcione sobre la geometría correcta.
-        self.current_processed_image = base_image 
+        # PASO 1: ROI (si hay uno seleccionado)
+        self.update_roi_panels()
+
+        # PASO 2: Imagen central, re-escalada una sola vez al tamaño de pantalla
+        source, _, _ = self._processing_source()
+        target_size = (self.image_display.width(), self.image_display.height())
+        display_main_img = self.frame_pipeline.zoomed_view(source, self.zoom_factor, target_size)
+
+        # Visualización en Panel Central
+        # OPCIÓN 1: Solo dibujar recuadro (Máximo rendimiento)
+        #cv2.rectangle(display_main_img, (x1, y1), (x2, y2), (0, 255, 0), 2)
 
         # Mostrar la imagen central
         self._display_image(display_main_img)    
@@ -687,21 +1029,32 @@ class MainWindow(QWidget):
     def select_source(self, index):
         """Maneja la selección entre Archivo y Cámara."""
         # Detener la cámara si está activa
-        if self.video_thread and self.video_thread.isRunning():
-            self.video_thread.stop()
-            self.is_camera_mode = False
+        self.stop_camera()
         
         if index == 1: # Cámara seleccionada
             self.is_camera_mode = True
-            self.video_thread = VideoThread()
-            self.video_thread.change_pixmap_signal.connect(self.update_image_from_camera)
-            self.video_thread.start()
+            # Cada cámara arranca con los ajustes actuales; luego cada una conserva los suyos
+            station = self.station or [(None, self.capture_config, self.source_factory)]
+            params = self._processing_params()
+            for i, (name, capture_config, source_factory) in enumerate(station):
+                self.camera_manager.add_camera(
+                    name or f"Cámara {i + 1}", capture_config, source_factory,
+                    change_threshold=self.change_threshold, skip_unchanged=self.skip_unchanged,
+                    params=params if i == 0 else params._replace(view_size=self.tile_size),
+                )
+            self._build_camera_tiles()
+            self.active_camera = 0
+            self.video_thread = self.camera_manager[0].video_thread
+            self.processing_worker = self.camera_manager[0].worker
+            self.stats_timer.start()
+            self.camera_manager.start_all()
             self.load_button.setDisabled(True)
-            self.video_thread.start()
 
-            self.image_display.setText("Cámara activa...")
+            self.image_display.setText(f"{self.video_thread.source.describe()} activa...")
         else: # Archivo seleccionado
             self.is_camera_mode = False
+            self.stats_timer.stop()
+            self.capture_stats_label.setText("")
             self.load_button.setDisabled(False)
             if self.current_source_image is None:
                 self.image_display.setText("Presione 'Cargar Imagen...'")
@@ -720,6 +1073,8 @@ class MainWindow(QWidget):
             img = cv2.imread(file_name)
             if img is not None:
                 self.current_source_image = img # Almacena la base
+                self.frame_id += 1
+                self.cached_pipeline.cache.clear() # Los resultados de la imagen anterior ya no sirven
                 self.process_and_display()
             else:
                 self.image_display.setText("Error al cargar la imagen.")
@@ -735,33 +1090,336 @@ class MainWindow(QWidget):
         self.mask_type = self.mask_combo.currentText()
         self.process_and_display()
 
-    def update_image_from_camera(self, cv_img):
-        """Recibe un frame del hilo de video y lo establece como la imagen actual."""
-        self.current_source_image = cv_img 
-        self.process_and_display()
-    
-    def _display_image(self, cv_img):
-        """Convierte una imagen de OpenCV a QPixmap y la muestra en el QLabel."""
-        # Convertir BGR (OpenCV) a RGB (Qt)
-        rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        
-        convert_to_qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(convert_to_qt_format)
-        
-        # Escalar y mostrar
-        self.image_display.setPixmap(
-            pixmap.scaled(
-                self.image_display.size(), 
-                Qt.KeepAspectRatio, 
-                Qt.SmoothTransformation
-            )
+    def toggle_skip_unchanged(self, state):
+        """Activa/desactiva la omisión de frames sin cambios."""
+        self.skip_unchanged = state == Qt.Checked
+        if self.video_thread is not None:
+            self.video_thread.set_skip_unchanged(self.skip_unchanged, self.change_threshold)
+
+    def update_change_threshold(self, value):
+        """Umbral de cambio del detector del hilo de captura."""
+        self.change_threshold = value
+        if self.video_thread is not None:
+            self.video_thread.set_skip_unchanged(self.skip_unchanged, value)
+
+    def toggle_recording(self, checked):
+        """Inicia/detiene la grabación del frame crudo y/o el ROI anotado."""
+        if checked:
+            self.start_recording()
+        else:
+            self.stop_recording()
+
+    def start_recording(self):
+        """Crea los grabadores en recordings/<fecha_hora>/ y los entrega al hilo de procesamiento."""
+        if self.processing_worker is None:
+            self.record_stats_label.setText("La grabación requiere la cámara activa.")
+            self.record_button.setChecked(False)
+            return
+        target = self.record_target_combo.currentIndex() # 0 crudos, 1 ROI, 2 ambos
+        fmt = self.record_format_combo.currentText()
+        fps = self.video_thread.source.info.get("fps") or 30.0
+        session_dir = os.path.join(self.recordings_dir, time.strftime("%Y%m%d_%H%M%S"))
+        if target in (0, 2):
+            self.recorders["raw"] = FrameRecorder(os.path.join(session_dir, "raw"), fmt, fps,
+                                                  on_finished=self.recording_finished.emit)
+        if target in (1, 2):
+            self.recorders["roi"] = FrameRecorder(os.path.join(session_dir, "roi"), fmt, fps,
+                                                  on_finished=self.recording_finished.emit)
+        for recorder in self.recorders.values():
+            recorder.start()
+        self.processing_worker.set_recorders(self.recorders.get("raw"), self.recorders.get("roi"))
+        self.record_target_combo.setEnabled(False)
+        self.record_format_combo.setEnabled(False)
+        self.record_stats_label.setText(f"Grabando en {session_dir}")
+
+    def stop_recording(self):
+        """
+        Detiene la grabación sin bloquear la GUI: el hilo de procesamiento deja de encolar
+        y cada grabador vacía su cola en su propio hilo (ver _on_recording_finished).
+        """
+        if self.processing_worker is not None:
+            self.processing_worker.set_recorders()
+        for name, recorder in self.recorders.items():
+            recorder.stop()
+            self.finishing_recorders.append((name, recorder))
+        if self.recorders:
+            self.record_stats_label.setText("Terminando de escribir la grabación...")
+        self.recorders = {}
+        self.record_target_combo.setEnabled(True)
+        self.record_format_combo.setEnabled(True)
+        if self.record_button.isChecked():
+            self.record_button.setChecked(False)
+
+    def _on_recording_finished(self, recorder):
+        """Un grabador detenido cerró sus archivos; con el último se muestra el resumen."""
+        if not any(r is recorder for _, r in self.finishing_recorders):
+            return
+        if not all(r.finished or r is recorder for _, r in self.finishing_recorders):
+            return
+        lines = []
+        for name, r in self.finishing_recorders:
+            stats = r.stats()
+            lines.append(f"{name}: {stats['written']} grabados, {stats['dropped']} descartados -> {r.directory}")
+        self.finishing_recorders = []
+        if not self.recorders: # Sin una grabación nueva en curso
+            self.record_stats_label.setText("\n".join(lines))
+
+    def stop_camera(self):
+        """Detiene la captura y el procesamiento de todas las cámaras (si están activas)."""
+        self.stop_recording()
+        if len(self.camera_manager):
+            # El frame mostrado se conserva (ej. para seguir con él en modo archivo) pero ya
+            # no se recicla: la captura se detuvo
+            self.camera_manager.stop_all()
+            self.is_camera_mode = False
+        self.video_thread = None
+        self.processing_worker = None
+        self._build_camera_tiles()
+
+    def _build_camera_tiles(self):
+        """Un mosaico por cámara de la estación (solo si hay más de una)."""
+        # Se retiran los mosaicos anteriores junto con sus sub-layouts (si no, se acumulan vacíos)
+        while self.tiles_layout.count():
+            item = self.tiles_layout.takeAt(0)
+            box = item.layout()
+            if box is not None:
+                while box.count():
+                    widget = box.takeAt(0).widget()
+                    if widget is not None:
+                        widget.deleteLater()
+                box.deleteLater()
+            elif item.widget() is not None:
+                item.widget().deleteLater()
+        self.camera_tiles = []
+        if len(self.camera_manager) < 2:
+            self.tiles_frame.hide()
+            return
+        for channel in self.camera_manager.channels:
+            box = QVBoxLayout()
+            tile = CameraTileLabel()
+            tile.setAlignment(Qt.AlignCenter)
+            tile.setFixedSize(*self.tile_size)
+            tile.set_active(channel.index == self.active_camera)
+            tile.clicked.connect(lambda index=channel.index: self.select_camera(index))
+            caption = QLabel(channel.name)
+            caption.setWordWrap(True)
+            box.addWidget(tile)
+            box.addWidget(caption)
+            self.tiles_layout.addLayout(box)
+            self.camera_tiles.append((tile, caption))
+        self.tiles_frame.show()
+
+    def select_camera(self, index):
+        """
+        Cambia la cámara que se controla y se muestra en grande. Los controles pasan a
+        mostrar los ajustes (ROI, pipeline) de esa cámara; la anterior sigue procesando
+        con los suyos, con la vista al tamaño del mosaico.
+        """
+        if index == self.active_camera or index >= len(self.camera_manager):
+            return
+        self.stop_recording() # Los grabadores están ligados al hilo de la cámara anterior
+        previous = self.camera_manager[self.active_camera]
+        previous.set_params(previous.params._replace(view_size=self.tile_size))
+
+        self.active_camera = index
+        channel = self.camera_manager[index]
+        self.video_thread = channel.video_thread
+        self.processing_worker = channel.worker
+        for i, (tile, _) in enumerate(self.camera_tiles):
+            tile.set_active(i == index)
+
+        # ROI y ajustes de la cámara elegida: los controles se cargan sin disparar sus
+        # callbacks y los parámetros se publican una sola vez, ya completos
+        self.drag_roi_coords = None
+        self._load_params_into_controls(channel.params)
+        self._publish_params()
+        if channel.result is not None:
+            self._show_camera_result(channel.result)
+        self._show_roi_rects()
+
+    def _parameter_controls(self):
+        """Controles cuyos callbacks reprocesan o publican los parámetros."""
+        return (self.brightness_slider, self.contrast_slider, self.equalization_checkbox, self.mask_combo,
+                self.thresh_checkbox, self.thresh_slider, self.thresh_type_combo, self.erode_slider,
+                self.dilate_slider, self.morph_mode_combo, self.morph_shape_combo, self.zoom_slider,
+                self.bands_spinbox, self.peak_method_combo)
+
+    def _load_params_into_controls(self, params):
+        """
+        Lleva una instantánea de parámetros al estado de la ventana y a los controles.
+        Las señales de los controles se bloquean: sus callbacks verían el estado a medias.
+        """
+        # 1. Estado de la ventana, tomado de la instantánea
+        if params.heavy:
+            (self.brightness_value, self.contrast_factor, self.equalize_hist, self.mask_type,
+             self.threshold_active, self.thresh_value, self.thresh_type, self.erode_iterations,
+             self.dilate_iterations, self.morph_mode, self.morph_shape) = params.heavy
+        self.zoom_factor = params.zoom
+        self.bands_per_roi = params.bands
+        self.peak_method = params.peak_method
+        self.roi_coords = params.roi
+        self.extra_rois = list(params.extra_rois)
+
+        # 2. Controles sin señales
+        controls = self._parameter_controls()
+        for control in controls:
+            control.blockSignals(True)
+        try:
+            self.brightness_slider.setValue(self.brightness_value)
+            self.contrast_slider.setValue(int(round(self.contrast_factor * 10)))
+            self.equalization_checkbox.setChecked(self.equalize_hist)
+            self.mask_combo.setCurrentText(self.mask_type)
+            self.thresh_checkbox.setChecked(self.threshold_active)
+            self.thresh_slider.setValue(self.thresh_value)
+            self.thresh_type_combo.setCurrentIndex(0 if self.thresh_type == cv2.THRESH_BINARY else 1)
+            self.erode_slider.setValue(self.erode_iterations)
+            self.dilate_slider.setValue(self.dilate_iterations)
+            self.morph_mode_combo.setCurrentText(self.morph_mode)
+            self.morph_shape_combo.setCurrentText(self.morph_shape)
+            self.zoom_slider.setValue(int(round(self.zoom_factor * 10)))
+            self.bands_spinbox.setValue(self.bands_per_roi)
+            self.peak_method_combo.setCurrentText(self.peak_method)
+        finally:
+            for control in controls:
+                control.blockSignals(False)
+
+        # 3. Lo que harían los callbacks además de reprocesar: etiquetas y controles habilitados
+        self.brightness_label.setText(f"Valor: {self.brightness_value}")
+        self.contrast_label.setText(f"Factor: {self.contrast_factor:.1f}x")
+        self.zoom_label.setText(f"Factor: {self.zoom_factor:.1f}x")
+        self.thresh_label.setText(f"Umbral (0-255): {self.thresh_value}")
+        self.erode_label.setText(f"Erosión (Iter.): {self.erode_iterations}")
+        self.dilate_label.setText(f"Dilatación (Iter.): {self.dilate_iterations}")
+        for control in (self.thresh_slider, self.thresh_type_combo, self.erode_slider, self.dilate_slider,
+                        self.morph_mode_combo, self.morph_shape_combo):
+            control.setEnabled(self.threshold_active)
+
+    def _view_rect_to_screen(self, roi_coords):
+        """
+        Inverso de _screen_rect_to_view: coordenadas (x1, y1, x2, y2) de la vista con
+        zoom a un QRect del Label. :return: QRect o None si no hay imagen mostrada.
+        """
+        pixmap = self.image_display.pixmap()
+        if self.current_view_size is None or not pixmap or pixmap.isNull():
+            return None
+        orig_w, orig_h = self.current_view_size
+        scale_x = pixmap.width() / orig_w
+        scale_y = pixmap.height() / orig_h
+        offset_x = (self.image_display.width() - pixmap.width()) / 2
+        offset_y = (self.image_display.height() - pixmap.height()) / 2
+        x1, y1, x2, y2 = roi_coords
+        return QRect(QPoint(int(round(x1 * scale_x + offset_x)), int(round(y1 * scale_y + offset_y))),
+                     QPoint(int(round(x2 * scale_x + offset_x)) - 1, int(round(y2 * scale_y + offset_y)) - 1))
+
+    def _show_roi_rects(self):
+        """Dibuja el ROI principal y los adicionales guardados (ej. al cambiar de cámara)."""
+        rect = self._view_rect_to_screen(self.roi_coords) if self.roi_coords is not None else None
+        self.image_display.current_rect = rect
+        extra = [self._view_rect_to_screen(roi) for roi in self.extra_rois]
+        self.image_display.extra_rects = [r for r in extra if r is not None]
+        self.image_display.update()
+
+    def update_capture_stats(self):
+        """Contadores de los hilos de captura y procesamiento (1 vez por segundo con la cámara activa)."""
+        if self.video_thread is None:
+            return
+        stats = self.camera_manager[self.active_camera].stats()
+        wait_text = f" | Espera: {stats['frame_wait_ms']:.1f} ms" if stats.get("frame_wait_ms") is not None else ""
+        if stats.get("process_ms") is not None:
+            wait_text += f" | Proceso: {stats['process_ms']:.1f} ms"
+        capture = stats["capture"]
+        mode_text = (f"{capture['width']}x{capture['height']} {capture['fourcc']} @ {capture['fps']:.0f} | "
+                     if capture else "")
+        self.capture_stats_label.setText(
+            f"{mode_text}FPS: {stats['capture_fps']:.1f}\n"
+            f"Procesados: {stats['delivered']} | Omitidos: {stats['skipped']} "
+            f"({stats['skipped_ratio'] * 100:.0f}%) | Descartados: {stats['dropped']}{wait_text}\n"
+            f"Buffers: {stats['pool_in_use']} en uso / {stats['pool_allocated']} | "
+            f"Reciclados: {stats['pool_reused']} | Fuera del pool: {stats['pool_overflow']}"
         )
+        for channel, (_, caption) in zip(self.camera_manager.channels, self.camera_tiles):
+            channel_stats = stats if channel.index == self.active_camera else channel.stats()
+            latency = channel_stats.get("latency_ms")
+            count = channel.result.count if channel.result is not None else "-"
+            caption.setText(f"{channel.name}: {count} aletas\n"
+                            f"{channel_stats['capture_fps']:.1f} FPS"
+                            + (f" | {latency:.0f} ms" if latency is not None else ""))
+        if self.recorders:
+            self.record_stats_label.setText("\n".join(
+                f"⏺ {name}: {s['written']} grabados | en cola: {s['queued']} | descartados: {s['dropped']}"
+                for name, s in ((name, r.stats()) for name, r in self.recorders.items())
+            ))
+
+    def handle_camera_result(self, index):
+        """
+        Aviso del hilo de procesamiento de la cámara 'index': retira su resultado MÁS
+        RECIENTE (el anterior vuelve al pool) y lo muestra. En el hilo de la GUI solo
+        quedan la conversión a QPixmap y las etiquetas.
+        """
+        if index >= len(self.camera_manager):
+            return
+        result = self.camera_manager[index].take_result()
+        if result is None:
+            return
+        if index < len(self.camera_tiles) and result.view_image is not None:
+            tile, _ = self.camera_tiles[index]
+            tile.setPixmap(self._to_pixmap(result.view_image, tile.size(), f"tile{index}"))
+        if index == self.active_camera:
+            self._show_camera_result(result)
+
+    def _show_camera_result(self, result):
+        """Resultado de la cámara activa en el panel central, el Panel A y las etiquetas."""
+        # El frame se conserva para mapear el ROI y para la vista previa del arrastre
+        self.current_source_image = result.frame
+        self.current_view_size = result.view_size
+        self.frame_id += 1
+
+        if self.drag_roi_coords is not None:
+            self.update_drag_preview()
+        elif result.roi_image is not None:
+            self.last_peaks = result.peaks
+            self.last_pitch = result.pitch
+            pitch_text = f" | Paso: {result.pitch:.2f} px" if result.pitch else ""
+            self.fins_label.setText(f"Aletas: {result.count}{pitch_text}")
+            self._display_roi_image(result.roi_image)
+
+        self.band_results = result.band_results
+        self._show_band_results()
+
+        if result.view_image is not None:
+            self._display_image(result.view_image)
+
+    def _to_pixmap(self, cv_img, target_size=None, name="display"):
+        """
+        Convierte una imagen de OpenCV (BGR o gris) a QPixmap.
+        Con target_size (QSize del QLabel) la imagen se reduce ANTES con OpenCV
+        (fit_to_display: mitades con INTER_AREA y ajuste final con INTER_LINEAR) en
+        buffers propios del widget: el costo por frame depende del tamaño del widget,
+        no del frame, y Qt no escala nada.
+        BGR se entrega a Qt tal cual (Format_BGR888, sin convertir a RGB) y el gris
+        como Grayscale8: la expansión a color ocurre solo aquí, al mostrar.
+        """
+        if target_size is not None:
+            cv_img = fit_to_display(cv_img, (target_size.width(), target_size.height()),
+                                    self.display_buffers, name)
+        cv_img = np.ascontiguousarray(cv_img)
+        h, w = cv_img.shape[:2]
+        fmt = QImage.Format_Grayscale8 if len(cv_img.shape) == 2 else QImage.Format_BGR888
+        # QImage no copia los datos: 'cv_img' sigue vivo hasta que fromImage() hace su copia
+        qt_img = QImage(cv_img.data, w, h, cv_img.strides[0], fmt)
+        return QPixmap.fromImage(qt_img)
+
+    def _display_image(self, cv_img):
+        """Convierte una imagen de OpenCV a QPixmap (ya al tamaño del QLabel) y la muestra."""
+        self.image_display.setPixmap(self._to_pixmap(cv_img, self.image_display.size(), "main"))
         self.image_display.setText("") 
 
     def closeEvent(self, event):
-        """Detiene el hilo de video al cerrar la ventana."""
-        if self.video_thread and self.video_thread.isRunning():
-            self.video_thread.stop()
+        """Detiene los hilos de video y procesamiento al cerrar la ventana."""
+        self.stop_camera()
+        self.stats_timer.stop()
+        # Al salir sí se espera a los grabadores: un video sin cerrar queda inservible
+        for _, recorder in self.finishing_recorders:
+            recorder.wait()
+        self.tiled_executor.shutdown()
         event.accept()
\ No newline at end of file
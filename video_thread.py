@@ -1,41 +1,103 @@
-import cv2
-import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from capture_sources import CameraSource
+from change_detection import ChangeDetector
+from frame_mailbox import FrameMailbox
+from frame_pool import FramePool
+
 class VideoThread(QThread):
-    """Clase de Hilo para manejar la captura de video de la cámara."""
+    """
+    Clase de Hilo para manejar la captura de video de la cámara.
+    Los frames se depositan en un buzón de un solo lugar (gana el más reciente) y la
+    GUI los retira cuando está lista: si el procesamiento es lento se descartan frames
+    en lugar de acumular señales en la cola de eventos de Qt.
+    """
     
-    # Señal que emitirá un frame (matriz numpy) a la ventana principal
-    change_pixmap_signal = pyqtSignal(np.ndarray)
+    # Aviso (sin datos) de que hay un frame nuevo en el buzón; la GUI lo retira con take_frame()
+    frame_ready = pyqtSignal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, change_threshold=2.0, capture_config=None, source=None):
+        """
+        :param change_threshold: Umbral del detector de cambios (ver ChangeDetector).
+        :param capture_config: CaptureConfig (dispositivo, backend, FOURCC, resolución, FPS, búfer).
+        :param source: Fuente alternativa a la cámara (VideoFileSource, ImageSequenceSource,
+                       SyntheticSource); si se da, capture_config se ignora.
+        """
         super().__init__(parent)
         self._run_flag = False
+        self.source = source if source is not None else CameraSource(capture_config)
         self.cap = None
+        # Frames sin cambios (pieza quieta) no se emiten: la GUI conserva los últimos resultados
+        self.skip_unchanged = True
+        self.change_detector = ChangeDetector(threshold=change_threshold)
+        # Buffers de frame reciclados: los frames descartados por el buzón vuelven al pool
+        self.pool = FramePool()
+        self.mailbox = FrameMailbox(on_drop=self.pool.release)
 
     def run(self):
         """Método de ejecución del hilo: inicia la captura y emite frames."""
         self._run_flag = True
-        # Abre la cámara por defecto (índice 0)
-        self.cap = cv2.VideoCapture(1)
-        
-        if not self.cap.isOpened():
-            print("Error: No se puede abrir la cámara.")
+        # Abre la cámara con la configuración de captura
+        if not self.source.open():
+            print(f"Error: No se puede abrir la fuente ({self.source.describe()}).")
             self._run_flag = False
             return
+        self.cap = self.source.cap
 
         while self._run_flag:
-            ret, cv_img = self.cap.read()
-            if ret:
-                # Emitir el frame capturado
-                self.change_pixmap_signal.emit(cv_img)
-            # Pequeña pausa para controlar la velocidad de captura (ej. ~30 FPS)
-            self.msleep(30)
+            # read() bloquea hasta el siguiente frame: el ritmo lo marca la cámara.
+            # Se lee dentro de un buffer reciclado del pool (sin asignar memoria por frame)
+            buf = self.pool.acquire()
+            ret, cv_img = self.source.read(buf)
+            if not ret:
+                self.pool.release(buf)
+                if self.source.exhausted:
+                    break # Reproducción sin repetición terminada
+                self.msleep(5) # Evita girar en vacío si la cámara deja de entregar frames
+                continue
+            cv_img = self.pool.adopt(cv_img, buf)
+            if not self.skip_unchanged or self.change_detector.is_changed(cv_img):
+                # Depositar el frame; solo se avisa si el buzón estaba vacío (un aviso pendiente como máximo)
+                if self.mailbox.put(cv_img):
+                    self.frame_ready.emit()
+            else:
+                self.pool.release(cv_img) # Frame sin cambios: el buffer se recicla de inmediato
 
         # Liberar la cámara al detener el hilo
-        if self.cap:
-            self.cap.release()
+        self.source.release()
+        self.mailbox.clear()
             
+    def set_skip_unchanged(self, enabled, threshold=None):
+        """Activa/desactiva la omisión de frames sin cambios (se puede llamar con el hilo corriendo)."""
+        if threshold is not None:
+            self.change_detector.threshold = threshold
+        if enabled and not self.skip_unchanged:
+            self.change_detector.reset() # El primer frame tras activarlo se procesa
+        self.skip_unchanged = enabled
+
+    def take_frame(self):
+        """
+        Retira el frame más reciente del buzón: (frame, segundos en espera) o (None, None).
+        Al terminar con el frame hay que devolverlo con release_frame().
+        """
+        return self.mailbox.take()
+
+    def release_frame(self, frame):
+        """Devuelve el buffer de un frame retirado al pool."""
+        self.pool.release(frame)
+
+    def stats(self):
+        """
+        Contadores de frames procesados/omitidos (detector), entregados/descartados (buzón),
+        FPS de captura logrado y parámetros que la cámara aceptó.
+        """
+        stats = self.change_detector.stats()
+        stats.update(self.mailbox.stats())
+        stats.update(self.pool.stats())
+        stats["capture_fps"] = self.source.fps_meter.fps
+        stats["capture"] = dict(self.source.info)
+        return stats
+
     def stop(self):
         """Método para detener el hilo de forma segura."""
         self._run_flag = False
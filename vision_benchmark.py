@@ -0,0 +1,237 @@
+"""
+Benchmark del pipeline de visión con tiempos por etapa.
+
+Mide cada etapa de image_processing.py (zoom, cada rama de apply_mask, ecualización,
+umbral/morfología con distintas iteraciones, process_image, process_roi_heavy) y la
+proyección + find_peaks / paso por FFT, sobre las imágenes de images/ y frames sintéticos de
+480p, 1080p y 4K. Los resultados se guardan en JSON para comparar corridas.
+
+Ejemplos:
+    python vision_benchmark.py -o bench_base.json
+    python vision_benchmark.py -o bench_new.json --compare bench_base.json --tolerance 10
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+import scipy
+
+from image_processing import (
+    MASK_TYPES, FramePipeline, apply_digital_zoom, apply_mask, apply_histogram_equalization,
+    apply_threshold_and_morphology, process_image, process_roi_heavy
+)
+from fin_analysis import FinTracker, ProjectionIndex, analyze_fins, analyze_rois
+from tiled_processing import TiledExecutor
+from synthetic_frames import RESOLUTIONS, make_fin_frame
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+MORPH_ITERATIONS = (0, 1, 3, 5)
+
+def load_datasets(images_dir=IMAGES_DIR, include_images=True, include_synthetic=True):
+    """
+    Devuelve una lista de (nombre, imagen BGR) con las imágenes incluidas y los frames sintéticos.
+    """
+    datasets = []
+    if include_images:
+        patterns = ("tubulador_*.jpg", "tubulador_*.jfif")
+        paths = sorted(p for pattern in patterns for p in glob.glob(os.path.join(images_dir, pattern)))
+        for path in paths:
+            img = cv2.imread(path)
+            if img is not None:
+                datasets.append((os.path.basename(path), img))
+    if include_synthetic:
+        for name, (w, h) in RESOLUTIONS.items():
+            datasets.append((f"synthetic_{name}", make_fin_frame(w, h, seed=0)))
+    return datasets
+
+def central_roi(image, fraction=0.5):
+    """Recorte central (la mitad del ancho y alto por defecto), como un ROI típico."""
+    h, w = image.shape[:2]
+    rw, rh = int(w * fraction), int(h * fraction)
+    x1, y1 = (w - rw) // 2, (h - rh) // 2
+    return image[y1:y1 + rh, x1:x1 + rw]
+
+def build_cases(image, tiled=None):
+    """
+    Casos a medir para una imagen: lista de (nombre, función sin argumentos).
+    :param tiled: TiledExecutor opcional; agrega los casos por franjas multi-hilo.
+    """
+    roi = central_roi(image)
+    thresh = cv2.THRESH_BINARY
+    processed_roi = process_roi_heavy(roi, 10, 1.5, False, "Ninguna", True, 127, thresh, 1, 1)
+    pipeline = FramePipeline()
+    processed_frame = process_roi_heavy(image, 10, 1.5, False, "Ninguna", True, 127, thresh, 1, 1)
+    index = ProjectionIndex().build(processed_frame)
+    h, w = image.shape[:2]
+    roi_coords = (w // 4, h // 4, w // 4 + roi.shape[1], h // 4 + roi.shape[0])
+    multi_rois = [roi_coords, (0, 0, w // 2, h // 2), (w // 2, h // 2, w, h)]
+    # Seguimiento en estado estable (ya inicializado con una detección completa)
+    roi_projection = index.projection(*roi_coords)
+    tracker = FinTracker(redetect_every=0)
+    tracker.update(roi_projection)
+
+    cases = [("apply_digital_zoom[2.0x]", lambda: apply_digital_zoom(image, 2.0))]
+    for mask_type in MASK_TYPES:
+        cases.append((f"apply_mask[{mask_type}]", lambda m=mask_type: apply_mask(image, m)))
+    cases.append(("apply_histogram_equalization", lambda: apply_histogram_equalization(image)))
+    for n in MORPH_ITERATIONS:
+        cases.append((f"apply_threshold_and_morphology[iter={n}]",
+                      lambda n=n: apply_threshold_and_morphology(image, True, 127, thresh, n, n)))
+    cases += [
+        ("process_image", lambda: process_image(
+            image, 10, 1.5, True, "Filtro Gaussiano", 1.5, True, 127, thresh, 1, 1)),
+        ("process_roi_heavy", lambda: process_roi_heavy(
+            roi, 10, 1.5, True, "Filtro Gaussiano", True, 127, thresh, 1, 1)),
+        ("FramePipeline.process_roi_heavy", lambda: pipeline.process_roi_heavy(
+            roi, 10, 1.5, True, "Filtro Gaussiano", True, 127, thresh, 1, 1)),
+        ("projection+find_peaks", lambda: analyze_fins(processed_roi)),
+        ("projection+fft_pitch", lambda: analyze_fins(processed_roi, method="fft")),
+        ("ProjectionIndex.build", lambda: index.build(processed_frame)),
+        ("ProjectionIndex.projection", lambda: index.projection(*roi_coords)),
+        ("analyze_rois[1 ROI]", lambda: analyze_rois(index, [roi_coords])),
+        ("analyze_rois[3 ROIs x 4 bands]", lambda: analyze_rois(index, multi_rois, 4)),
+        ("FinTracker.update", lambda: tracker.update(roi_projection)),
+    ]
+    if tiled is not None:
+        binary = apply_threshold_and_morphology(image, True, 127, thresh, 0, 0)
+        for mask_type in MASK_TYPES[1:]:
+            cases.append((f"TiledExecutor.apply_mask[{mask_type}]",
+                          lambda m=mask_type: tiled.apply_mask(image, m)))
+        for n in MORPH_ITERATIONS[1:]:
+            cases.append((f"TiledExecutor.apply_morphology[iter={n}]",
+                          lambda n=n: tiled.apply_morphology(binary, n, n)))
+    return cases
+
+def time_case(func, repeats, warmup=1):
+    """Ejecuta func 'warmup' + 'repeats' veces y devuelve estadísticas en milisegundos."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+    samples.sort()
+    return {
+        "min": round(samples[0], 4),
+        "median": round(statistics.median(samples), 4),
+        "mean": round(statistics.fmean(samples), 4),
+        "p95": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 4),
+        "stdev": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        "repeats": repeats,
+    }
+
+def run_benchmark(datasets, repeats, case_filter=None, progress=None, tiled=None):
+    results = []
+    for name, image in datasets:
+        for case_name, func in build_cases(image, tiled):
+            if case_filter and case_filter not in case_name:
+                continue
+            stats = time_case(func, repeats)
+            results.append({
+                "dataset": name,
+                "shape": list(image.shape),
+                "case": case_name,
+                "ms": stats,
+            })
+            if progress:
+                progress(f"{name:28s} {case_name:45s} {stats['median']:10.3f} ms")
+    return results
+
+def environment_info():
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "opencv_threads": cv2.getNumThreads(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+    }
+
+def compare_results(current, baseline, tolerance_pct):
+    """
+    Compara medianas con una corrida anterior.
+    :return: Lista de (dataset, caso, ms_base, ms_actual, cambio_pct, es_regresion).
+    """
+    base_index = {(r["dataset"], r["case"]): r["ms"]["median"] for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        key = (r["dataset"], r["case"])
+        if key not in base_index:
+            continue
+        base_ms, new_ms = base_index[key], r["ms"]["median"]
+        change = (new_ms - base_ms) / base_ms * 100 if base_ms > 0 else 0.0
+        rows.append((key[0], key[1], base_ms, new_ms, change, change > tolerance_pct))
+    return rows
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark por etapas del pipeline de visión.")
+    parser.add_argument("-o", "--output", help="Archivo JSON de salida (por defecto stdout)")
+    parser.add_argument("-n", "--repeats", type=int, default=20, help="Repeticiones por caso")
+    parser.add_argument("--images-dir", default=IMAGES_DIR, help="Directorio con tubulador_*.jpg/.jfif")
+    parser.add_argument("--no-images", action="store_true", help="Omitir las imágenes de images/")
+    parser.add_argument("--no-synthetic", action="store_true", help="Omitir los frames sintéticos")
+    parser.add_argument("-k", "--filter", help="Solo casos cuyo nombre contenga este texto")
+    parser.add_argument("--threads", type=int, help="Hilos de OpenCV (cv2.setNumThreads)")
+    parser.add_argument("--tiled-workers", type=int, default=0,
+                        help="Hilos del TiledExecutor (0 = no medir los casos por franjas)")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument("--tolerance", type=float, default=10.0,
+                        help="Porcentaje de aumento de la mediana considerado regresión")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    datasets = load_datasets(args.images_dir, not args.no_images, not args.no_synthetic)
+    if not datasets:
+        print("Error: no hay imágenes para medir.", file=sys.stderr)
+        return 1
+
+    tiled = TiledExecutor(args.tiled_workers, min_pixels=0) if args.tiled_workers else None
+    report = {
+        "environment": environment_info(),
+        "repeats": args.repeats,
+        "results": run_benchmark(datasets, args.repeats, args.filter,
+                                 progress=lambda line: print(line, file=sys.stderr), tiled=tiled),
+    }
+    if tiled is not None:
+        tiled.shutdown()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_results(report, baseline, args.tolerance)
+        regressions = [row for row in rows if row[5]]
+        for dataset, case, base_ms, new_ms, change, regressed in rows:
+            mark = "REGRESIÓN" if regressed else ""
+            print(f"{dataset:28s} {case:45s} {base_ms:10.3f} -> {new_ms:10.3f} ms "
+                  f"({change:+6.1f}%) {mark}", file=sys.stderr)
+        print(f"{len(regressions)} regresiones de {len(rows)} casos comparados "
+              f"(tolerancia {args.tolerance}%).", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())